@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        # Connect the Celery signals tagging the lanes and timing the tasks
+        import core.lanes  # noqa
+        import core.telemetry  # noqa
@@ -1,62 +1,139 @@
 import functools
+import hashlib
+import json
+import logging
+import math
+import time
 import redis
-from inspect import getfullargspec
-from django.conf import settings
+from inspect import getfullargspec, signature
+from string import Formatter
 from django.db import close_old_connections
 from celery import current_task
 from redis_lock import Lock
 
+from core.metrics import Counter, Histogram
+from core.utils import get_redis_client, get_request_header
+
+logger = logging.getLogger("django.request")
+
+COALESCE_HEADER = "coalesced"
+COALESCE_CALLS_FIELD = ":calls"
+# Accumulated arguments outlive a run delayed by a busy queue
+COALESCE_EXPIRE = 86400
+COALESCE_GRACE = 600
+
+lock_wait_seconds = Histogram(
+    "lock_wait_seconds", "Time spent acquiring a distributed lock"
+)
+lock_hold_seconds = Histogram(
+    "lock_hold_seconds", "Time a distributed lock was held by its task"
+)
+lock_requeues = Counter(
+    "lock_requeues", "Tasks requeued because their distributed lock was held"
+)
+
+
+def lock_name_builder(lock_name_template, task_func):
+    """
+    Build a function resolving the lock name of a call from its arguments.
+    The fields of the template are matched to the parameters of `task_func`
+    once, instead of on every call.
+    """
+    fields = {
+        field for _, field, _, _ in Formatter().parse(lock_name_template) if field
+    }
+    if not fields:
+        return lambda args, kwargs: lock_name_template
+
+    argspec = getfullargspec(task_func)
+    positions = {name: i for i, name in enumerate(argspec.args) if name in fields}
+    defaults = argspec.defaults or ()
+    defaults = dict(zip(argspec.args[len(argspec.args) - len(defaults) :], defaults))
+
+    def build(args, kwargs):
+        values = {}
+        for field in fields:
+            i = positions.get(field)
+            if i is not None and i < len(args):
+                values[field] = args[i]
+            elif field in kwargs:
+                values[field] = kwargs[field]
+            else:
+                values[field] = defaults[field]
+        return lock_name_template.format(**values)
+
+    return build
+
 
 def distributed_lock(
-    lock_name_template, timeout=3600, retry_countdown=60, expire=7200, max_retries=3
+    lock_name_template,
+    timeout=3600,
+    retry_countdown=60,
+    expire=7200,
+    max_retries=None,
+    blocking=True,
 ):
     """
     Distributed lock decorator using Redis.
 
+    By default the worker waits up to `timeout` seconds for the lock. With
+    `blocking=False` it only tries once and, if the lock is held, requeues the
+    task after `retry_countdown` seconds, freeing the worker for other tasks.
+
+    The time spent waiting for and holding the lock is recorded in the
+    `lock_wait_seconds` and `lock_hold_seconds` histograms, labeled with the
+    template, and requeues in `lock_requeues`.
+
     Args:
         lock_name_template: String template for lock name (e.g. "task_{arg_name}")
-        timeout: Maximum lock duration in seconds
+        timeout: Maximum time to wait for the lock in seconds
         retry_countdown: Retry delay if lock is held
         expire: Lock expiration in seconds
-        max_retries: Maximum number of retries if lock cannot be acquired
+        max_retries: Maximum number of retries if lock cannot be acquired.
+            Defaults to 3, or to as many as fit in `timeout` when not blocking.
+        blocking: Whether to wait for the lock instead of requeueing
     """
+    if max_retries is None:
+        max_retries = 3 if blocking else max(3, math.ceil(timeout / retry_countdown))
 
     def decorator(task_func):
+        build_lock_name = lock_name_builder(lock_name_template, task_func)
+
         @functools.wraps(task_func)
         def wrapper(*args, **kwargs):
             try:
-                # Resolve lock name from task arguments
-                argspec = getfullargspec(task_func)
-                arg_dict = {}
-
-                # Populate positional arguments
-                for i, arg in enumerate(args):
-                    if i < len(argspec.args):
-                        arg_name = argspec.args[i]
-                        arg_dict[arg_name] = arg
-
-                # Add keyword arguments
-                arg_dict.update(kwargs)
-
-                # Format lock name
-                lock_name = lock_name_template.format(**arg_dict)
-
-                # Create Redis client
-                redis_client = redis.Redis.from_url(settings.REDIS_URL)
+                lock = Lock(
+                    get_redis_client(), build_lock_name(args, kwargs), expire=expire
+                )
 
                 # Acquire lock
-                lock = Lock(redis_client, lock_name, expire=expire)
-                if lock.acquire(blocking=True, timeout=timeout):
+                started = time.monotonic()
+                if blocking:
+                    acquired = lock.acquire(blocking=True, timeout=timeout)
+                else:
+                    acquired = lock.acquire(blocking=False)
+                lock_wait_seconds.observe(
+                    time.monotonic() - started, lock=lock_name_template
+                )
+
+                if acquired:
+                    started = time.monotonic()
                     try:
                         result = task_func(*args, **kwargs)
                         return result
                     finally:
                         lock.release()
+                        lock_hold_seconds.observe(
+                            time.monotonic() - started, lock=lock_name_template
+                        )
                 else:
                     # Get the current number of retries (default to 0 if not available)
                     retries = getattr(current_task.request, "retries", 0)
                     if retries < max_retries:
-                        current_task.retry(countdown=retry_countdown)
+                        lock_requeues.inc(lock=lock_name_template)
+                        current_task.retry(
+                            countdown=retry_countdown, max_retries=max_retries
+                        )
                     else:
                         raise Exception("Max retries reached for distributed lock")
             finally:
@@ -103,7 +180,7 @@ def debounce_task(timeout):
 
         @functools.wraps(task.apply_async)
         def debounced_apply_async(*args, **kwargs):
-            redis_client = redis.Redis.from_url(settings.REDIS_URL)
+            redis_client = get_redis_client()
             # Check if the caller wants to force execution, bypassing debounce.
             force = kwargs.pop("force", False)
             if force:
@@ -124,3 +201,167 @@ def debounce_task(timeout):
         return task
 
     return decorator
+
+
+def merge_coalesced(arguments, fields, members):
+    """
+    Merge the arguments accumulated by `coalesce_task` into the arguments the
+    run was scheduled with.
+
+    Args:
+        arguments: The arguments of the scheduled run
+        fields: The JSON encoded values of the plain and flag arguments
+        members: The JSON encoded items of each set argument
+
+    Returns:
+        The merged arguments and the number of coalesced calls.
+    """
+    merged = dict(arguments)
+    calls = 0
+
+    for name, value in fields.items():
+        name = name.decode() if isinstance(name, bytes) else name
+        if name == COALESCE_CALLS_FIELD:
+            calls = int(value)
+        else:
+            merged[name] = json.loads(value)
+
+    for name, items in members.items():
+        merged[name] = sorted((json.loads(i) for i in items), key=str)
+
+    return merged, calls
+
+
+def coalesce_task(timeout, sets=(), flags=(), key=()):
+    """
+    A decorator for Celery tasks to merge the calls made within a window into
+    a single run.
+
+    The first call schedules the task after `timeout` seconds, like
+    `debounce_task`. Unlike it, the arguments of every call in the window are
+    accumulated in Redis and merged when the task runs:
+      - arguments named in `sets` are lists, the run gets the union of them,
+      - arguments named in `flags` are OR-ed,
+      - the other arguments keep the value of the last call.
+
+    Calls are only merged with the ones whose arguments named in `key` are
+    equal, e.g. the calls of the same enricher for the same content.
+
+    Pass `force=True` as a keyword argument to bypass coalescing and schedule
+    the task immediately. Execution options of calls merged into an already
+    scheduled run, e.g. links, are dropped. Arguments must be JSON
+    serializable, UUIDs in sets are passed on as strings.
+
+    Example usage:
+
+        @coalesce_task(timeout=60, sets=("entry_ids",), key=("enricher_id",))
+        @shared_task
+        def my_task(enricher_id, entry_ids, simulate=False):
+            ...
+
+        my_task.delay(1, [a])
+        my_task.delay(1, [b], simulate=True)  # my_task(1, [a, b], True) in 60s
+        my_task.delay(2, [c])                 # my_task(2, [c]) in 60s
+    """
+
+    def decorator(task):
+        original_apply_async = task.apply_async
+        original_run = task.run
+        run_signature = signature(original_run)
+
+        def group_key(arguments):
+            prefix = f"coalesce:{task.name}"
+            if not key:
+                return prefix
+
+            group = json.dumps([arguments.get(name) for name in key], default=str)
+            return f"{prefix}:{hashlib.sha1(group.encode()).hexdigest()}"
+
+        @functools.wraps(task.apply_async)
+        def coalesced_apply_async(args=None, kwargs=None, force=False, **options):
+            if force:
+                return original_apply_async(args, kwargs, **options)
+
+            bound = run_signature.bind(*(args or ()), **(kwargs or {}))
+            bound.apply_defaults()
+            arguments = bound.arguments
+            prefix = group_key(arguments)
+            fields_key = f"{prefix}:args"
+
+            try:
+                redis_client = get_redis_client()
+                pipe = redis_client.pipeline()
+
+                for name, value in arguments.items():
+                    if name in key:
+                        continue
+
+                    if name in sets:
+                        if value:
+                            set_key = f"{prefix}:{name}"
+                            pipe.sadd(
+                                set_key, *(json.dumps(i, default=str) for i in value)
+                            )
+                            pipe.expire(set_key, COALESCE_EXPIRE)
+                    elif name in flags and not value:
+                        # A falsy flag never overrides a truthy one
+                        pipe.hsetnx(fields_key, name, json.dumps(value))
+                    else:
+                        pipe.hset(fields_key, name, json.dumps(value, default=str))
+
+                pipe.hincrby(fields_key, COALESCE_CALLS_FIELD, 1)
+                pipe.expire(fields_key, COALESCE_EXPIRE)
+                pipe.set(
+                    f"{prefix}:scheduled", 1, nx=True, ex=timeout + COALESCE_GRACE
+                )
+                scheduled = pipe.execute()[-1]
+            except redis.RedisError as e:
+                logger.warning(f"Could not coalesce {task.name}, running it: {e}")
+                return original_apply_async(args, kwargs, **options)
+
+            if not scheduled:
+                # A run is already scheduled and will pick up these arguments
+                return None
+
+            options.setdefault("countdown", timeout)
+            options["headers"] = {
+                **(options.get("headers") or {}),
+                COALESCE_HEADER: True,
+            }
+            return original_apply_async(
+                kwargs={name: arguments[name] for name in key}, **options
+            )
+
+        @functools.wraps(original_run)
+        def coalesced_run(*args, **kwargs):
+            if not get_request_header(task.request, COALESCE_HEADER):
+                return original_run(*args, **kwargs)
+
+            bound = run_signature.bind_partial(*args, **kwargs)
+            bound.apply_defaults()
+            prefix = group_key(bound.arguments)
+            set_keys = {name: f"{prefix}:{name}" for name in sets}
+
+            redis_client = get_redis_client()
+            pipe = redis_client.pipeline()
+            pipe.hgetall(f"{prefix}:args")
+            for set_key in set_keys.values():
+                pipe.smembers(set_key)
+            # Calls made from here on schedule the next run
+            pipe.delete(f"{prefix}:args", f"{prefix}:scheduled", *set_keys.values())
+            fields, *members, _ = pipe.execute()
+
+            arguments, calls = merge_coalesced(
+                bound.arguments, fields, dict(zip(set_keys, members))
+            )
+            if not calls:
+                # The arguments were already drained by an earlier run
+                return None
+
+            return original_run(**arguments)
+
+        task.apply_async = coalesced_apply_async
+        task.run = coalesced_run
+        return task
+
+    return decorator
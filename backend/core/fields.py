@@ -78,3 +78,174 @@ class BitStringField(models.Field):
                     f"Value length {len(bit_str)} exceeds maximum of {self.max_length} bits."
                 )
         return bit_str
+
+
+class AccessVector:
+    """
+    An access vector read from an AccessVectorField. It keeps the list of
+    offsets read from the database and only converts it to an integer the
+    first time it is used as one.
+
+    Writing an untouched vector back to the same kind of field reuses the raw
+    value, so rows whose vector is copied or never inspected are not converted.
+    """
+
+    __slots__ = ("raw", "_value")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self._value = None
+
+    @property
+    def value(self) -> int:
+        if self._value is None:
+            self._value = AccessVectorField.from_offsets(self.raw)
+        return self._value
+
+    def __int__(self):
+        return self.value
+
+    __index__ = __int__
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __eq__(self, other):
+        if type(other) is type(self) and self.raw == other.raw:
+            return True
+        if isinstance(other, (int, AccessVector)):
+            return self.value == int(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __or__(self, other):
+        return self.value | int(other)
+
+    __ror__ = __or__
+
+    def __and__(self, other):
+        return self.value & int(other)
+
+    __rand__ = __and__
+
+    def __xor__(self, other):
+        return self.value ^ int(other)
+
+    __rxor__ = __xor__
+
+    def __invert__(self):
+        return ~self.value
+
+    def __lshift__(self, other):
+        return self.value << int(other)
+
+    def __rshift__(self, other):
+        return self.value >> int(other)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.raw!r})"
+
+
+# Offset no entity is ever assigned to. Notes and relations default to a
+# vector with this bit set, so they stay hidden until their access is computed.
+NO_ACCESS_OFFSET = 2047
+
+
+class AccessVectorField(models.Field):
+    """
+    An access vector stored as a PostgreSQL integer array holding the offsets
+    of its set bits, with its Python representation as an integer.
+
+    - Bit 0 is held by every user, so it is not stored and public rows
+      are empty arrays. Values read from the database always have it set.
+    - There is no upper bound on the offsets, and a row only costs as much
+      as the number of entities it depends on.
+    - Use the `accessible_by` lookup to filter rows whose offsets are all
+      held by a given vector. It compiles to `<@`, which a GIN index serves.
+    - Values read from the database are AccessVector instances, which are only
+      converted to an integer when used as one.
+    """
+
+    description = "A sparse access vector, with integer representation in Python."
+
+    def db_type(self, connection):
+        return "integer[]"
+
+    @staticmethod
+    def to_offsets(value: int) -> list[int]:
+        """
+        Convert an integer access vector to the sorted offsets of its set bits,
+        excluding bit 0.
+        """
+        bits = bin(value)[:1:-1]
+        offsets = []
+        offset = bits.find("1", 1)
+        while offset != -1:
+            offsets.append(offset)
+            offset = bits.find("1", offset + 1)
+        return offsets
+
+    @staticmethod
+    def from_offsets(offsets) -> int:
+        """
+        Convert a list of offsets to an integer access vector, with bit 0 set.
+        """
+        value = 1
+        for offset in offsets:
+            value |= 1 << offset
+        return value
+
+    def from_db_value(self, value, expression, connection):
+        """
+        Wrap the database value (a list of offsets), it is converted to an
+        integer on first use.
+        """
+        if value is None:
+            return value
+        return AccessVector(value)
+
+    def to_python(self, value):
+        """
+        Convert the input value into an integer. Offset lists and bit strings
+        are both accepted.
+        """
+        if value is None:
+            return value
+        if isinstance(value, (int, AccessVector)):
+            return value
+        if isinstance(value, (list, tuple)):
+            return self.from_offsets(value)
+        if isinstance(value, str):
+            return int(value, 2)
+        raise ValueError(
+            "Invalid value type for AccessVectorField. Expected int or list of offsets."
+        )
+
+    def get_prep_value(self, value):
+        """
+        Prepare the value for the database by converting it to the list of
+        offsets of its set bits.
+        """
+        if value is None:
+            return value
+        if isinstance(value, AccessVector):
+            return value.raw
+        if isinstance(value, (list, tuple)):
+            return sorted({int(offset) for offset in value if offset != 0})
+        return self.to_offsets(int(self.to_python(value)))
+
+
+@AccessVectorField.register_lookup
+class AccessibleBy(models.Lookup):
+    """
+    Matches the rows whose access vector is a subset of the given vector.
+    """
+
+    lookup_name = "accessible_by"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} <@ {rhs}::integer[]", [*lhs_params, *rhs_params]
@@ -0,0 +1,90 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from celery import current_task
+from celery.signals import before_task_publish
+
+from .utils import get_request_header
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+LANE_HEADER = "lane"
+SENT_AT_HEADER = "sent_at"
+
+# Queues which have a bulk lane, the `<queue>.bulk` queue, consumed by
+# workers of their own so bulk work never takes the slots of interactive work
+LANED_QUEUES = frozenset({"notes", "digest", "enrich", "access"})
+
+# Tasks which are bulk work wherever they are started from
+BULK_TASKS = frozenset(
+    {
+        "entries.tasks.remap_notes_task",
+        "intelio.tasks.core.start_digest",
+        "intelio.tasks.core.enrich_periodic",
+        "intelio.tasks.falcon.digest_chunk",
+        "file_transfer.tasks.reprocess_all_files_task",
+    }
+)
+
+_lane = ContextVar("lane", default=None)
+
+
+@contextmanager
+def bulk_lane():
+    """
+    Send the tasks started within the block, and every task they start in
+    turn, to the bulk lanes.
+    """
+    token = _lane.set(BULK)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def current_lane():
+    """
+    The lane of the work being done: bulk within `bulk_lane`, in a bulk task
+    or in a task started from bulk work, interactive otherwise, e.g. when
+    handling an API request.
+    """
+    lane = _lane.get()
+    if lane is not None:
+        return lane
+
+    if current_task and not current_task.request.called_directly:
+        if current_task.name in BULK_TASKS:
+            return BULK
+        return get_request_header(current_task.request, LANE_HEADER) or INTERACTIVE
+
+    return INTERACTIVE
+
+
+def bulk_route(name, destination):
+    """
+    The route of a task in the bulk lane of its queue, or None when it stays
+    in the interactive lane, e.g. because its queue has no bulk lane.
+
+    Args:
+        name: The name of the task
+        destination: The route of the task, e.g. {"queue": "notes"}
+    """
+    if not destination or destination.get("queue") not in LANED_QUEUES:
+        return None
+
+    if name not in BULK_TASKS and current_lane() != BULK:
+        return None
+
+    return {**destination, "queue": f"{destination['queue']}.{BULK}"}
+
+
+@before_task_publish.connect
+def tag_lane(sender=None, headers=None, routing_key=None, **kwargs):
+    if headers is None:
+        return
+
+    lane = BULK if (routing_key or "").endswith(f".{BULK}") else current_lane()
+    headers[LANE_HEADER] = lane
+    headers[SENT_AT_HEADER] = time.time()
@@ -0,0 +1,200 @@
+import logging
+import math
+import re
+
+import redis
+
+from .utils import get_redis_client
+
+logger = logging.getLogger("django.request")
+
+METRICS_KEY_PREFIX = "metrics"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 1800)
+
+LABEL_RE = re.compile(r'(\w+)="([^"]*)"')
+
+# Every metric defined by the process, by name
+REGISTRY = {}
+
+
+def format_labels(labels: dict) -> str:
+    return ",".join(f'{k}="{v}"' for k, v in sorted(labels.items()))
+
+
+def parse_labels(labels: str) -> dict:
+    return dict(LABEL_RE.findall(labels))
+
+
+def format_value(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+class Metric:
+    """
+    A metric shared by every web and worker process, kept in a Redis hash
+    with one field per series. Recording never raises, a metric which can
+    not be stored is dropped.
+    """
+
+    type = ""
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        REGISTRY[name] = self
+
+    @property
+    def key(self):
+        return f"{METRICS_KEY_PREFIX}:{self.name}"
+
+    def record(self, fields):
+        try:
+            pipe = get_redis_client().pipeline(transaction=False)
+            for field, amount in fields:
+                if isinstance(amount, float):
+                    pipe.hincrbyfloat(self.key, field, amount)
+                else:
+                    pipe.hincrby(self.key, field, amount)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.debug(f"Could not record metric {self.name}: {e}")
+
+    def series(self):
+        """
+        The stored values, as {labels: {suffix: value}}.
+        """
+        result = {}
+        for field, value in get_redis_client().hgetall(self.key).items():
+            labels, _, suffix = field.decode().rpartition("|")
+            result.setdefault(labels, {})[suffix] = float(value)
+        return result
+
+    def reset(self):
+        get_redis_client().delete(self.key)
+
+    def samples(self, labels, values):
+        """
+        The (name, labels, value) samples of a series, in the Prometheus
+        text format.
+        """
+        raise NotImplementedError()
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for labels, values in sorted(self.series().items()):
+            for name, sample_labels, value in self.samples(labels, values):
+                sample_labels = f"{{{sample_labels}}}" if sample_labels else ""
+                lines.append(f"{name}{sample_labels} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        self.record([(f"{format_labels(labels)}|total", amount)])
+
+    def samples(self, labels, values):
+        yield f"{self.name}_total", labels, values.get("total", 0)
+
+
+class Histogram(Metric):
+    """
+    Counts observations into buckets of upper bounds `buckets`. Each
+    observation increments a single bucket, the counts are made cumulative
+    when read.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name, description, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(buckets) + (math.inf,)
+
+    def observe(self, value, **labels):
+        labels = format_labels(labels)
+        bound = next(b for b in self.buckets if value <= b)
+
+        self.record(
+            [
+                (f"{labels}|{bound}", 1),
+                (f"{labels}|sum", float(value)),
+                (f"{labels}|count", 1),
+            ]
+        )
+
+    def cumulative(self, values):
+        """
+        The cumulative (upper bound, count) pairs of a series.
+        """
+        total = 0
+        for bound in self.buckets:
+            total += int(values.get(str(bound), 0))
+            yield bound, total
+
+    def samples(self, labels, values):
+        for bound, count in self.cumulative(values):
+            le = f'le="{format_value(bound)}"'
+            yield f"{self.name}_bucket", f"{labels},{le}" if labels else le, count
+        yield f"{self.name}_sum", labels, values.get("sum", 0)
+        yield f"{self.name}_count", labels, values.get("count", 0)
+
+    def by_label(self, label):
+        """
+        The series merged by the value of one label, e.g. every series of a
+        task whatever its queue.
+        """
+        merged = {}
+        for labels, values in self.series().items():
+            key = parse_labels(labels).get(label)
+            target = merged.setdefault(key, {})
+            for suffix, value in values.items():
+                target[suffix] = target.get(suffix, 0) + value
+        return merged
+
+    def quantile(self, values, q):
+        """
+        Estimate a quantile of a series, interpolating within its bucket.
+        """
+        count = values.get("count", 0)
+        if not count:
+            return None
+
+        rank = q * count
+        lower, previous = 0, 0
+        for bound, total in self.cumulative(values):
+            if total >= rank:
+                if bound == math.inf:
+                    return lower
+                return lower + (bound - lower) * (rank - previous) / (total - previous)
+            lower, previous = bound, total
+
+        return lower
+
+    def summarize(self, values):
+        count = values.get("count", 0)
+        return {
+            "count": int(count),
+            "mean": values.get("sum", 0) / count if count else None,
+            "p50": self.quantile(values, 0.5),
+            "p95": self.quantile(values, 0.95),
+        }
+
+
+def render_metrics():
+    """
+    Every registered metric in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in REGISTRY.values():
+        try:
+            lines += metric.render()
+        except redis.RedisError as e:
+            logger.warning(f"Could not read metric {metric.name}: {e}")
+    return "\n".join(lines) + "\n"
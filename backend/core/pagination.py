@@ -1,6 +1,11 @@
+import base64
+import json
+
+from django.db.models import Q
 from drf_spectacular.utils import inline_serializer
 from rest_framework import serializers
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
 
 
@@ -121,3 +126,101 @@ class LazyPaginator(PageNumberPagination):
                 "results": serializer_class(many=True),
             },
         )
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination on a unique, descending (field, tiebreaker) key. Each page
+    starts after the last row of the previous one, so deep pages cost as
+    much as the first and no total count is computed.
+
+    The client passes back the `next` cursor of a response as `cursor`.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def __init__(self, *args, page_size=10, ordering=("timestamp", "id"), **kwargs):
+        self.page_size = page_size
+        self.ordering = ordering
+        super().__init__(*args, **kwargs)
+
+    def encode_cursor(self, row):
+        values = [str(getattr(row, field)) for field in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, queryset, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return [
+                queryset.model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.ordering, values, strict=True)
+            ]
+        except Exception:
+            raise ValidationError({self.cursor_query_param: "Invalid cursor."})
+
+    def paginate_queryset(self, queryset, request, view=None):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, 0))
+        except ValueError:
+            page_size = 0
+        if page_size > 0:
+            self.page_size = min(page_size, self.max_page_size)
+
+        field, tiebreaker = self.ordering
+        queryset = queryset.order_by(f"-{field}", f"-{tiebreaker}")
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            value, key = self.decode_cursor(queryset, cursor)
+            queryset = queryset.filter(
+                Q(**{f"{field}__lt": value})
+                | Q(**{field: value, f"{tiebreaker}__lt": key})
+            )
+
+        rows = list(queryset[: self.page_size + 1])
+        self.next_cursor = None
+        if len(rows) > self.page_size:
+            rows = rows[: self.page_size]
+            self.next_cursor = self.encode_cursor(rows[-1])
+
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.next_cursor, "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {
+                    "type": "string",
+                    "nullable": True,
+                    "description": "Cursor of the next page, null on the last one",
+                },
+                "results": schema,
+            },
+            "required": ["next", "results"],
+        }
+
+    def get_paginated_response_serializer(self, serializer_class, name=None):
+        """
+        Returns an inline serializer for the paginated response.
+
+        Args:
+            serializer_class: The serializer class for the results
+            name: Optional name for the inline serializer (auto-generated if not provided)
+        """
+        if name is None:
+            name = f"Keyset{serializer_class.__name__}Response"
+
+        return inline_serializer(
+            name=name,
+            fields={
+                "next": serializers.CharField(
+                    allow_null=True, help_text="Cursor of the next page"
+                ),
+                "results": serializer_class(many=True),
+            },
+        )
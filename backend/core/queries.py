@@ -0,0 +1,157 @@
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+from management.settings import cradle_settings
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_RES = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def fingerprint(sql: str) -> str:
+    """
+    The shape of a query: literals and parameters are replaced by `?` and
+    lists of them collapsed, so the queries of an N+1 share a fingerprint.
+    """
+    for pattern, replacement in FINGERPRINT_RES:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class QueryRecorder:
+    """
+    A database execute wrapper counting queries, the time spent in them and
+    how often each fingerprint ran.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.monotonic() - started
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def duplicates(self, threshold=2):
+        """
+        The fingerprints which ran at least `threshold` times, most frequent
+        first.
+        """
+        return [
+            (sql, count)
+            for sql, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+    def describe(self, threshold=2, limit=3):
+        lines = [f"{self.count} queries in {self.duration * 1000:.0f}ms"]
+        for sql, count in self.duplicates(threshold)[:limit]:
+            lines.append(f"  {count}x {sql[:300]}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def record_queries():
+    recorder = QueryRecorder()
+    with connection.execute_wrapper(recorder):
+        yield recorder
+
+
+@contextmanager
+def assert_query_budget(queries=None, duplicates=None):
+    """
+    Fail when the block runs more than `queries` queries, or one query shape
+    more than `duplicates` times.
+
+    Example usage:
+
+        with assert_query_budget(queries=10, duplicates=1):
+            self.client.get(reverse("graph_fetch"))
+    """
+    with record_queries() as recorder:
+        yield recorder
+
+    if queries is not None and recorder.count > queries:
+        raise QueryBudgetExceeded(
+            f"Expected at most {queries} queries. {recorder.describe()}"
+        )
+
+    if duplicates is not None and recorder.duplicates(duplicates + 1):
+        raise QueryBudgetExceeded(
+            f"Expected no query to run more than {duplicates} times. "
+            f"{recorder.describe(duplicates + 1)}"
+        )
+
+
+def endpoint_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match and match.view_name else request.path
+
+
+class QueryBudgetMiddleware:
+    """
+    Record the queries of a sample of requests, `queries.sample_rate`, and
+    log the endpoints which exceed their budget or repeat a query shape
+    `queries.duplicate_threshold` times or more.
+
+    Budgets default to `queries.budget`, endpoints can be given their own in
+    the QUERY_BUDGETS setting, by URL name. With QUERY_BUDGET_STRICT, as in
+    the test settings, every request is recorded and exceeding the budget of
+    an endpoint listed in QUERY_BUDGETS raises QueryBudgetExceeded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        strict = getattr(settings, "QUERY_BUDGET_STRICT", False)
+        if not strict and random.random() >= cradle_settings.queries.sample_rate:
+            return self.get_response(request)
+
+        with record_queries() as recorder:
+            response = self.get_response(request)
+
+        name = endpoint_name(request)
+        budget = getattr(settings, "QUERY_BUDGETS", {}).get(name)
+
+        if strict:
+            if budget is not None and recorder.count > budget:
+                raise QueryBudgetExceeded(
+                    f"{request.method} {name} exceeded its budget of {budget} "
+                    f"queries. {recorder.describe()}"
+                )
+            return response
+
+        threshold = cradle_settings.queries.duplicate_threshold
+        if recorder.count > (budget or cradle_settings.queries.budget) or (
+            recorder.duplicates(threshold)
+        ):
+            logger.warning(
+                f"{request.method} {name} is over its query budget. "
+                f"{recorder.describe(threshold)}"
+            )
+
+        return response
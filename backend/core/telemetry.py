@@ -0,0 +1,145 @@
+import resource
+import time
+from datetime import datetime
+
+from celery.signals import task_failure, task_postrun, task_prerun
+from django.db import connection
+
+from .lanes import INTERACTIVE, LANE_HEADER, SENT_AT_HEADER
+from .metrics import Counter, Histogram
+from .utils import get_request_header
+
+QUERY_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000, 50000)
+MEMORY_BUCKETS = (0, *(4**i * 1024 * 1024 for i in range(7)))
+
+task_queue_wait_seconds = Histogram(
+    "task_queue_wait_seconds",
+    "Time tasks spent in their queue before a worker started them",
+)
+task_runtime_seconds = Histogram(
+    "task_runtime_seconds", "Time tasks took to run, by outcome"
+)
+task_db_queries = Histogram(
+    "task_db_queries", "Database queries issued by a task run", QUERY_BUCKETS
+)
+task_db_query_seconds = Histogram(
+    "task_db_query_seconds", "Time a task run spent in database queries"
+)
+task_rss_growth_bytes = Histogram(
+    "task_rss_growth_bytes",
+    "How much a task run raised the peak resident memory of its worker",
+    MEMORY_BUCKETS,
+)
+task_failures = Counter("task_failures", "Task runs which raised an exception")
+
+
+class QueryCounter:
+    """
+    A database execute wrapper counting the queries and the time spent in
+    them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.monotonic() - started
+
+
+# The start time, query counter and peak memory of the worker when each task
+# running in this process started
+_running = {}
+
+
+def peak_rss():
+    # Peak of the process since it started, Linux reports it in kilobytes
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def record_queue_wait(task):
+    request = task.request
+    sent_at = get_request_header(request, SENT_AT_HEADER)
+    if sent_at is None:
+        return
+
+    # Time spent waiting for a countdown is not time spent in the queue
+    if request.eta:
+        eta = request.eta
+        if isinstance(eta, str):
+            eta = datetime.fromisoformat(eta)
+        sent_at = max(sent_at, eta.timestamp())
+
+    task_queue_wait_seconds.observe(
+        max(time.time() - sent_at, 0),
+        task=task.name,
+        queue=(request.delivery_info or {}).get("routing_key") or "unknown",
+        lane=get_request_header(request, LANE_HEADER) or INTERACTIVE,
+    )
+
+
+@task_prerun.connect
+def start_task_telemetry(task_id=None, task=None, **kwargs):
+    record_queue_wait(task)
+
+    counter = QueryCounter()
+    connection.execute_wrappers.append(counter)
+    _running[task_id] = (time.monotonic(), counter, peak_rss())
+
+
+@task_postrun.connect
+def finish_task_telemetry(task_id=None, task=None, state=None, **kwargs):
+    started, counter, rss = _running.pop(task_id, (None, None, None))
+    if started is None:
+        return
+
+    runtime = time.monotonic() - started
+    if counter in connection.execute_wrappers:
+        connection.execute_wrappers.remove(counter)
+
+    task_runtime_seconds.observe(runtime, task=task.name, state=state or "UNKNOWN")
+    task_db_queries.observe(counter.count, task=task.name)
+    task_db_query_seconds.observe(counter.duration, task=task.name)
+    # The peak of the process only rises when the task needs more memory
+    # than any run before it, so a run which fits records no growth
+    task_rss_growth_bytes.observe(peak_rss() - rss, task=task.name)
+
+
+@task_failure.connect
+def count_task_failure(sender=None, **kwargs):
+    task_failures.inc(task=sender.name)
+
+
+def task_summary():
+    """
+    The recorded telemetry of every task, merged across queues, lanes and
+    outcomes, ordered by total runtime.
+    """
+    metrics = {
+        "runtime": task_runtime_seconds,
+        "queue_wait": task_queue_wait_seconds,
+        "db_queries": task_db_queries,
+        "db_query_time": task_db_query_seconds,
+        "rss_growth": task_rss_growth_bytes,
+    }
+    merged = {key: metric.by_label("task") for key, metric in metrics.items()}
+    failures = {
+        labels: values.get("total", 0)
+        for labels, values in task_failures.series().items()
+    }
+
+    summary = []
+    for name in set().union(*merged.values()) - {None}:
+        row = {"task": name}
+        for key, metric in metrics.items():
+            row[key] = metric.summarize(merged[key].get(name, {}))
+        row["failures"] = int(failures.get(f'task="{name}"', 0))
+        row["total_runtime"] = merged["runtime"].get(name, {}).get("sum", 0)
+        summary.append(row)
+
+    return sorted(summary, key=lambda row: row["total_runtime"], reverse=True)
@@ -0,0 +1,188 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from core.decorators import (
+    COALESCE_CALLS_FIELD,
+    COALESCE_HEADER,
+    coalesce_task,
+    lock_name_builder,
+    merge_coalesced,
+)
+
+
+def task(note_id, file_ref_id=None):
+    pass
+
+
+class FakeRedis:
+    """
+    The part of the Redis API `coalesce_task` uses, pipelines run their
+    commands as soon as they are queued.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.results = []
+
+    def pipeline(self):
+        self.results = []
+        return self
+
+    def execute(self):
+        return self.results
+
+    def _run(self, result):
+        self.results.append(result)
+        return result
+
+    def sadd(self, key, *items):
+        members = self.data.setdefault(key, set())
+        added = {i.encode() for i in items} - members
+        members.update(added)
+        return self._run(len(added))
+
+    def smembers(self, key):
+        return self._run(set(self.data.get(key, set())))
+
+    def hset(self, key, name, value):
+        self.data.setdefault(key, {})[name.encode()] = value.encode()
+        return self._run(1)
+
+    def hsetnx(self, key, name, value):
+        fields = self.data.setdefault(key, {})
+        if name.encode() in fields:
+            return self._run(0)
+        fields[name.encode()] = value.encode()
+        return self._run(1)
+
+    def hincrby(self, key, name, amount):
+        fields = self.data.setdefault(key, {})
+        fields[name.encode()] = str(int(fields.get(name.encode(), 0)) + amount).encode()
+        return self._run(int(fields[name.encode()]))
+
+    def hgetall(self, key):
+        return self._run(dict(self.data.get(key, {})))
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return self._run(None)
+        self.data[key] = value
+        return self._run(True)
+
+    def expire(self, key, seconds):
+        return self._run(key in self.data)
+
+    def delete(self, *keys):
+        return self._run(sum(self.data.pop(key, None) is not None for key in keys))
+
+
+class LockNameBuilderTest(SimpleTestCase):
+    def test_positional_and_keyword_arguments(self):
+        build = lock_name_builder("link_{note_id}_{file_ref_id}", task)
+
+        self.assertEqual(build((1, 2), {}), "link_1_2")
+        self.assertEqual(build((), {"note_id": 1, "file_ref_id": 2}), "link_1_2")
+
+    def test_defaults(self):
+        build = lock_name_builder("link_{note_id}_{file_ref_id}", task)
+
+        self.assertEqual(build((1,), {}), "link_1_None")
+
+    def test_constant_template(self):
+        build = lock_name_builder("flush_fetch_logs", task)
+
+        self.assertEqual(build((1,), {}), "flush_fetch_logs")
+
+
+class MergeCoalescedTest(SimpleTestCase):
+    def test_accumulated_arguments_override_scheduled(self):
+        merged, calls = merge_coalesced(
+            {"enricher_id": 1, "entry_ids": None, "simulate": False},
+            {
+                b"simulate": json.dumps(True).encode(),
+                COALESCE_CALLS_FIELD.encode(): b"3",
+            },
+            {"entry_ids": {b'"b"', b'"a"'}},
+        )
+
+        self.assertEqual(calls, 3)
+        self.assertEqual(
+            merged, {"enricher_id": 1, "entry_ids": ["a", "b"], "simulate": True}
+        )
+
+    def test_drained_state_has_no_calls(self):
+        merged, calls = merge_coalesced({"simulate": False}, {}, {"entry_ids": set()})
+
+        self.assertEqual(calls, 0)
+        self.assertEqual(merged, {"simulate": False, "entry_ids": []})
+
+
+class CoalesceTaskTest(SimpleTestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        patcher = patch("core.decorators.get_redis_client", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.runs = []
+
+        def run(enricher_id, entry_ids=None, simulate=False):
+            self.runs.append((enricher_id, entry_ids, simulate))
+            return "done"
+
+        self.apply_async = MagicMock(return_value="scheduled")
+        self.task = coalesce_task(
+            timeout=60, sets=("entry_ids",), flags=("simulate",), key=("enricher_id",)
+        )(
+            SimpleNamespace(
+                name="task",
+                apply_async=self.apply_async,
+                run=run,
+                request=SimpleNamespace(),
+            )
+        )
+
+    def test_one_run_scheduled_per_key(self):
+        self.assertEqual(self.task.apply_async((1, ["a"])), "scheduled")
+        self.assertIsNone(self.task.apply_async((1, ["b"]), {"simulate": True}))
+        self.assertEqual(self.task.apply_async((2, ["c"])), "scheduled")
+
+        self.assertEqual(self.apply_async.call_count, 2)
+        self.assertEqual(
+            self.apply_async.call_args_list[0].kwargs,
+            {
+                "kwargs": {"enricher_id": 1},
+                "countdown": 60,
+                "headers": {COALESCE_HEADER: True},
+            },
+        )
+
+    def test_run_drains_and_merges(self):
+        self.task.apply_async((1, ["a"]), {"simulate": True})
+        self.task.apply_async((1, ["b", "a"]))
+        self.task.apply_async((2, ["c"]))
+        self.task.request = SimpleNamespace(**{COALESCE_HEADER: True})
+
+        self.assertEqual(self.task.run(enricher_id=1), "done")
+        self.assertEqual(self.runs, [(1, ["a", "b"], True)])
+
+        # The run drained its group, a late duplicate of it has nothing to do
+        self.assertIsNone(self.task.run(enricher_id=1))
+        self.assertEqual(len(self.runs), 1)
+
+        # Calls after the run schedule the next one
+        self.task.apply_async((1, ["d"]))
+        self.assertEqual(self.apply_async.call_count, 3)
+
+        self.task.run(enricher_id=2)
+        self.assertEqual(self.runs[-1], (2, ["c"], False))
+
+    def test_forced_call_bypasses_coalescing(self):
+        self.task.apply_async((1, ["a"]))
+        self.task.apply_async((1, ["b"]), force=True)
+
+        self.assertEqual(self.apply_async.call_count, 2)
+        self.assertEqual(self.apply_async.call_args.args, ((1, ["b"]), None))
@@ -0,0 +1,31 @@
+from django.test import SimpleTestCase
+
+from core.fields import AccessVector, AccessVectorField
+
+
+class AccessVectorTest(SimpleTestCase):
+    def setUp(self):
+        self.field = AccessVectorField()
+
+    def test_access_vector_is_decoded_lazily(self):
+        vector = self.field.from_db_value([5, 3000], None, None)
+
+        self.assertIsInstance(vector, AccessVector)
+        self.assertIsNone(vector._value)
+        self.assertIs(self.field.get_prep_value(vector), vector.raw)
+        self.assertIsNone(vector._value)
+        self.assertEqual(vector | 2, 1 | 2 | (1 << 5) | (1 << 3000))
+
+    def test_public_vector_has_only_bit_zero(self):
+        vector = self.field.from_db_value([], None, None)
+
+        self.assertEqual(vector, 1)
+        self.assertEqual(self.field.get_prep_value(int(vector)), [])
+
+    def test_vectors_compare_by_value(self):
+        vector = AccessVector([3])
+
+        self.assertEqual(vector, AccessVector([3]))
+        self.assertEqual(vector, 1 | (1 << 3))
+        self.assertEqual(hash(vector), hash(1 | (1 << 3)))
+        self.assertNotEqual(vector, AccessVector([4]))
@@ -0,0 +1,34 @@
+from django.test import SimpleTestCase
+
+from core.lanes import BULK, bulk_lane, bulk_route, current_lane
+
+
+class LaneRoutingTest(SimpleTestCase):
+    def test_interactive_by_default(self):
+        self.assertIsNone(
+            bulk_route("notes.tasks.smart_linker_task", {"queue": "notes"})
+        )
+
+    def test_bulk_within_bulk_lane(self):
+        with bulk_lane():
+            self.assertEqual(current_lane(), BULK)
+            self.assertEqual(
+                bulk_route("notes.tasks.smart_linker_task", {"queue": "notes"}),
+                {"queue": "notes.bulk"},
+            )
+
+        self.assertIsNone(
+            bulk_route("notes.tasks.smart_linker_task", {"queue": "notes"})
+        )
+
+    def test_bulk_tasks(self):
+        self.assertEqual(
+            bulk_route("entries.tasks.remap_notes_task", {"queue": "notes"}),
+            {"queue": "notes.bulk"},
+        )
+
+    def test_queues_without_lanes(self):
+        with bulk_lane():
+            self.assertIsNone(
+                bulk_route("entries.tasks.simulate_graph", {"queue": "graph"})
+            )
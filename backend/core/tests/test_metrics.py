@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from core.metrics import Histogram
+
+
+class HistogramTest(SimpleTestCase):
+    def test_cumulative_buckets(self):
+        histogram = Histogram("test_seconds", "Test", buckets=(1, 10))
+
+        self.assertEqual(
+            list(histogram.cumulative({"1": 2, "10": 1, "inf": 1})),
+            [(1, 2), (10, 3), (float("inf"), 4)],
+        )
+
+
+class HistogramRenderTest(SimpleTestCase):
+    def setUp(self):
+        self.histogram = Histogram("test_runtime_seconds", "Test", buckets=(1, 10))
+
+    def test_render(self):
+        series = {'task="a"': {"1": 2, "inf": 1, "sum": 3.5, "count": 3}}
+
+        with patch.object(self.histogram, "series", return_value=series):
+            lines = self.histogram.render()
+
+        self.assertIn('test_runtime_seconds_bucket{task="a",le="1"} 2', lines)
+        self.assertIn('test_runtime_seconds_bucket{task="a",le="10"} 2', lines)
+        self.assertIn('test_runtime_seconds_bucket{task="a",le="+Inf"} 3', lines)
+        self.assertIn('test_runtime_seconds_sum{task="a"} 3.5', lines)
+        self.assertIn('test_runtime_seconds_count{task="a"} 3', lines)
+
+    def test_quantile(self):
+        values = {"1": 2, "10": 2, "count": 4}
+
+        self.assertEqual(self.histogram.quantile(values, 0.5), 1)
+        self.assertAlmostEqual(self.histogram.quantile(values, 0.95), 9.1)
+        self.assertIsNone(self.histogram.quantile({}, 0.5))
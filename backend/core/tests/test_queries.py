@@ -0,0 +1,52 @@
+from core.queries import (
+    QueryBudgetExceeded,
+    assert_query_budget,
+    fingerprint,
+    record_queries,
+)
+from entries.models import Entry
+from entries.tests.utils import EntriesTestCase
+
+
+class QueryBudgetTest(EntriesTestCase):
+    def setUp(self):
+        super().setUp()
+
+        created = [
+            Entry.objects.create(name=f"Entity {i}", entry_class=self.entryclass1)
+            for i in range(3)
+        ]
+        self.entries = Entry.objects.filter(id__in=[e.id for e in created])
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND n = 'a'"),
+            "SELECT * FROM t WHERE id IN (...) AND n = ?",
+        )
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 1"),
+            fingerprint("SELECT * FROM t  WHERE id = 22"),
+        )
+
+    def test_per_row_queries_detected(self):
+        with record_queries() as recorder:
+            for entry in self.entries.all():
+                entry.entry_class.color
+
+        self.assertEqual(recorder.count, 4)
+        self.assertEqual(recorder.duplicates()[0][1], 3)
+
+        with record_queries() as recorder:
+            for entry in self.entries.select_related("entry_class"):
+                entry.entry_class.color
+
+        self.assertEqual(recorder.duplicates(), [])
+
+    def test_budget_enforced(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with assert_query_budget(duplicates=1):
+                for entry in self.entries.all():
+                    entry.entry_class.color
+
+        with assert_query_budget(queries=1, duplicates=1):
+            list(self.entries.select_related("entry_class"))
@@ -0,0 +1,25 @@
+from types import SimpleNamespace
+from unittest.mock import DEFAULT, patch
+
+from django.test import SimpleTestCase
+
+from core import telemetry
+
+
+@patch("core.telemetry.record_queue_wait")
+class TaskTelemetryTest(SimpleTestCase):
+    @patch("core.telemetry.task_rss_growth_bytes")
+    @patch("core.telemetry.peak_rss", side_effect=[300, 450])
+    def test_rss_growth_over_the_run(self, _, rss_growth, __):
+        task = SimpleNamespace(name="task")
+
+        telemetry.start_task_telemetry(task_id="id", task=task)
+        with patch.multiple(
+            "core.telemetry",
+            task_runtime_seconds=DEFAULT,
+            task_db_queries=DEFAULT,
+            task_db_query_seconds=DEFAULT,
+        ):
+            telemetry.finish_task_telemetry(task_id="id", task=task, state="SUCCESS")
+
+        rss_growth.observe.assert_called_once_with(150, task="task")
@@ -1,7 +1,10 @@
+import redis
+from django.conf import settings
 from django.db import models
 from rest_framework.response import Response
 from rest_framework import status
-from typing import List, Optional, Tuple
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 
 def flatten(items):
@@ -11,6 +14,75 @@ def flatten(items):
     return flat_list
 
 
+_redis_pool = None
+
+
+def get_redis_client() -> redis.Redis:
+    """
+    A Redis client on the connection pool shared by the process. The pool
+    hands out new connections after a fork.
+    """
+    global _redis_pool
+    if _redis_pool is None:
+        _redis_pool = redis.ConnectionPool.from_url(settings.REDIS_URL)
+    return redis.Redis(connection_pool=_redis_pool)
+
+
+def get_request_header(request, name):
+    """
+    A custom header of the message of a Celery task. Depending on the
+    protocol, custom headers are attributes of the request or kept apart.
+    """
+    value = getattr(request, name, None)
+    if value is None:
+        value = (getattr(request, "headers", None) or {}).get(name)
+    return value
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Split an iterable into lists of at most `size` items.
+    """
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class DisjointSet:
+    """
+    Union-find over hashable, ordered items. Each set is represented by its
+    smallest item.
+    """
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        self.parent.setdefault(item, item)
+
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+
+        # Path compression
+        while item != root:
+            self.parent[item], item = root, self.parent[item]
+
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def roots(self) -> Iterator[Tuple]:
+        """
+        Yield every item with the representative of its set.
+        """
+        for item in list(self.parent):
+            yield item, self.find(item)
+
+
 def fields_to_form(fields):
     field_mapping = {}
     for name, field in fields.items():
@@ -19,7 +19,7 @@ app.conf.timezone = "UTC"
 app.conf.broker_connection_retry_on_startup = True
 app.conf.result_expires = 259200  # 3 days in seconds
 
-app.conf.task_routes = {
+TASK_ROUTES = {
     "mail.tasks.send_email_task": {"queue": "email"},
     "notes.tasks.smart_linker_task": {"queue": "notes"},
     "notes.tasks.entry_class_creation_task": {"queue": "notes"},
@@ -32,11 +32,15 @@ app.conf.task_routes = {
     "entries.tasks.remap_notes_task": {"queue": "notes"},
     "entries.tasks.simulate_graph": {"queue": "graph"},
     "entries.tasks.refresh_edges_materialized_view": {"queue": "graph"},
+    "knowledge_graph.tasks.rebuild_related_index_task": {"queue": "graph"},
     "publish.tasks.generate_report": {"queue": "publish"},
     "publish.tasks.edit_report": {"queue": "publish"},
     "publish.tasks.import_json_report": {"queue": "import"},
     "publish.tasks.download_file_for_note": {"queue": "import"},
     "notes.tasks.propagate_acvec": {"queue": "access"},
+    "logs.tasks.propagate_log": {"queue": "logs"},
+    "logs.tasks.flush_fetch_logs_task": {"queue": "logs"},
+    "logs.tasks.maintain_log_partitions": {"queue": "logs"},
     "intelio.tasks.core.propagate_acvec": {"queue": "access"},
     "entries.tasks.update_accesses": {"queue": "access"},
     "entries.tasks.scan_for_children": {"queue": "enrich"},
@@ -53,7 +57,7 @@ app.conf.task_routes = {
 app.conf.task_default_priority = 5
 app.conf.task_send_sent_event = True
 
-app.conf.task_routes.update(
+TASK_ROUTES.update(
     {
         "send_email_task": {
             "queue": "email",
@@ -66,6 +70,19 @@ app.conf.task_routes.update(
     },
 )
 
+
+def route_by_lane(name, args, kwargs, options, task=None, **kw):
+    """
+    Send bulk work, e.g. digests and management actions, to the bulk lane of
+    its queue. See `core.lanes`.
+    """
+    from core.lanes import bulk_route
+
+    return bulk_route(name, TASK_ROUTES.get(name))
+
+
+app.conf.task_routes = (route_by_lane, TASK_ROUTES)
+
 app.conf.task_time_limit = 30 * 60
 app.conf.task_soft_time_limit = 15 * 60
 
@@ -81,16 +98,29 @@ app.conf.beat_schedule = {
         "schedule": crontab(hour=3, minute=0),
         "kwargs": {
             "simulate": True,
+            "full_layout": True,
         },
     },
+    "rebuild-related-index-every-night": {
+        "task": "knowledge_graph.tasks.rebuild_related_index_task",
+        "schedule": crontab(hour=3, minute=30),
+    },
     "delete-hanging-artifacts-every-night": {
         "task": "entries.tasks.delete_hanging_artifacts",
         "schedule": crontab(hour=2, minute=0),
     },
     "delete-hanging-files-every-night": {
-        "task": "entries.tasks.delete_hanging_artifacts",
+        "task": "file_transfer.tasks.delete_hanging_files",
         "schedule": crontab(hour=2, minute=0),
     },
+    "maintain-log-partitions-every-night": {
+        "task": "logs.tasks.maintain_log_partitions",
+        "schedule": crontab(hour=1, minute=0),
+    },
+    "flush-fetch-logs-minutely": {
+        "task": "logs.tasks.flush_fetch_logs_task",
+        "schedule": crontab(minute="*/1"),
+    },
     "enrich_periodic-check-minutely": {
         "task": "intelio.tasks.core.enrich_periodic",
         "schedule": crontab(minute="*/1"),
@@ -45,6 +45,15 @@ EMAIL_HOST_PASSWORD = None
 EMAIL_USE_TLS = True
 USE_SILK = False
 
+# Fail the tests of these endpoints when a request runs more queries, so
+# per-row queries are caught before they reach production
+QUERY_BUDGET_STRICT = True
+QUERY_BUDGETS = {
+    "graph_fetch": 50,
+    "note_list": 50,
+    "entry_class_list": 50,
+}
+
 
 DEFAULT_SETTINGS = {
     "users": {
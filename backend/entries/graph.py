@@ -0,0 +1,22 @@
+from core.utils import get_redis_client
+
+GRAPH_VERSION_KEY = "graph:version"
+
+
+def get_graph_version() -> int:
+    """
+    The version of the edges materialized view. Anything derived from the
+    view can be cached under this version.
+    """
+    redis_client = get_redis_client()
+    value = redis_client.get(GRAPH_VERSION_KEY)
+    return int(value) if value else 0
+
+
+def bump_graph_version() -> int:
+    """
+    Mark every cache derived from the edges materialized view as stale,
+    called after each refresh of the view.
+    """
+    redis_client = get_redis_client()
+    return redis_client.incr(GRAPH_VERSION_KEY)
@@ -0,0 +1,267 @@
+import io
+
+import numpy as np
+from django.db import connection, transaction
+
+FETCH_SIZE = 50000
+REPULSION_BLOCK_SIZE = 1 << 20
+
+
+def fetch_array(sql, columns, dtype, params=None):
+    """
+    Run a query through a server-side cursor and stack its rows into an array.
+
+    NULL values become NaN, so they are only allowed for float arrays.
+    """
+    chunks = []
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(FETCH_SIZE):
+            chunks.append(np.array(rows, dtype=dtype))
+
+    if not chunks:
+        return np.empty((0, columns), dtype=dtype)
+    return np.concatenate(chunks)
+
+
+def index_edges(ids, pairs):
+    """
+    Map (src, dst) pairs of entry ids to pairs of indices into the sorted
+    `ids` array, dropping the pairs whose ends are not in it.
+    """
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    if len(ids) == 0:
+        return np.empty((0, 2), dtype=np.int64)
+
+    indices = np.minimum(np.searchsorted(ids, pairs), len(ids) - 1)
+    valid = (ids[indices] == pairs).all(axis=1)
+    return indices[valid]
+
+
+def load_graph():
+    """
+    Load the whole graph as flat arrays.
+
+    Returns:
+        The sorted entry ids, an (n, 2) array of their positions with NaN
+        rows for entries without a location, and an (m, 2) array of index
+        pairs, one per undirected edge.
+    """
+    nodes = fetch_array(
+        "SELECT id, ST_X(location), ST_Y(location) FROM entries_entry ORDER BY id",
+        3,
+        float,
+    )
+    pairs = fetch_array(
+        "SELECT DISTINCT src, dst FROM edges WHERE src < dst", 2, np.int64
+    )
+
+    ids = nodes[:, 0].astype(np.int64)
+    return ids, nodes[:, 1:], index_edges(ids, pairs)
+
+
+def store_positions(ids, positions, previous=None, tolerance=1e-6):
+    """
+    Write positions back for the entries which moved by more than `tolerance`
+    since `previous`, or had no position before.
+
+    The rows are copied into a temporary table and applied with a single
+    UPDATE ... FROM.
+
+    Returns:
+        The number of entries which were updated.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    positions = np.asarray(positions, dtype=float)
+
+    if previous is None:
+        moved = np.ones(len(ids), dtype=bool)
+    else:
+        moved = ~(np.abs(positions - previous) <= tolerance).all(axis=1)
+
+    if not moved.any():
+        return 0
+
+    buffer = io.StringIO()
+    for entry_id, (x, y) in zip(ids[moved].tolist(), positions[moved].tolist()):
+        buffer.write(f"{entry_id}\t{x!r}\t{y!r}\n")
+    buffer.seek(0)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("DROP TABLE IF EXISTS layout_positions")
+        cursor.execute(
+            "CREATE TEMPORARY TABLE layout_positions "
+            "(id bigint PRIMARY KEY, x double precision, y double precision) "
+            "ON COMMIT DROP"
+        )
+        cursor.copy_expert("COPY layout_positions (id, x, y) FROM STDIN", buffer)
+        cursor.execute(
+            "UPDATE entries_entry AS e "
+            "SET location = ST_SetSRID(ST_MakePoint(p.x, p.y), 0) "
+            "FROM layout_positions AS p WHERE e.id = p.id"
+        )
+        return cursor.rowcount
+
+
+def scale_positions(coords, extent=2000):
+    """
+    Scale coordinates to fit in [-extent, extent] on both axes.
+    """
+    coords = np.asarray(coords, dtype=float)
+    if len(coords) == 0:
+        return coords
+
+    min_vals = coords.min(axis=0)
+    max_vals = coords.max(axis=0)
+
+    # Prevent division by zero by setting range to 1 where min == max
+    ranges = np.where(max_vals - min_vals == 0, 1, max_vals - min_vals)
+
+    return (coords - min_vals) / ranges * (2 * extent) - extent
+
+
+def place_nodes(positions, placed, edges, spread, rng=None):
+    """
+    Give every unplaced node a starting position next to its placed neighbours.
+
+    Nodes are placed in waves: a node whose neighbours are placed goes to their
+    centroid, plus some jitter so siblings do not overlap, and becomes an anchor
+    for the next wave. Nodes with no path to a placed node are scattered around
+    the centroid of the placed ones.
+
+    Args:
+        positions: (n, 2) array of coordinates, rows of unplaced nodes are ignored
+        placed: (n,) boolean array, True for nodes with a known position
+        edges: (m, 2) array of node indices
+        spread: Magnitude of the jitter, usually the ideal edge length
+        rng: Optional numpy random generator
+
+    Returns:
+        The completed (n, 2) positions array.
+    """
+    rng = rng or np.random.default_rng()
+    positions = np.array(positions, dtype=float)
+    placed = np.array(placed, dtype=bool)
+    edges = np.asarray(edges, dtype=int).reshape(-1, 2)
+    n = len(positions)
+
+    if n == 0:
+        return positions
+
+    src = np.concatenate([edges[:, 0], edges[:, 1]])
+    dst = np.concatenate([edges[:, 1], edges[:, 0]])
+
+    while not placed.all():
+        usable = placed[dst] & ~placed[src]
+        if not usable.any():
+            break
+
+        sums = np.zeros((n, 2))
+        counts = np.zeros(n)
+        np.add.at(sums, src[usable], positions[dst[usable]])
+        np.add.at(counts, src[usable], 1)
+
+        wave = counts > 0
+        positions[wave] = sums[wave] / counts[wave, None] + rng.normal(
+            0, spread / 2, size=(wave.sum(), 2)
+        )
+        placed |= wave
+
+    if not placed.all():
+        center = positions[placed].mean(axis=0) if placed.any() else np.zeros(2)
+        positions[~placed] = center + rng.normal(
+            0, spread * 2, size=((~placed).sum(), 2)
+        )
+
+    return positions
+
+
+def repulsion(positions, moving, k2):
+    """
+    The repulsive displacement of the `moving` nodes from every node.
+
+    The pairwise distances are computed for blocks of moving nodes, so at most
+    `REPULSION_BLOCK_SIZE` pairs are held at once however many anchors the
+    subgraph has.
+    """
+    rows = max(1, REPULSION_BLOCK_SIZE // len(positions))
+    displacement = np.empty((len(moving), 2))
+
+    for start in range(0, len(moving), rows):
+        block = moving[start : start + rows]
+        delta = positions[block, None, :] - positions[None, :, :]
+        distance2 = np.maximum((delta**2).sum(axis=-1), 1e-9 * k2)
+        displacement[start : start + rows] = (
+            delta * (k2 / distance2)[..., None]
+        ).sum(axis=1)
+
+    return displacement
+
+
+def relax_layout(positions, movable, edges, edge_length, iterations):
+    """
+    Run a bounded Fruchterman-Reingold relaxation on a subgraph.
+
+    Only the movable nodes are displaced, the others act as fixed anchors
+    which keep the subgraph consistent with the rest of the layout. The
+    maximum displacement per step starts at `edge_length` and cools linearly.
+
+    Args:
+        positions: (n, 2) array of starting coordinates
+        movable: (n,) boolean array, True for nodes which may move
+        edges: (m, 2) array of node indices
+        edge_length: Ideal distance between connected nodes
+        iterations: Number of relaxation steps
+
+    Returns:
+        The relaxed (n, 2) positions array.
+    """
+    positions = np.array(positions, dtype=float)
+    movable = np.array(movable, dtype=bool)
+    edges = np.asarray(edges, dtype=int).reshape(-1, 2)
+
+    if not movable.any() or iterations <= 0:
+        return positions
+
+    k = float(edge_length)
+    k2 = k * k
+    moving = np.flatnonzero(movable)
+
+    for step in range(iterations):
+        temperature = k * (1 - step / iterations)
+
+        # Repulsion between every movable node and every node of the subgraph
+        displacement = repulsion(positions, moving, k2)
+
+        # Attraction along edges, towards the other end
+        forces = np.zeros_like(positions)
+        if len(edges):
+            edge_delta = positions[edges[:, 1]] - positions[edges[:, 0]]
+            edge_length_now = np.sqrt((edge_delta**2).sum(axis=1))[:, None]
+            pull = edge_delta * edge_length_now / k
+            np.add.at(forces, edges[:, 0], pull)
+            np.add.at(forces, edges[:, 1], -pull)
+        displacement += forces[moving]
+
+        norm = np.sqrt((displacement**2).sum(axis=1))[:, None]
+        scale = np.minimum(norm, temperature) / np.maximum(norm, 1e-9)
+        positions[moving] += displacement * scale
+
+    return positions
+
+
+def typical_edge_length(positions, placed, edges, default):
+    """
+    The median length of the edges whose ends both have a known position,
+    or `default` when there are none.
+    """
+    edges = np.asarray(edges, dtype=int).reshape(-1, 2)
+    known = np.asarray(placed, dtype=bool)
+    edges = edges[known[edges[:, 0]] & known[edges[:, 1]]]
+
+    if len(edges) == 0:
+        return default
+
+    lengths = np.sqrt(((positions[edges[:, 0]] - positions[edges[:, 1]]) ** 2).sum(1))
+    lengths = lengths[lengths > 0]
+    return float(np.median(lengths)) if len(lengths) else default
@@ -1,4 +1,5 @@
 from django.core.management.base import BaseCommand
+from entries.models import AliasClosure
 from entries.tasks import refresh_edges_materialized_view
 from entries.tasks import simulate_graph
 
@@ -6,9 +7,12 @@ from entries.tasks import simulate_graph
 class Command(BaseCommand):
     def handle(self, *args, **options):
         """
-        Recreates the materialized view and refreshes the edge positions
+        Rebuilds the alias groups, recreates the materialized view and
+        refreshes the edge positions
         """
-        refresh = refresh_edges_materialized_view.si()
+        AliasClosure.objects.rebuild()
+
+        refresh = refresh_edges_materialized_view.si().set(force=True)
         simulate = simulate_graph.si()
 
         group = refresh | simulate
@@ -1,15 +1,19 @@
 from django.apps import apps
 from django.db import models
+from django.contrib.postgres.fields import DateTimeRangeField
+from django.db import connection, transaction
+from django.db.models import Func, Max, Subquery, Value
+from django.db.models.functions import Greatest, Least
+from psycopg2.extras import DateTimeTZRange
 from django.db.models.expressions import F
 from django.db.models.query_utils import Q
 
 from user.models import CradleUser
 
-from .enums import EntryType
+from .enums import EntryType, RelationReason
 
-from core.fields import BitStringField
-
-fieldtype = BitStringField(max_length=2048, null=False, default=1, varying=False)
+from core.fields import NO_ACCESS_OFFSET, AccessVectorField
+from core.utils import DisjointSet, chunked
 
 
 class EntryQuerySet(models.QuerySet):
@@ -60,10 +64,10 @@ class RelationQuerySet(models.QuerySet):
         """
         Filter all relations accessible to a user
         """
-        return self.extra(
-            where=["(access_vector & %s) = %s"],
-            params=[user.access_vector_inv, fieldtype.get_prep_value(0)],
-        )
+        if user.is_cradle_admin:
+            return self
+
+        return self.filter(access_vector__accessible_by=user.access_vector)
 
 
 class EdgeQuerySet(models.QuerySet):
@@ -71,14 +75,35 @@ class EdgeQuerySet(models.QuerySet):
         """
         Filter all relations accessible to a user
         """
-        return self.extra(
-            where=["(access_vector & %s) = %s"],
-            params=[user.access_vector_inv, fieldtype.get_prep_value(0)],
-        )
+        if user.is_cradle_admin:
+            return self
+
+        return self.filter(access_vector__accessible_by=user.access_vector)
 
     def remove_mirrors(self) -> models.QuerySet:
         return self.filter(src__lt=F("dst"))
 
+    def active_between(self, start=None, end=None) -> models.QuerySet:
+        """
+        Filter the edges whose activity, from creation to when they were last
+        seen, overlaps the given window. Either bound may be left open.
+
+        The range expression matches the idx_edges_active GiST index. Its
+        bounds are ordered, as an edge may be last seen before it was created.
+        """
+        if start is None and end is None:
+            return self
+
+        return self.annotate(
+            active=Func(
+                Least(F("created_at"), F("last_seen")),
+                Greatest(F("created_at"), F("last_seen")),
+                Value("[]"),
+                function="tstzrange",
+                output_field=DateTimeRangeField(),
+            )
+        ).filter(active__overlap=DateTimeTZRange(start, end, "[]"))
+
 
 class EntryManager(models.Manager):
     def get_queryset(self):
@@ -201,3 +226,160 @@ class EdgeManager(models.Manager):
 
     def remove_mirrors(self) -> models.QuerySet:
         return self.get_queryset().remove_mirrors()
+
+    def active_between(self, start=None, end=None) -> models.QuerySet:
+        return self.get_queryset().active_between(start, end)
+
+
+class EntitySlotManager(models.Manager):
+    def acquire(self) -> int | None:
+        """
+        Reserve the lowest free access vector slot, adding more slots when
+        all of them are taken.
+
+        The slot row stays locked until the surrounding transaction commits,
+        concurrent allocations skip it instead of waiting on it.
+
+        Returns:
+            The reserved offset, or None if there are no free slots
+        """
+        offset = self.first_free()
+
+        if offset is None:
+            self.extend()
+            offset = self.first_free()
+
+        return offset
+
+    def first_free(self) -> int | None:
+        return (
+            self.select_for_update(skip_locked=True)
+            .filter(entity__isnull=True)
+            .order_by("offset")
+            .values_list("offset", flat=True)
+            .first()
+        )
+
+    def extend(self, count: int = 1024) -> None:
+        """
+        Append `count` free slots after the highest existing one, never
+        handing out the reserved no-access offset.
+        """
+        last = self.aggregate(last=Max("offset"))["last"] or 0
+        start = max(last, NO_ACCESS_OFFSET) + 1
+
+        self.bulk_create(
+            [self.model(offset=offset) for offset in range(start, start + count)],
+            ignore_conflicts=True,
+        )
+
+
+class AliasClosureManager(models.Manager):
+    def group(self, entry_id) -> models.QuerySet:
+        """
+        Ids of the entries in the alias group of an entry, empty when the
+        entry has no aliases.
+        """
+        canonical = self.filter(entry_id=entry_id).values("canonical")[:1]
+        return self.filter(canonical=Subquery(canonical)).values_list(
+            "entry_id", flat=True
+        )
+
+    def reachable(self, entry_id, user: CradleUser) -> list:
+        """
+        Ids of the entries reachable from an entry over the alias relations
+        the user can access, the entry included.
+
+        The alias group holds every alias of the entry, but some of the
+        relations joining them may be hidden from the user, so the relations
+        are walked from the entry with a recursive query.
+        """
+        Relation = apps.get_model("entries", "Relation")
+
+        access, params = "", [entry_id, RelationReason.ALIAS]
+        if not user.is_cradle_admin:
+            access = "AND r.access_vector <@ %s::integer[]"
+            params.append(AccessVectorField.to_offsets(user.access_vector))
+
+        sql = f"""
+            WITH RECURSIVE reached(id) AS (
+                SELECT %s::bigint
+                UNION
+                SELECT CASE WHEN r.e1_id = reached.id THEN r.e2_id ELSE r.e1_id END
+                FROM reached
+                JOIN {Relation._meta.db_table} r
+                    ON r.e1_id = reached.id OR r.e2_id = reached.id
+                WHERE r.reason = %s {access}
+            )
+            SELECT id FROM reached
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+    def alias_pairs(self, entry_ids=None) -> models.QuerySet:
+        Relation = apps.get_model("entries", "Relation")
+
+        relations = Relation.objects.filter(reason=RelationReason.ALIAS)
+        if entry_ids is not None:
+            relations = relations.filter(
+                Q(e1_id__in=entry_ids) | Q(e2_id__in=entry_ids)
+            )
+
+        return relations.values_list("e1_id", "e2_id").distinct()
+
+    def components(self, pairs) -> list:
+        """
+        Closure rows for the connected components of the given alias pairs.
+        """
+        groups = DisjointSet()
+        for a, b in pairs:
+            groups.union(a, b)
+
+        return [
+            self.model(entry_id=entry_id, canonical=canonical)
+            for entry_id, canonical in groups.roots()
+        ]
+
+    def refresh(self, entry_ids) -> None:
+        """
+        Recompute the alias groups containing the given entries, after their
+        alias relations were added or removed.
+
+        Groups may merge or split, so every entry reachable through alias
+        relations from the entries or their previous groups is recomputed.
+        """
+        entry_ids = set(entry_ids)
+        previous = self.filter(
+            canonical__in=self.filter(entry_id__in=entry_ids).values("canonical")
+        ).values_list("entry_id", flat=True)
+
+        members = entry_ids | set(previous)
+        frontier = set(members)
+        pairs = set()
+
+        while frontier:
+            found = set()
+            for chunk in chunked(frontier, 1000):
+                for a, b in self.alias_pairs(chunk):
+                    pairs.add((a, b))
+                    found.update((a, b))
+
+            frontier = found - members
+            members |= frontier
+
+        with transaction.atomic():
+            for chunk in chunked(members, 1000):
+                self.filter(entry_id__in=chunk).delete()
+            self.bulk_create(self.components(pairs), batch_size=1000)
+
+    def rebuild(self) -> None:
+        """
+        Recompute every alias group from the alias relations.
+        """
+        rows = self.components(self.alias_pairs().iterator(chunk_size=5000))
+
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(rows, batch_size=1000)
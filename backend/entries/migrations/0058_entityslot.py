@@ -0,0 +1,62 @@
+# Generated by Django 5.0.4 on 2026-10-19 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Offset 2047 is the "no access" bit notes and relations default to
+RESERVED_OFFSET = 2047
+
+
+def populate_slots(apps, schema_editor):
+    Entry = apps.get_model("entries", "Entry")
+    EntitySlot = apps.get_model("entries", "EntitySlot")
+
+    taken = dict(
+        Entry.objects.exclude(acvec_offset=0).values_list("acvec_offset", "id")
+    )
+
+    EntitySlot.objects.bulk_create(
+        [
+            EntitySlot(offset=offset, entity_id=taken.get(offset))
+            for offset in range(1, RESERVED_OFFSET)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("entries", "0057_add_performance_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EntitySlot",
+            fields=[
+                (
+                    "offset",
+                    models.PositiveIntegerField(primary_key=True, serialize=False),
+                ),
+                (
+                    "entity",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="access_slot",
+                        to="entries.entry",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("entity__isnull", True)),
+                        fields=["offset"],
+                        name="entity_slot_free_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_slots, migrations.RunPython.noop),
+    ]
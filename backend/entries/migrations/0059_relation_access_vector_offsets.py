@@ -0,0 +1,127 @@
+# Generated by Django 5.0.4 on 2026-10-19 11:03
+
+import core.fields
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+EDGES_VIEW = """
+CREATE MATERIALIZED VIEW edges AS
+(
+    SELECT
+        ((e1_id::bigint << 32) | e2_id::bigint) AS id,
+        e1_id AS src,
+        e2_id AS dst,
+        ACVEC_AND(access_vector) AS access_vector,
+        BOOL_OR(virtual) AS virtual,
+        MIN(created_at) AS created_at,
+        MAX(last_seen) AS last_seen,
+        EXTRACT(EPOCH FROM (now() - MAX(last_seen))) AS age
+    FROM entries_relation
+    GROUP BY e1_id, e2_id
+)
+UNION ALL
+(
+    SELECT
+        ((e2_id::bigint << 32) | e1_id::bigint) AS id,
+        e2_id AS src,
+        e1_id AS dst,
+        ACVEC_AND(access_vector) AS access_vector,
+        BOOL_OR(virtual) AS virtual,
+        MIN(created_at) AS created_at,
+        MAX(last_seen) AS last_seen,
+        EXTRACT(EPOCH FROM (now() - MAX(last_seen))) AS age
+    FROM entries_relation
+    GROUP BY e1_id, e2_id
+);
+"""
+
+EDGES_INDEXES = """
+CREATE UNIQUE INDEX idx_edges_id ON edges(id);
+CREATE INDEX idx_edges_src ON edges(src);
+CREATE INDEX idx_edges_dst ON edges(dst);
+CREATE INDEX idx_edges_created_at ON edges(created_at);
+CREATE INDEX idx_edges_last_seen ON edges(last_seen);
+CREATE INDEX idx_edges_src_lt_dst ON edges(src, dst, created_at, last_seen)
+  WHERE src < dst;
+CREATE INDEX idx_edges_access_vector ON edges USING gin (access_vector);
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("entries", "0058_entityslot"),
+    ]
+
+    operations = [
+        # Helpers for converting bit(2048) vectors and intersecting offset arrays
+        migrations.RunSQL(
+            sql="""
+            CREATE OR REPLACE FUNCTION acvec_offsets(v bit varying)
+            RETURNS integer[]
+            LANGUAGE sql IMMUTABLE STRICT
+            AS $$
+                SELECT COALESCE(array_agg(length(v) - 1 - i ORDER BY i DESC), '{}')
+                FROM generate_series(0, length(v) - 2) AS i
+                WHERE get_bit(v, i) = 1
+            $$;
+
+            CREATE OR REPLACE FUNCTION acvec_intersect(a integer[], b integer[])
+            RETURNS integer[]
+            LANGUAGE sql IMMUTABLE
+            AS $$
+                SELECT CASE
+                    WHEN a IS NULL THEN b
+                    ELSE ARRAY(SELECT unnest(a) INTERSECT SELECT unnest(b) ORDER BY 1)
+                END
+            $$;
+
+            CREATE AGGREGATE acvec_and(integer[]) (
+                SFUNC = acvec_intersect,
+                STYPE = integer[]
+            );
+            """,
+            reverse_sql="""
+            DROP AGGREGATE IF EXISTS acvec_and(integer[]);
+            DROP FUNCTION IF EXISTS acvec_intersect(integer[], integer[]);
+            DROP FUNCTION IF EXISTS acvec_offsets(bit varying);
+            """,
+        ),
+        # The view depends on the column being converted
+        migrations.RunSQL(
+            sql="DROP MATERIALIZED VIEW IF EXISTS edges;",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql="""
+                    ALTER TABLE entries_relation
+                        ALTER COLUMN access_vector TYPE integer[]
+                        USING acvec_offsets(access_vector);
+                    """,
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="relation",
+                    name="access_vector",
+                    field=core.fields.AccessVectorField(default=1 << 2047),
+                ),
+                migrations.AlterField(
+                    model_name="edge",
+                    name="access_vector",
+                    field=core.fields.AccessVectorField(default=1 << 2047),
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            sql=EDGES_VIEW + EDGES_INDEXES,
+            reverse_sql="DROP MATERIALIZED VIEW IF EXISTS edges;",
+        ),
+        migrations.AddIndex(
+            model_name="relation",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["access_vector"], name="relation_acvec_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+ALIAS_REASON = "alias"
+
+
+class DisjointSet:
+    """
+    Union-find over entry ids, each set is represented by its smallest id.
+    A copy of core.utils.DisjointSet, so the migration does not depend on it.
+    """
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        self.parent.setdefault(item, item)
+
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+
+        while item != root:
+            self.parent[item], item = root, self.parent[item]
+
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def roots(self):
+        for item in list(self.parent):
+            yield item, self.find(item)
+
+
+def populate_closure(apps, schema_editor):
+    Relation = apps.get_model("entries", "Relation")
+    AliasClosure = apps.get_model("entries", "AliasClosure")
+
+    groups = DisjointSet()
+    pairs = (
+        Relation.objects.filter(reason=ALIAS_REASON)
+        .values_list("e1_id", "e2_id")
+        .distinct()
+    )
+    for a, b in pairs.iterator(chunk_size=5000):
+        groups.union(a, b)
+
+    AliasClosure.objects.bulk_create(
+        [
+            AliasClosure(entry_id=entry_id, canonical=canonical)
+            for entry_id, canonical in groups.roots()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("entries", "0059_relation_access_vector_offsets"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AliasClosure",
+            fields=[
+                (
+                    "entry",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="alias_closure",
+                        serialize=False,
+                        to="entries.entry",
+                    ),
+                ),
+                ("canonical", models.BigIntegerField(db_index=True)),
+            ],
+        ),
+        migrations.RunPython(populate_closure, migrations.RunPython.noop),
+    ]
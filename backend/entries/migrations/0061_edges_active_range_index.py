@@ -0,0 +1,25 @@
+# Generated by Django 5.0.4 on 2026-10-19 16:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("entries", "0060_aliasclosure"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX IF NOT EXISTS idx_edges_active ON edges
+              USING gist (
+                tstzrange(
+                    LEAST(created_at, last_seen),
+                    GREATEST(created_at, last_seen),
+                    '[]'
+                )
+              );
+            """,
+            reverse_sql="DROP INDEX IF EXISTS idx_edges_active;",
+        ),
+    ]
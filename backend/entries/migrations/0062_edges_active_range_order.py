@@ -0,0 +1,29 @@
+# Generated by Django 5.0.4 on 2026-10-19 18:20
+
+from django.db import migrations
+
+# Relations may be last seen before they were created, e.g. digests of reports
+# dated in the future, so the bounds are ordered before building the range
+ACTIVE_INDEX = """
+CREATE INDEX idx_edges_active ON edges
+  USING gist (
+    tstzrange(
+        LEAST(created_at, last_seen),
+        GREATEST(created_at, last_seen),
+        '[]'
+    )
+  );
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("entries", "0061_edges_active_range_index"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="DROP INDEX IF EXISTS idx_edges_active;" + ACTIVE_INDEX,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
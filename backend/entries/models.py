@@ -2,10 +2,11 @@ import re
 import uuid
 from typing import Optional
 
-from core.fields import BitStringField
+from core.fields import NO_ACCESS_OFFSET, AccessVectorField
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.gis.db import models as gis_models
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.db.models import Q
 from django.utils import timezone
@@ -24,15 +25,15 @@ from .exceptions import (
     OutOfEntitySlotsException,
 )
 from .managers import (
+    AliasClosureManager,
     ArtifactManager,
     EdgeManager,
     EntityManager,
+    EntitySlotManager,
     EntryManager,
     RelationManager,
 )
 
-fieldtype = BitStringField(max_length=2048, null=False, default=1, varying=False)
-
 
 class Edge(LifecycleModel):
     id = models.CharField(primary_key=True)
@@ -41,8 +42,8 @@ class Edge(LifecycleModel):
 
     objects = EdgeManager()
 
-    access_vector: BitStringField = BitStringField(
-        max_length=2048, null=False, default=1 << 2047, varying=False
+    access_vector: AccessVectorField = AccessVectorField(
+        null=False, default=1 << NO_ACCESS_OFFSET
     )
 
     created_at = models.DateTimeField()
@@ -229,6 +230,8 @@ class EntryClass(LifecycleModelMixin, models.Model, LoggableModelMixin):
 
 
 class Entry(LifecycleModel, LoggableModelMixin):
+    propagation_select_related = ("entry_class",)
+
     id = models.BigAutoField(primary_key=True)
     is_public: models.BooleanField = models.BooleanField(default=False)
 
@@ -304,8 +307,20 @@ class Entry(LifecycleModel, LoggableModelMixin):
         if not self.entry_class.validate_text(self.name):
             raise InvalidEntryException(self.entry_class.subtype, self.name)
 
-        self.setup_access()
-        return super().save(*args, **kwargs)
+        adding = self._state.adding
+        previous_offset = 0 if adding else self.initial_value("acvec_offset")
+
+        with transaction.atomic():
+            self.setup_access()
+            result = super().save(*args, **kwargs)
+
+            update_fields = kwargs.get("update_fields")
+            offset_saved = update_fields is None or "acvec_offset" in update_fields
+
+            if offset_saved and (adding or self.acvec_offset != previous_offset):
+                self.sync_access_slot()
+
+        return result
 
     def setup_access(self):
         # Artifacts and public entities have public access
@@ -315,18 +330,22 @@ class Entry(LifecycleModel, LoggableModelMixin):
 
         elif self.acvec_offset == 0:
             if self.entry_class.type == EntryType.ENTITY:
-                existing_offsets = set(
-                    self.__class__.objects.exclude(acvec_offset=0).values_list(
-                        "acvec_offset", flat=True
-                    )
-                )
-                offset = 1
-                while offset in existing_offsets:
-                    offset += 1
+                offset = EntitySlot.objects.acquire()
+                if offset is None:
+                    raise OutOfEntitySlotsException()
                 self.acvec_offset = offset
 
-        if self.acvec_offset > 2047:
-            raise OutOfEntitySlotsException()
+    def sync_access_slot(self):
+        """
+        Point the slot table at the current offset of this entry, releasing
+        the slot it held before, if any.
+        """
+        EntitySlot.objects.filter(entity=self).exclude(
+            offset=self.acvec_offset
+        ).update(entity=None)
+
+        if self.acvec_offset != 0:
+            EntitySlot.objects.filter(offset=self.acvec_offset).update(entity=self)
 
     def delete_renaming(self, user_id: str, *args, **kwargs):
         from django.db import transaction
@@ -355,7 +374,7 @@ class Entry(LifecycleModel, LoggableModelMixin):
 
     def propagate_from(self, log):
         if self.entry_class.type == EntryType.ENTITY:
-            super().propagate_from(log)
+            return super().propagate_from(log)
 
     def log_create(self, user):
         super().log_create(user)
@@ -385,11 +404,13 @@ class Entry(LifecycleModel, LoggableModelMixin):
             strategy=EnrichmentStrategy.ON_CREATE, enabled=True
         ):
             enrich_entries.apply_async(
-                e.id,
-                [self.id],
-                content_type.id,
-                self.id,
-                None,
+                (
+                    e.id,
+                    [self.id],
+                    content_type.id,
+                    self.id,
+                    None,
+                )
             )
 
     def get_acvec(self):
@@ -410,20 +431,91 @@ class Entry(LifecycleModel, LoggableModelMixin):
                 virtual=True,
             )
 
+        AliasClosure.objects.refresh(
+            [self.id, *self.aliases.values_list("id", flat=True)]
+        )
+
     def aliasqs(self, user):
-        rels = (
+        """
+        This entry, the entries it has a virtual relation to, e.g. through an
+        alias, a note or an enrichment, and the entries transitively aliased
+        to it.
+
+        Only relations the user can access count, so an alias is only kept
+        when the user can follow the aliases leading to it from this entry.
+        Entities the user cannot access are left out.
+        """
+        direct = (
             Edge.objects.accessible(user)
-            .filter(
-                src=self.id,
-                virtual=True,
-            )
-            .values_list("dst", flat=True)
+            .filter(src=self.id, virtual=True)
+            .values("dst")
         )
+        aliased = AliasClosure.objects.reachable(self.id, user)
+
+        qs = Entry.objects.filter(Q(id__in=aliased) | Q(id__in=direct))
+
+        if not user.is_cradle_admin:
+            qs = qs.filter(
+                Q(id=self.id)
+                | ~Q(entry_class__type=EntryType.ENTITY)
+                | Q(is_public=True)
+                | Q(acvec_offset__in=AccessVectorField.to_offsets(user.access_vector))
+            )
 
-        qs = Entry.objects.filter(Q(id__in=rels) | Q(id=self.id)).distinct()
         return qs
 
 
+class EntitySlot(models.Model):
+    """
+    An offset in the access vectors which can be assigned to an entity.
+
+    Free slots are the rows without an entity, so allocating one is a single
+    index lookup and deleting the entity recycles its slot.
+    """
+
+    offset: models.PositiveIntegerField = models.PositiveIntegerField(
+        primary_key=True
+    )
+    entity: models.OneToOneField = models.OneToOneField(
+        Entry,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="access_slot",
+    )
+
+    objects = EntitySlotManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["offset"],
+                condition=Q(entity__isnull=True),
+                name="entity_slot_free_idx",
+            ),
+        ]
+
+
+class AliasClosure(models.Model):
+    """
+    The alias group of an entry, as the smallest entry id in the group.
+
+    Groups are the connected components of the alias relations, so expanding
+    an entry to its transitive aliases is a single indexed lookup. Entries
+    without aliases have no row.
+    """
+
+    entry: models.OneToOneField = models.OneToOneField(
+        Entry,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="alias_closure",
+    )
+    canonical: models.BigIntegerField = models.BigIntegerField(db_index=True)
+
+    objects = AliasClosureManager()
+
+
 class Relation(LifecycleModel):
     """
     A model representing a generic link between two entries.
@@ -431,8 +523,8 @@ class Relation(LifecycleModel):
 
     id: models.UUIDField = models.UUIDField(primary_key=True, default=uuid.uuid4)
 
-    access_vector: BitStringField = BitStringField(
-        max_length=2048, null=False, default=1 << 2047, varying=False
+    access_vector: AccessVectorField = AccessVectorField(
+        null=False, default=1 << NO_ACCESS_OFFSET
     )
 
     inherit_av = models.BooleanField(default=False)
@@ -464,6 +556,9 @@ class Relation(LifecycleModel):
 
     class Meta:
         ordering = ["-last_seen"]
+        indexes = [
+            GinIndex(fields=["access_vector"], name="relation_acvec_gin"),
+        ]
 
     def __str__(self):
         return f"Relation [{self.reason}]({self.e1}-{self.e2}) "
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .enums import RelationReason
+from .models import AliasClosure, Relation
+
+
+@receiver(post_delete, sender=Relation)
+def refresh_aliases_of_deleted_relation(sender, instance, **kwargs):
+    """
+    Removing an alias relation may split its alias group, whether it is
+    deleted on its own or along with its entries or note. The group is
+    refreshed once the deletion is committed.
+    """
+    if instance.reason != RelationReason.ALIAS:
+        return
+
+    aliases = {instance.e1_id, instance.e2_id}
+    transaction.on_commit(lambda: AliasClosure.objects.refresh(aliases))
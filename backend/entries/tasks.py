@@ -1,19 +1,28 @@
 import numpy as np
-from celery import group, shared_task
-from core.decorators import debounce_task, distributed_lock
+from celery import shared_task
+from core.decorators import coalesce_task, distributed_lock
+from core.utils import chunked
 from django.contrib.contenttypes.models import ContentType
-from django.contrib.gis.geos import Point
 from django.db import connection, transaction
-from intelio.tasks import propagate_acvec as propagate_digest_acvec
+from django.db.models import Q
+from intelio.models.base import BaseDigest
+from knowledge_graph.related import mark_notes_changed
 from management.settings import cradle_settings
 from notes.markdown.to_markdown import remap_links
 from notes.models import Note
 from notes.processor.task_scheduler import TaskScheduler
-from notes.tasks import propagate_acvec
-from notes.utils import calculate_acvec
 from user.models import CradleUser
 
-from entries.enums import EntryType, RelationReason
+from entries.enums import RelationReason
+from entries.graph import bump_graph_version
+from entries.layout import (
+    load_graph,
+    place_nodes,
+    relax_layout,
+    scale_positions,
+    store_positions,
+    typical_edge_length,
+)
 from entries.models import Edge, Entry, Relation
 
 # import networkx as nx
@@ -21,6 +30,9 @@ from entries.models import Edge, Entry, Relation
 # from networkx.drawing.nx_agraph import to_agraph
 
 
+ACCESS_UPDATE_CHUNK_SIZE = 1000
+
+
 @shared_task
 @distributed_lock("update_accesses_{entry_id}", timeout=3600)
 def update_accesses(entry_id):
@@ -28,34 +40,25 @@ def update_accesses(entry_id):
     entry.status = {"status": "warning", "message": "Updating access controls"}
     entry.save()
 
-    notes = entry.notes.all()
-    update_notes = []
-
-    for note in notes:
-        newvec = calculate_acvec(
-            note.entries.filter(entry_class__type=EntryType.ENTITY)
-        )
+    note_ids = list(entry.notes.values_list("id", flat=True))
+    updated = 0
 
-        if newvec != note.access_vector:
-            note.access_vector = newvec
-            update_notes.append(note)
+    for chunk in chunked(note_ids, ACCESS_UPDATE_CHUNK_SIZE):
+        with transaction.atomic():
+            changed = Note.objects.update_access_vectors(chunk)
+            Note.objects.propagate_access_vectors(changed)
+        mark_notes_changed(changed)
+        updated += len(changed)
 
-    if update_notes:
-        note_model = update_notes[0].__class__
-        note_model.objects.bulk_update(update_notes, ["access_vector"])
+    digest_ids = list(entry.digests.values_list("id", flat=True))
 
-    digest_ids = entry.digests.all().values_list("id", flat=True)
+    for chunk in chunked(digest_ids, ACCESS_UPDATE_CHUNK_SIZE):
+        BaseDigest.update_access_vectors(chunk)
 
     # Reset the status field.
     entry.save()
 
-    g_notes = group(*[propagate_acvec.si(n.id) for n in update_notes])
-    g_digests = group(*[propagate_digest_acvec.si(d) for d in digest_ids])
-
-    transaction.on_commit(lambda: g_notes.apply_async())
-    transaction.on_commit(lambda: g_digests.apply_async())
-
-    return f"Updated {len(update_notes)} notes"
+    return f"Updated {updated} notes"
 
 
 @shared_task
@@ -116,59 +119,36 @@ def scan_for_children(entry_ids, content_type_id, content_id):
     if len(relations) > 0:
         Relation.objects.bulk_create(relations)
 
-    refresh_edges_materialized_view.apply_async(simulate=created)
+    refresh_edges_materialized_view.apply_async(kwargs={"simulate": created})
+
+
+def initial_positions(previous):
+    """
+    Starting positions for a full layout, entries without a location get
+    random coordinates.
+    """
+    missing = np.isnan(previous).any(axis=1)
+    positions = previous.copy()
+    positions[missing] = np.random.uniform(-100, 100, size=(missing.sum(), 2))
+    return positions
 
 
 def simulate_fa2():
     from fa2_modified import ForceAtlas2
     from scipy.sparse import csr_matrix
 
-    # Assign random coordinates to entries with no location
-    null_location_entries = Entry.objects.filter(location__isnull=True)
-    if null_location_entries.exists():
-        random_coords = np.random.uniform(
-            -100, 100, size=(null_location_entries.count(), 2)
-        )
-        for entry, (x, y) in zip(null_location_entries, random_coords):
-            entry.location = Point(x, y, srid=0)
-        Entry.objects.bulk_update(null_location_entries, ["location"])
-
-    # Get all entries
-    entries = list(Entry.objects.all())
-    entry_count = len(entries)
-
-    # Create mapping from entry ID to index
-    entry_id_to_index = {entry.id: i for i, entry in enumerate(entries)}
-
-    # Build sparse adjacency matrix
-    row_indices = []
-    col_indices = []
-    data = []
-
-    # Get edges and populate sparse matrix data
-    rels = Edge.objects.distinct("src", "dst").remove_mirrors()
-    for rel in rels.only("src", "dst"):
-        src_idx = entry_id_to_index.get(rel.src)
-        dst_idx = entry_id_to_index.get(rel.dst)
-        if src_idx is not None and dst_idx is not None:
-            # Add both directions to make symmetric (undirected)
-            row_indices.extend([src_idx, dst_idx])
-            col_indices.extend([dst_idx, src_idx])
-            data.extend([1.0, 1.0])
-
-    # Create sparse adjacency matrix
+    ids, previous, edges = load_graph()
+    entry_count = len(ids)
+    if entry_count == 0:
+        return 0
+
+    # Symmetric (undirected) sparse adjacency matrix
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
     adjacency_matrix = csr_matrix(
-        (data, (row_indices, col_indices)), shape=(entry_count, entry_count)
+        (np.ones(len(rows)), (rows, cols)), shape=(entry_count, entry_count)
     )
 
-    # Get initial positions
-    pos = np.zeros((entry_count, 2))
-    for i, entry in enumerate(entries):
-        if entry.location:
-            pos[i] = [entry.location.x, entry.location.y]
-        else:
-            pos[i] = np.random.uniform(-100, 100, 2)
-
     # Initialize ForceAtlas2
     forceatlas2 = ForceAtlas2(
         outboundAttractionDistribution=cradle_settings.graph.dissuade_hubs,
@@ -192,50 +172,25 @@ def simulate_fa2():
 
     # Run ForceAtlas2 algorithm directly on adjacency matrix
     positions = forceatlas2.forceatlas2(
-        adjacency_matrix, pos=pos, iterations=cradle_settings.graph.max_iter_fa2
+        adjacency_matrix,
+        pos=initial_positions(previous),
+        iterations=cradle_settings.graph.max_iter_fa2,
     )
 
-    # Convert positions to numpy array for scaling
-    coords = np.array(positions)
-
-    # Get min and max for each dimension
-    min_vals = coords.min(axis=0)
-    max_vals = coords.max(axis=0)
-
-    # Prevent division by zero by setting range to 1 where min == max
-    ranges = np.where(max_vals - min_vals == 0, 1, max_vals - min_vals)
-
-    # Scale to [-2000, 2000]
-    scaled_coords = (coords - min_vals) / ranges * 4000 - 2000
-
-    # Assign scaled positions to entries
-    for entry, (x, y) in zip(entries, scaled_coords):
-        entry.location = Point(float(x), float(y), srid=0)
-
-    result = Entry.objects.bulk_update(entries, ["location"])
-    return result
+    return store_positions(ids, scale_positions(positions), previous)
 
 
 def simulate_graph_tool():
     from graph_tool.all import Graph, sfdp_layout
 
-    # Build directed graph using graph_tool
+    ids, previous, edges = load_graph()
+    if len(ids) == 0:
+        return 0
+
+    # Build the graph from the edge list in one call, vertex i is ids[i]
     g = Graph()
-    # Create a mapping from entry id to graph vertex
-    vertex_map = {}
-    entries = list(Entry.objects.all())
-    for entry in entries:
-        v = g.add_vertex()
-        vertex_map[entry.id] = v
-
-    # Add edges from Edge objects
-    entry_ids = set(vertex_map.keys())
-    rels = Edge.objects.distinct("src", "dst").remove_mirrors()
-    for rel in rels.only("src", "dst"):
-        src_id = rel.src
-        dst_id = rel.dst
-        if src_id in entry_ids and dst_id in entry_ids:
-            g.add_edge(vertex_map[src_id], vertex_map[dst_id])
+    g.add_vertex(len(ids))
+    g.add_edge_list(edges)
 
     pos = sfdp_layout(
         g,
@@ -248,37 +203,127 @@ def simulate_graph_tool():
         max_iter=cradle_settings.graph.max_iter_gt,
     )
 
-    coords = np.array([pos[vertex_map[entry.id]] for entry in entries])
+    coords = pos.get_2d_array([0, 1]).T
+    return store_positions(ids, scale_positions(coords), previous)
 
-    # Get min and max for each dimension
-    min_vals = coords.min(axis=0)
-    max_vals = coords.max(axis=0)
 
-    # Prevent division by zero by setting range to 1 where min == max
-    ranges = np.where(max_vals - min_vals == 0, 1, max_vals - min_vals)
+def get_layout_neighbourhood(seeds, depth):
+    """
+    Collect the entries within `depth` hops of the seeds, and the edges
+    touching them.
 
-    # Scale to [-2000, 2000]
-    scaled_coords = (coords - min_vals) / ranges * 4000 - 2000
+    Returns:
+        The set of entry ids within reach and the set of (src, dst) pairs,
+        one per undirected edge. Edge ends outside the reached set are the
+        anchors of the neighbourhood.
+    """
+    reached = set(seeds)
+    frontier = set(seeds)
+    pairs = set()
 
-    # Assign scaled positions to entries
-    for entry, (x, y) in zip(entries, scaled_coords):
-        entry.location = Point(float(x), float(y), srid=0)
+    for level in range(depth + 1):
+        if not frontier:
+            break
 
-    result = Entry.objects.bulk_update(entries, ["location"])
-    return result
+        found = set()
+        for chunk in chunked(frontier, 1000):
+            edges = Edge.objects.filter(Q(src__in=chunk) | Q(dst__in=chunk))
+            for src, dst in edges.values_list("src", "dst"):
+                pairs.add((min(src, dst), max(src, dst)))
+                found.add(src)
+                found.add(dst)
+
+        if level == depth:
+            break
+
+        frontier = found - reached
+        reached |= frontier
+
+    return reached, pairs
+
+
+def simulate_incremental(entry_ids=None):
+    """
+    Lay out new entries, and the given changed ones, without moving the rest
+    of the graph.
+
+    New entries start next to their placed neighbours, then their neighbourhood
+    of `incremental_depth` hops is relaxed while the entries just outside of it
+    stay fixed. Falls back to a full layout when nothing is placed yet or
+    when too much of the graph would be affected.
+
+    Args:
+        entry_ids: Ids of existing entries whose neighbourhood changed
+
+    Returns:
+        The number of entries which were moved.
+    """
+    graph_settings = cradle_settings.graph
+
+    seeds = set(
+        Entry.objects.filter(location__isnull=True).values_list("id", flat=True)
+    )
+    seeds.update(entry_ids or [])
+    if not seeds:
+        return 0
+
+    total = Entry.objects.count()
+    if len(seeds) >= total * graph_settings.incremental_max_ratio:
+        return simulate_graph(incremental=False)
+
+    movable, pairs = get_layout_neighbourhood(seeds, graph_settings.incremental_depth)
+    if len(movable) > graph_settings.incremental_max_nodes:
+        # A hub in the neighbourhood, only relax the seeds themselves
+        movable, pairs = get_layout_neighbourhood(seeds, 0)
+    if len(movable) > graph_settings.incremental_max_nodes:
+        return simulate_graph(incremental=False)
+
+    # Keep the anchors to the edges that touch a movable entry
+    pairs = [(a, b) for a, b in pairs if a in movable or b in movable]
+    nodes = list(movable | {node for pair in pairs for node in pair})
+    index = {node: i for i, node in enumerate(nodes)}
+
+    positions = np.zeros((len(nodes), 2))
+    placed = np.zeros(len(nodes), dtype=bool)
+    for chunk in chunked(nodes, 1000):
+        for entry_id, location in Entry.objects.filter(id__in=chunk).values_list(
+            "id", "location"
+        ):
+            if location is not None and entry_id in index:
+                positions[index[entry_id]] = (location.x, location.y)
+                placed[index[entry_id]] = True
+
+    if not placed.any():
+        return simulate_graph(incremental=False)
+
+    edges = np.array([(index[a], index[b]) for a, b in pairs], dtype=int)
+    edge_length = typical_edge_length(
+        positions, placed, edges, default=4000 / max(np.sqrt(total), 1)
+    )
+
+    moving = np.array([node in movable for node in nodes])
+    previous = np.where(placed[:, None], positions, np.nan)
+    positions = place_nodes(positions, placed, edges, spread=edge_length)
+    positions = relax_layout(
+        positions, moving, edges, edge_length, graph_settings.incremental_iterations
+    )
+
+    return store_positions(
+        np.array(nodes)[moving], positions[moving], previous[moving]
+    )
 
 
 @shared_task
-def simulate_graph():
-    # Assign random coordinates to entries with no location
-    null_location_entries = Entry.objects.filter(location__isnull=True)
-    if null_location_entries.exists():
-        random_coords = np.random.uniform(
-            -100, 100, size=(null_location_entries.count(), 2)
-        )
-        for entry, (x, y) in zip(null_location_entries, random_coords):
-            entry.location = Point(x, y, srid=0)
-        Entry.objects.bulk_update(null_location_entries, ["location"])
+def simulate_graph(incremental=False, entry_ids=None):
+    """
+    Compute the positions of the entries in the graph.
+
+    A full layout moves every entry and is run by the nightly refresh. An
+    incremental one only places new entries and relaxes their neighbourhood,
+    see `simulate_incremental`.
+    """
+    if incremental:
+        return simulate_incremental(entry_ids)
 
     if cradle_settings.graph.simulate_method == "forceatlas2":
         result = simulate_fa2()
@@ -290,12 +335,17 @@ def simulate_graph():
     return result
 
 
-@debounce_task(timeout=180)
+@coalesce_task(timeout=180, flags=("simulate", "full_layout"))
 @shared_task
-def refresh_edges_materialized_view(simulate=False):
+def refresh_edges_materialized_view(simulate=False, full_layout=False):
     """
     Refreshes the 'edges' materialized view concurrently.
 
+    When `simulate` is set, the new entries are then laid out incrementally,
+    or the whole graph is laid out again if `full_layout` is set as well.
+    Calls within the coalescing window are merged, so the run lays out the
+    graph if any of them asked for it.
+
     Ensure that a unique index (e.g., on 'id') exists on the view, like:
 
         CREATE UNIQUE INDEX idx_edges_id ON edges(id);
@@ -306,6 +356,8 @@ def refresh_edges_materialized_view(simulate=False):
     with connection.cursor() as cursor:
         cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY edges;")
 
+    bump_graph_version()
+
     entryids = Entry.objects.exclude(entry_class__subtype="virtual").values_list(
         "id", flat=True
     )
@@ -322,7 +374,7 @@ def refresh_edges_materialized_view(simulate=False):
     Entry.objects.filter(entry_class__subtype="virtual").update(degree=0)
 
     if simulate:
-        simulate_graph.apply_async()
+        simulate_graph.apply_async(kwargs={"incremental": not full_layout})
 
 
 @shared_task
@@ -0,0 +1,126 @@
+from django.db import connection
+
+from user.models import CradleUser
+
+from .utils import EntriesTestCase
+from ..enums import RelationReason
+from ..models import AliasClosure, Entry, Relation
+
+
+class AliasClosureTest(EntriesTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.a, self.b, self.c, self.d = [
+            Entry.objects.create(name=name, entry_class=self.entryclass_username)
+            for name in ["a", "b", "c", "d"]
+        ]
+
+    def alias(self, e1, e2, **kwargs):
+        relation = Relation.objects.create(
+            e1=e1,
+            e2=e2,
+            content_object=e1,
+            reason=RelationReason.ALIAS,
+            virtual=True,
+            **kwargs,
+        )
+        AliasClosure.objects.refresh([e1.id, e2.id])
+        return relation
+
+    def group(self, entry):
+        return set(AliasClosure.objects.group(entry.id))
+
+    def test_aliases_are_transitive(self):
+        self.alias(self.a, self.b)
+        self.alias(self.c, self.d)
+        self.assertEqual(self.group(self.a), {self.a.id, self.b.id})
+
+        self.alias(self.b, self.c)
+
+        expected = {self.a.id, self.b.id, self.c.id, self.d.id}
+        self.assertEqual(self.group(self.a), expected)
+        self.assertEqual(self.group(self.d), expected)
+
+    def test_removing_an_alias_splits_the_group(self):
+        self.alias(self.a, self.b)
+        bridge = self.alias(self.b, self.c)
+        self.alias(self.c, self.d)
+
+        bridge.delete()
+        AliasClosure.objects.refresh([self.b.id])
+
+        self.assertEqual(self.group(self.a), {self.a.id, self.b.id})
+        self.assertEqual(self.group(self.d), {self.c.id, self.d.id})
+
+    def test_deleting_an_alias_splits_the_group(self):
+        self.alias(self.a, self.b)
+        bridge = self.alias(self.b, self.c)
+        self.alias(self.c, self.d)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Relation.objects.filter(id=bridge.id).delete()
+
+        self.assertEqual(self.group(self.a), {self.a.id, self.b.id})
+        self.assertEqual(self.group(self.d), {self.c.id, self.d.id})
+
+    def test_deleting_an_entry_splits_the_group(self):
+        self.alias(self.a, self.b)
+        self.alias(self.b, self.c)
+        self.alias(self.c, self.d)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.b.delete()
+
+        self.assertEqual(self.group(self.a), set())
+        self.assertEqual(self.group(self.d), {self.c.id, self.d.id})
+
+    def test_rebuild_matches_refresh(self):
+        self.alias(self.a, self.b)
+        self.alias(self.b, self.c)
+
+        AliasClosure.objects.rebuild()
+
+        self.assertEqual(self.group(self.c), {self.a.id, self.b.id, self.c.id})
+        self.assertEqual(self.group(self.d), set())
+
+    def test_aliasqs_follows_accessible_virtual_edges(self):
+        user = CradleUser.objects.create_user(
+            username="user", password="password", email="b@c.d"
+        )
+        self.alias(self.a, self.b, access_vector=1)
+        self.alias(self.b, self.c)
+        Relation.objects.create(
+            e1=self.a,
+            e2=self.d,
+            content_object=self.a,
+            reason=RelationReason.ENRICHMENT,
+            virtual=True,
+            access_vector=1,
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute("REFRESH MATERIALIZED VIEW edges")
+
+        self.assertEqual(
+            set(self.a.aliasqs(user).values_list("id", flat=True)),
+            {self.a.id, self.b.id, self.d.id},
+        )
+
+    def test_aliasqs_skips_aliases_behind_hidden_relations(self):
+        user = CradleUser.objects.create_user(
+            username="user", password="password", email="b@c.d"
+        )
+        self.alias(self.a, self.b)
+        self.alias(self.b, self.c, access_vector=1)
+
+        with connection.cursor() as cursor:
+            cursor.execute("REFRESH MATERIALIZED VIEW edges")
+
+        self.assertEqual(
+            set(self.a.aliasqs(user).values_list("id", flat=True)), {self.a.id}
+        )
+        self.assertEqual(
+            set(self.c.aliasqs(user).values_list("id", flat=True)),
+            {self.b.id, self.c.id},
+        )
@@ -0,0 +1,58 @@
+from core.fields import AccessVectorField
+from entries.models import EntitySlot, Entry
+from .utils import EntriesTestCase
+
+
+class EntitySlotTest(EntriesTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.entities = [
+            Entry.objects.create(name=f"Entity {i}", entry_class=self.entryclass1)
+            for i in range(0, 3)
+        ]
+
+    def test_entities_get_distinct_slots(self):
+        offsets = [e.acvec_offset for e in self.entities]
+
+        self.assertEqual(offsets, [1, 2, 3])
+        for entity in self.entities:
+            self.assertEqual(entity.access_slot.offset, entity.acvec_offset)
+
+    def test_artifacts_do_not_take_slots(self):
+        artifact = Entry.objects.create(
+            name="Artifact", entry_class=self.entryclass_username
+        )
+
+        self.assertEqual(artifact.acvec_offset, 0)
+        self.assertFalse(EntitySlot.objects.filter(entity=artifact).exists())
+
+    def test_deleted_entity_slot_is_recycled(self):
+        self.entities[1].delete()
+
+        entity = Entry.objects.create(name="Entity 3", entry_class=self.entryclass1)
+
+        self.assertEqual(entity.acvec_offset, 2)
+
+    def test_public_entity_releases_slot(self):
+        entity = self.entities[0]
+        entity.is_public = True
+        entity.save()
+
+        self.assertEqual(entity.acvec_offset, 0)
+        self.assertIsNone(EntitySlot.objects.get(offset=1).entity)
+
+    def test_slots_extend_past_reserved_offset(self):
+        EntitySlot.objects.filter(entity__isnull=True).delete()
+
+        entity = Entry.objects.create(name="Entity 3", entry_class=self.entryclass1)
+
+        self.assertEqual(entity.acvec_offset, 2048)
+
+    def test_access_vector_offsets_round_trip(self):
+        vector = 1 | (1 << 5) | (1 << 3000)
+
+        offsets = AccessVectorField.to_offsets(vector)
+
+        self.assertEqual(offsets, [5, 3000])
+        self.assertEqual(AccessVectorField.from_offsets(offsets), vector)
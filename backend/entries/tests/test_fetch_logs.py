@@ -0,0 +1,54 @@
+import uuid
+from unittest.mock import patch
+
+import redis
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+from entries.models import Entry
+from logs.buffer import write_fetch_events
+from logs.enums import EventType
+from logs.models import EventLog
+from user.models import CradleUser
+
+from .utils import EntriesTestCase
+
+
+class FetchLogBufferTest(EntriesTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.user = CradleUser.objects.create_user(
+            username="user", password="user", email="alabala@gmail.com"
+        )
+        self.entry = Entry.objects.create(name="Entity", entry_class=self.entryclass1)
+
+    def event(self, user_id=None):
+        return {
+            "id": str(uuid.uuid4()),
+            "timestamp": timezone.now().isoformat(),
+            "user_id": str(user_id or self.user.id),
+            "content_type_id": ContentType.objects.get_for_model(Entry).id,
+            "object_id": str(self.entry.id),
+        }
+
+    def test_events_written_once(self):
+        event = self.event()
+
+        write_fetch_events([event, self.event()])
+        write_fetch_events([event])
+
+        self.assertEqual(EventLog.objects.filter(type=EventType.FETCH).count(), 2)
+
+    def test_events_of_missing_users_dropped(self):
+        write_fetch_events([self.event(uuid.uuid4())])
+
+        self.assertFalse(EventLog.objects.filter(type=EventType.FETCH).exists())
+
+    @patch("logs.buffer.get_redis_client", side_effect=redis.RedisError)
+    def test_written_directly_without_redis(self, _):
+        self.entry.log_fetch(self.user)
+
+        log = EventLog.objects.get(type=EventType.FETCH)
+        self.assertEqual(log.content_object, self.entry)
+        self.assertEqual(log.user, self.user)
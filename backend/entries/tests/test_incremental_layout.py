@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.gis.geos import Point
+
+from .utils import EntriesTestCase
+from ..layout import index_edges, store_positions
+from ..models import Edge, Entry
+from ..tasks import simulate_incremental
+
+
+class IncrementalLayoutTest(EntriesTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.entries = [
+            Entry.objects.create(
+                name=f"case-{i}",
+                entry_class=self.entryclass1,
+                location=Point(i * 100.0, 0.0, srid=0),
+            )
+            for i in range(10)
+        ]
+        self.new_entry = Entry.objects.create(
+            name="new-case", entry_class=self.entryclass1
+        )
+
+        self.edges_patcher = self.patch_edges(
+            [(self.entries[0].id, self.new_entry.id)]
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.edges_patcher.stop()
+
+    def patch_edges(self, pairs):
+        edges = pairs + [(b, a) for a, b in pairs]
+
+        def values_list(*args, **kwargs):
+            return edges
+
+        patcher = patch.object(Edge.objects, "filter")
+        mocked = patcher.start()
+        mocked.return_value.values_list.side_effect = values_list
+        return patcher
+
+    def test_places_new_entry_without_moving_the_rest(self):
+        moved = simulate_incremental()
+
+        self.assertEqual(moved, 2)
+        self.new_entry.refresh_from_db()
+        self.assertIsNotNone(self.new_entry.location)
+
+        for entry in self.entries[1:]:
+            before = entry.location
+            entry.refresh_from_db()
+            self.assertEqual(entry.location, before)
+
+    def test_nothing_to_place(self):
+        self.new_entry.delete()
+
+        self.assertEqual(simulate_incremental(), 0)
+
+    def test_store_positions_only_writes_moved_entries(self):
+        first, second = self.entries[:2]
+
+        updated = store_positions(
+            [first.id, second.id],
+            np.array([[0.0, 0.0], [5.0, 5.0]]),
+            np.array([[0.0, 0.0], [100.0, 0.0]]),
+        )
+
+        self.assertEqual(updated, 1)
+        second.refresh_from_db()
+        self.assertEqual((second.location.x, second.location.y), (5.0, 5.0))
+
+    def test_index_edges_drops_unknown_ends(self):
+        ids = np.array([3, 5, 9])
+
+        edges = index_edges(ids, [(3, 5), (5, 7), (9, 3)])
+
+        self.assertEqual(edges.tolist(), [[0, 1], [2, 0]])
@@ -103,7 +103,8 @@ class EntryEnrichersView(APIView):
                 ContentType.objects.get_for_model(entry).id,
                 entry.id,
                 user.id,
-            )
+            ),
+            force=True,
         )
 
         return Response(
@@ -167,7 +167,7 @@ class EntityDetail(APIView):
             )
 
         entity.delete_renaming(request.user.id)
-        refresh_edges_materialized_view.apply_async(simulate=True)
+        refresh_edges_materialized_view.apply_async(kwargs={"simulate": True})
 
         return Response("Requested entity was deleted", status=status.HTTP_200_OK)
 
@@ -1,5 +1,8 @@
 import logging
 import hashlib
+from datetime import timedelta
+from typing import Iterable, Iterator
+
 from celery import shared_task
 
 from file_transfer.models import FileReference
@@ -7,6 +10,8 @@ from file_transfer.utils import MinioClient
 from management.settings import cradle_settings
 from user.models import CradleUser
 from django.db import transaction
+from django.db.models.functions import Collate
+from django.utils import timezone
 
 logger = logging.getLogger("django.request")
 
@@ -101,21 +106,128 @@ def process_file_task(file_id):
         file_obj.close()
 
 
+def iter_referenced_file_names(
+    bucket_name: str, page_size: int = 5000
+) -> Iterator[str]:
+    """Iterates over the names of the files referenced in a bucket, in the same
+    binary order MinIO lists objects in. Pages are fetched using keyset
+    pagination so only one page is held in memory at a time.
+
+    Args:
+        bucket_name: The bucket whose file references are listed
+        page_size: The number of names fetched per query
+
+    Returns:
+        An iterator over the referenced object names
+    """
+    queryset = (
+        FileReference.objects.filter(bucket_name=bucket_name)
+        .annotate(binary_name=Collate("minio_file_name", "C"))
+        .order_by("binary_name")
+        .values_list("binary_name", flat=True)
+    )
+
+    last_name = None
+    while True:
+        page = queryset
+        if last_name is not None:
+            page = page.filter(binary_name__gt=last_name)
+
+        names = list(page[:page_size])
+        yield from names
+
+        if len(names) < page_size:
+            return
+
+        last_name = names[-1]
+
+
+def iter_unreferenced_objects(objects: Iterable, referenced_names: Iterable[str]):
+    """Sorted merge of a bucket listing against the referenced file names.
+    Both inputs must be sorted in ascending order.
+
+    Args:
+        objects: The MinIO objects of a bucket
+        referenced_names: The names of the referenced files in the same bucket
+
+    Returns:
+        An iterator over the objects which are not referenced
+
+    Raises:
+        ValueError: If the object listing is not sorted
+    """
+    referenced = iter(referenced_names)
+    current = next(referenced, None)
+    previous = None
+
+    for obj in objects:
+        name = obj.object_name
+
+        if previous is not None and name < previous:
+            raise ValueError(f"Object listing is not sorted at {name}")
+        previous = name
+
+        while current is not None and current < name:
+            current = next(referenced, None)
+
+        if current != name:
+            yield obj
+
+
 @shared_task
-def delete_hanging_files():
-    client = MinioClient()
+def delete_hanging_files(dry_run=False):
+    """
+    Delete the files in MinIO which are not referenced by any FileReference.
+    Objects modified within the configured grace period are kept, so that
+    uploads which have not been linked yet are not removed.
 
-    for user in CradleUser.objects.all():
-        bucket_name = str(user.id)
+    Args:
+        dry_run: Only report the unreferenced files, without deleting them
 
-        filenames = set(client.list_objects(bucket_name))
+    Returns:
+        A report with the per bucket statistics of the run
+    """
+    client = MinioClient()
+    cutoff = timezone.now() - timedelta(
+        hours=cradle_settings.files.hanging_files_grace_period
+    )
+    report = {}
+
+    for user_id in CradleUser.objects.values_list("id", flat=True).iterator():
+        bucket_name = str(user_id)
+        stats = {"unreferenced": 0, "recent": 0, "deleted": 0, "failed": []}
+
+        def deletable():
+            for obj in iter_unreferenced_objects(
+                client.iter_objects(bucket_name),
+                iter_referenced_file_names(bucket_name),
+            ):
+                if obj.is_dir:
+                    continue
+
+                stats["unreferenced"] += 1
+                if obj.last_modified is not None and obj.last_modified > cutoff:
+                    stats["recent"] += 1
+                    continue
+
+                yield obj.object_name
 
-        referenced_files = set(
-            FileReference.objects.filter(bucket_name=bucket_name).values_list(
-                "minio_file_name", flat=True
-            )
-        )
+        try:
+            if dry_run:
+                stats["files"] = list(deletable())
+            else:
+                def counted():
+                    for name in deletable():
+                        stats["deleted"] += 1
+                        yield name
+
+                stats["failed"] = client.remove_objects(bucket_name, counted())
+                stats["deleted"] -= len(stats["failed"])
+        except Exception as e:
+            logger.error(f"Error cleaning up bucket {bucket_name}: {str(e)}")
+            stats["error"] = str(e)
 
-        unreferenced_files = set(filenames) - referenced_files
+        if stats["unreferenced"] or "error" in stats:
+            report[bucket_name] = stats
 
-        client.delete_files(bucket_name, unreferenced_files)
+    return report
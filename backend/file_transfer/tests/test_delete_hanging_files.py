@@ -0,0 +1,91 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.utils import timezone
+
+from .utils import FileTransferTestCase
+from ..models import FileReference
+from ..tasks import delete_hanging_files, iter_unreferenced_objects
+from user.models import CradleUser
+
+
+def make_object(name, age=timedelta(days=7)):
+    return SimpleNamespace(
+        object_name=name, is_dir=False, last_modified=timezone.now() - age
+    )
+
+
+class TestDeleteHangingFiles(FileTransferTestCase):
+    def setUp(self):
+        super().setUp()
+        self.mock_minio_client_create()
+
+        self.user = CradleUser.objects.create_user(
+            username="user", password="user", email="alabala@gmail.com"
+        )
+        self.bucket_name = str(self.user.id)
+
+        for name in ["b-file", "d-file"]:
+            FileReference.objects.create(
+                minio_file_name=name, file_name=name, bucket_name=self.bucket_name
+            )
+
+        self.objects = [
+            make_object("a-file"),
+            make_object("b-file"),
+            make_object("c-file"),
+            make_object("d-file"),
+            make_object("e-file", age=timedelta(minutes=5)),
+        ]
+
+        self.patcher_iter = patch(
+            "file_transfer.utils.MinioClient.iter_objects",
+            side_effect=lambda bucket_name: iter(
+                self.objects if bucket_name == self.bucket_name else []
+            ),
+        )
+        self.patcher_remove = patch(
+            "file_transfer.utils.MinioClient.remove_objects",
+            side_effect=self.remove_objects,
+        )
+        self.removed = []
+        self.mocked_iter_objects = self.patcher_iter.start()
+        self.mocked_remove_objects = self.patcher_remove.start()
+
+    def tearDown(self):
+        super().tearDown()
+        self.patcher_iter.stop()
+        self.patcher_remove.stop()
+        self.mock_minio_client_destroy()
+
+    def remove_objects(self, bucket_name, names):
+        self.removed += list(names)
+        return []
+
+    def test_merge_yields_unreferenced(self):
+        unreferenced = iter_unreferenced_objects(
+            self.objects, ["a-file", "a-file", "c-file", "z-file"]
+        )
+
+        self.assertEqual(
+            [obj.object_name for obj in unreferenced], ["b-file", "d-file", "e-file"]
+        )
+
+    def test_merge_rejects_unsorted_listing(self):
+        with self.assertRaises(ValueError):
+            list(iter_unreferenced_objects(self.objects[::-1], []))
+
+    def test_dry_run_does_not_delete(self):
+        report = delete_hanging_files(dry_run=True)
+
+        self.mocked_remove_objects.assert_not_called()
+        self.assertEqual(report[self.bucket_name]["files"], ["a-file", "c-file"])
+        self.assertEqual(report[self.bucket_name]["recent"], 1)
+
+    def test_deletes_old_unreferenced_files(self):
+        report = delete_hanging_files()
+
+        self.assertEqual(report[self.bucket_name]["deleted"], 2)
+        self.assertEqual(report[self.bucket_name]["unreferenced"], 3)
+        self.assertEqual(self.removed, ["a-file", "c-file"])
@@ -1,6 +1,8 @@
 import io
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from minio import Minio
+from minio.datatypes import Object
+from minio.deleteobjects import DeleteObject
 import uuid
 from datetime import timedelta
 from .exceptions import MinioObjectNotFound
@@ -166,6 +168,57 @@ class MinioClient:
         except Exception:
             return []
 
+    def iter_objects(self, bucket_name: str, prefix: str = "") -> Iterator[Object]:
+        """Lazily iterates over all objects in the specified bucket. Objects are
+        yielded in ascending (binary) order of their names, as returned by the
+        S3 listing API, without materialising the whole listing.
+
+        Args:
+            bucket_name: The name of the bucket to list objects from.
+            prefix: Only include objects with keys starting with this prefix.
+
+        Returns:
+            An iterator over the MinIO objects in the bucket.
+        """
+        assert self.client is not None
+
+        return self.client.list_objects(bucket_name, prefix=prefix, recursive=True)
+
+    def remove_objects(
+        self, bucket_name: str, file_names: Iterable[str], batch_size: int = 1000
+    ) -> list[str]:
+        """Deletes multiple objects from the specified bucket using batched
+        delete requests. Unlike delete_files, no existence check is performed.
+
+        Args:
+            bucket_name: The name of the bucket where files will be deleted
+            file_names: Object names to delete from the bucket
+            batch_size: Maximum number of objects per delete request
+
+        Returns:
+            The names of the objects which could not be deleted.
+        """
+        assert self.client is not None  # required by mypy
+
+        failed: list[str] = []
+        batch: list[DeleteObject] = []
+
+        def flush():
+            # remove_objects is lazy, errors are only sent while iterating
+            for error in self.client.remove_objects(bucket_name, batch):
+                failed.append(error.name)
+            batch.clear()
+
+        for file_name in file_names:
+            batch.append(DeleteObject(file_name))
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+
+        return failed
+
     def delete_files(self, bucket_name: str, file_names: list[str]) -> None:
         """Deletes multiple files from the specified bucket.
 
@@ -188,14 +241,10 @@ class MinioClient:
 
         # If all files exist, proceed with deletion
         try:
-            # Minio's remove_objects method is more efficient for multiple deletions
-            errors = self.client.remove_objects(bucket_name, file_names)
-            for error in errors:
-                # This should theoretically never happen since we checked existence first,
-                # but we handle it just in case
-                raise Exception(
-                    f"Error deleting object: {error.object_name}, error: {error}"
-                )
+            failed = self.remove_objects(bucket_name, file_names)
         except Exception as e:
             # Catch any other MinIO errors
             raise Exception(f"Error deleting files: {str(e)}")
+
+        if failed:
+            raise Exception(f"Error deleting objects: {', '.join(failed)}")
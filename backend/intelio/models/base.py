@@ -3,8 +3,8 @@ from typing import Any, Optional
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericRelation
 from django.core.exceptions import ValidationError
-from django.db import models, transaction
-from core.fields import BitStringField
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, models, transaction
 from entries.models import EntryClass, Entry
 from entries.models import Relation
 from collections import defaultdict
@@ -20,8 +20,6 @@ from django_lifecycle import (
 from ..enums import EnrichmentStrategy, DigestStatus
 import uuid
 
-fieldtype = BitStringField(max_length=2048, null=False, default=1, varying=False)
-
 
 class BaseDigest(LifecycleModel):
     """
@@ -174,6 +172,52 @@ class BaseDigest(LifecycleModel):
         access_vector = calculate_acvec(self.entities.all())
         self.relations.update(access_vector=access_vector)
 
+    @classmethod
+    def update_access_vectors(cls, digest_ids) -> int:
+        """
+        Set-based update_access_vector for many digests: the access vector of
+        each digest is aggregated from its entities and written to its
+        relations in a single statement.
+
+        Returns:
+            The number of relations updated
+        """
+        if not digest_ids:
+            return 0
+
+        m2m = cls.entities.field
+        through = m2m.remote_field.through._meta
+        content_type = ContentType.objects.get_for_model(cls)
+
+        sql = f"""
+            WITH vectors AS (
+                SELECT
+                    d.id,
+                    COALESCE(
+                        ARRAY_AGG(DISTINCT e.acvec_offset ORDER BY e.acvec_offset)
+                        FILTER (WHERE e.acvec_offset <> 0),
+                        '{{}}'
+                    ) AS access_vector
+                FROM {cls._meta.db_table} d
+                LEFT JOIN {through.db_table} de
+                    ON de.{m2m.m2m_column_name()} = d.id
+                LEFT JOIN {Entry._meta.db_table} e
+                    ON e.id = de.{m2m.m2m_reverse_name()}
+                WHERE d.id = ANY(%s)
+                GROUP BY d.id
+            )
+            UPDATE {Relation._meta.db_table} r
+            SET access_vector = v.access_vector
+            FROM vectors v
+            WHERE r.content_type_id = %s
+              AND r.object_id = v.id
+              AND r.access_vector IS DISTINCT FROM v.access_vector
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [list(digest_ids), content_type.id])
+            return cursor.rowcount
+
 
 class BaseEnricher:
     display_name = None
@@ -1,4 +1,5 @@
 from celery import shared_task
+from core.decorators import coalesce_task
 from django.contrib.contenttypes.models import ContentType
 
 from entries.models import Entry
@@ -11,6 +12,11 @@ from django.utils import timezone
 BATCH_SIZE = 2048
 
 
+@coalesce_task(
+    timeout=60,
+    sets=("entry_ids",),
+    key=("enricher_id", "content_type_id", "content_id", "user_id"),
+)
 @shared_task
 def enrich_entries(enricher_id, entry_ids, content_type_id, content_id, user_id=None):
     from entries.tasks import refresh_edges_materialized_view
@@ -28,7 +34,7 @@ def enrich_entries(enricher_id, entry_ids, content_type_id, content_id, user_id=
 
     created = settings.enricher.enrich(entries, content_object, user)
 
-    refresh_edges_materialized_view.apply_async(simulate=created)
+    refresh_edges_materialized_view.apply_async(kwargs={"simulate": created})
 
     return
 
@@ -69,7 +75,8 @@ def enrich_periodic():
                 entry_ids = list(entries.values_list("id", flat=True))
 
                 enrich_entries.apply_async(
-                    args=(enricher.id, entry_ids, content_type.id, enricher.id)
+                    args=(enricher.id, entry_ids, content_type.id, enricher.id),
+                    force=True,
                 )
 
 
@@ -249,5 +249,5 @@ class DigestAPIView(GenericAPIView):
 
         digest.delete()
 
-        refresh_edges_materialized_view.apply_async(simulate=True)
+        refresh_edges_materialized_view.apply_async(kwargs={"simulate": True})
         return Response(status=status.HTTP_204_NO_CONTENT)
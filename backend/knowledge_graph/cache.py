@@ -0,0 +1,105 @@
+import hashlib
+import logging
+import pickle
+
+import redis
+
+from core.fields import AccessVectorField
+from core.utils import get_redis_client
+from entries.graph import get_graph_version
+from management.settings import cradle_settings
+
+logger = logging.getLogger("django.request")
+
+CACHE_PREFIX = "graph:cache"
+STATS_KEY = "graph:cache:stats"
+
+
+def access_hash(user) -> str:
+    """
+    Identifies what a user can see of the graph, users with the same access
+    vector share cache entries.
+    """
+    if user.is_cradle_admin:
+        return "admin"
+
+    offsets = AccessVectorField.to_offsets(int(user.access_vector))
+    return hashlib.sha256(repr(offsets).encode()).hexdigest()[:16]
+
+
+def cache_key(kind, version, params, user) -> str:
+    digest = hashlib.sha256(repr((kind, params)).encode()).hexdigest()
+    return f"{CACHE_PREFIX}:{version}:{kind}:{access_hash(user)}:{digest}"
+
+
+def get_or_compute(kind, params, user, compute):
+    """
+    Return the cached result of a graph query, computing and storing it on a
+    miss.
+
+    Entries are keyed on the graph version, which is bumped by every refresh
+    of the edges view, so they never outlive the edges they were built from.
+
+    Args:
+        kind: Name of the query, used for the statistics
+        params: Hashable description of the query (source, depth, filters...)
+        user: The user running the query
+        compute: Callable returning the result, which must be picklable
+    """
+    ttl = cradle_settings.graph.neighbourhood_cache_ttl
+    if ttl <= 0:
+        return compute()
+
+    try:
+        redis_client = get_redis_client()
+        key = cache_key(kind, get_graph_version(), params, user)
+        cached = redis_client.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Graph cache unavailable: {e}")
+        return compute()
+
+    if cached is not None:
+        try:
+            redis_client.hincrby(STATS_KEY, f"{kind}:hits", 1)
+        except redis.RedisError as e:
+            logger.warning(f"Could not count graph cache hit: {e}")
+        return pickle.loads(cached)
+
+    result = compute()
+
+    try:
+        redis_client.set(key, pickle.dumps(result), ex=ttl)
+        redis_client.hincrby(STATS_KEY, f"{kind}:misses", 1)
+    except redis.RedisError as e:
+        logger.warning(f"Graph cache unavailable: {e}")
+
+    return result
+
+
+def get_stats() -> dict:
+    """
+    Hit and miss counts per query kind, and the number of entries cached for
+    the current graph version.
+    """
+    redis_client = get_redis_client()
+    version = get_graph_version()
+
+    kinds = {}
+    for field, value in redis_client.hgetall(STATS_KEY).items():
+        kind, counter = field.decode().rsplit(":", 1)
+        kinds.setdefault(kind, {"hits": 0, "misses": 0})[counter] = int(value)
+
+    for counts in kinds.values():
+        total = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = counts["hits"] / total if total else 0.0
+
+    entries = sum(
+        1 for _ in redis_client.scan_iter(match=f"{CACHE_PREFIX}:{version}:*")
+    )
+
+    return {"version": version, "entries": entries, "kinds": kinds}
+
+
+def reset_stats() -> None:
+    redis_client = get_redis_client()
+    redis_client.delete(STATS_KEY)
@@ -0,0 +1,92 @@
+import gzip
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from entries.enums import EntryType
+from entries.models import Edge, Entry, EntryClass
+from knowledge_graph.renderers import MessagePackRenderer
+from knowledge_graph.serializers import ColumnarSubGraphSerializer, SubGraphSerializer
+
+
+class Command(BaseCommand):
+    help = "Compare the JSON and MessagePack encodings of a synthetic subgraph"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--entries", type=int, default=10000)
+        parser.add_argument("--relations", type=int, default=30000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        """
+        Serialize and render the same in-memory subgraph with both encodings,
+        without touching the database.
+
+        To run this command use:
+
+        ```python manage.py benchmark_subgraph --entries 10000 --relations 30000```
+
+        Args:
+            *args: Variable length argument list.
+            **options: Arbitrary keyword arguments.
+        """
+        subgraph = self.build_subgraph(options["entries"], options["relations"])
+
+        encodings = [
+            ("json", SubGraphSerializer, JSONRenderer()),
+            ("msgpack", ColumnarSubGraphSerializer, MessagePackRenderer()),
+        ]
+
+        for name, serializer_class, renderer in encodings:
+            timings = []
+            for _ in range(options["repeat"]):
+                start = time.perf_counter()
+                body = renderer.render(serializer_class(subgraph).data)
+                timings.append(time.perf_counter() - start)
+
+            self.stdout.write(
+                f"{name:>8}: {min(timings) * 1000:8.1f} ms, "
+                f"{len(body) / 1024:8.1f} KiB, "
+                f"{len(gzip.compress(body)) / 1024:8.1f} KiB gzipped"
+            )
+
+    def build_subgraph(self, entry_count, relation_count):
+        classes = [
+            EntryClass(subtype=f"class-{i}", type=t, color="#112233")
+            for i, t in enumerate([EntryType.ENTITY, EntryType.ARTIFACT] * 5)
+        ]
+
+        now = timezone.now()
+        entries = [
+            Entry(
+                id=i,
+                name=f"entry-{i}",
+                entry_class=random.choice(classes),
+                location=Point(
+                    random.uniform(-2000, 2000), random.uniform(-2000, 2000)
+                ),
+                degree=random.randint(0, 50),
+            )
+            for i in range(entry_count)
+        ]
+
+        relations = []
+        for i in range(relation_count):
+            src, dst = random.sample(range(entry_count), 2)
+            relations.append(
+                Edge(
+                    id=f"{src}-{dst}-{i}",
+                    src=src,
+                    dst=dst,
+                    created_at=now - timedelta(days=random.randint(0, 365)),
+                    last_seen=now,
+                )
+            )
+
+        colors = {c.subtype: c.color for c in classes}
+        return {"entries": entries, "relations": relations, "colors": colors}
@@ -0,0 +1,413 @@
+import hashlib
+import heapq
+import threading
+from math import inf
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+
+from core.fields import AccessVectorField
+from entries.graph import get_graph_version
+
+PATH_CACHE_TIMEOUT = 3600
+FETCH_SIZE = 50000
+COMPONENTS_CACHE_SIZE = 32
+
+
+class GraphIndex:
+    """
+    An in-memory copy of the edges materialized view, for path finding.
+
+    Edges are sorted by source so the outgoing edges of a node are a
+    contiguous range. Each edge keeps the index of its access vector in a
+    table of distinct vectors, so masking edges for a user only checks each
+    distinct vector once.
+
+    The connected components of the edges a user can access are computed on
+    first use and kept for each set of usable vectors, so queries between
+    entries which cannot be connected return without a search.
+    """
+
+    def __init__(self, version, rows):
+        rows = sorted(rows, key=lambda row: (row[1], row[2]))
+        self.version = version
+
+        self.ids = [row[0] for row in rows]
+        self.src = [row[1] for row in rows]
+        self.dst = [row[2] for row in rows]
+        self.created_at = [row[4] for row in rows]
+        self.last_seen = [row[5] for row in rows]
+        self.cost = [float(row[6]) for row in rows]
+
+        self.created_at_ts = np.array([t.timestamp() for t in self.created_at])
+        self.last_seen_ts = np.array([t.timestamp() for t in self.last_seen])
+
+        vectors = {}
+        self.vector_index = np.array(
+            [vectors.setdefault(tuple(row[3]), len(vectors)) for row in rows],
+            dtype=np.int64,
+        )
+        self.vectors = [AccessVectorField.from_offsets(v) for v in vectors]
+
+        self.adjacency = {}
+        for i, node in enumerate(self.src):
+            start, _ = self.adjacency.get(node, (i, i))
+            self.adjacency[node] = (start, i + 1)
+
+        position = {(s, d): i for i, (s, d) in enumerate(zip(self.src, self.dst))}
+        self.position = {edge_id: i for i, edge_id in enumerate(self.ids)}
+        self.mirror = [position.get((d, s)) for s, d in zip(self.src, self.dst)]
+
+        self.nodes = np.unique(np.array(self.src, dtype=np.int64))
+        self.node_index = {node: i for i, node in enumerate(self.nodes.tolist())}
+        self.components = {}
+
+    @classmethod
+    def load(cls, version):
+        with connection.chunked_cursor() as cursor:
+            cursor.execute(
+                "SELECT id, src, dst, access_vector, created_at, last_seen, age "
+                "FROM edges"
+            )
+            rows = []
+            while chunk := cursor.fetchmany(FETCH_SIZE):
+                rows += chunk
+
+        return cls(version, rows)
+
+    def out_edges(self, node):
+        return range(*self.adjacency.get(node, (0, 0)))
+
+    def usable_vectors(self, user):
+        """
+        Which of the distinct access vectors the user holds, or None for
+        admins, who hold them all.
+        """
+        if user.is_cradle_admin or not self.vectors:
+            return None
+
+        vector = int(user.access_vector)
+        return np.array([(v & ~vector) == 0 for v in self.vectors], dtype=bool)
+
+    def allowed_edges(self, user, start_time, end_time) -> list[bool]:
+        """
+        Which edges a path may use: those seen within the time window whose
+        access vector the user holds.
+        """
+        allowed = (self.created_at_ts <= end_time.timestamp()) & (
+            self.last_seen_ts >= start_time.timestamp()
+        )
+
+        usable = self.usable_vectors(user)
+        if usable is not None:
+            allowed &= usable[self.vector_index]
+
+        return allowed.tolist()
+
+    def user_components(self, user):
+        """
+        Label the connected components of the edges a user can access,
+        regardless of time.
+
+        Returns:
+            The component label of each node and the size of each component.
+        """
+        from scipy.sparse import csr_matrix
+        from scipy.sparse.csgraph import connected_components
+
+        usable = self.usable_vectors(user)
+        key = None if usable is None else usable.tobytes()
+
+        if key not in self.components:
+            n = len(self.nodes)
+            src = np.searchsorted(self.nodes, np.array(self.src, dtype=np.int64))
+            dst = np.searchsorted(self.nodes, np.array(self.dst, dtype=np.int64))
+            if usable is not None:
+                mask = usable[self.vector_index]
+                src, dst = src[mask], dst[mask]
+
+            adjacency = csr_matrix((np.ones(len(src)), (src, dst)), shape=(n, n))
+            _, labels = connected_components(adjacency, directed=False)
+
+            if len(self.components) >= COMPONENTS_CACHE_SIZE:
+                self.components.clear()
+            self.components[key] = (labels, np.bincount(labels, minlength=1))
+
+        return self.components[key]
+
+    def component_size(self, node, user) -> int:
+        """
+        The number of entries a node is connected to through the edges a
+        user can access, including itself.
+        """
+        i = self.node_index.get(node)
+        if i is None:
+            return 1
+
+        labels, sizes = self.user_components(user)
+        return int(sizes[labels[i]])
+
+    def connected(self, a, b, user) -> bool:
+        """
+        Whether any path between two nodes may exist for a user.
+        """
+        if a == b:
+            return True
+
+        i, j = self.node_index.get(a), self.node_index.get(b)
+        if i is None or j is None:
+            return False
+
+        labels, _ = self.user_components(user)
+        return labels[i] == labels[j]
+
+    def path_cost(self, path) -> float:
+        return sum(self.cost[e] for e in path)
+
+    def shortest_tree(self, source, targets, allowed):
+        """
+        Dijkstra from a source, stopping once every target is settled.
+
+        Returns:
+            The edge used to reach each settled node.
+        """
+        dist = {source: 0.0}
+        pred = {}
+        done = set()
+        remaining = set(targets)
+        heap = [(0.0, source)]
+
+        while heap and remaining:
+            d, node = heapq.heappop(heap)
+            if node in done:
+                continue
+            done.add(node)
+            remaining.discard(node)
+
+            for e in self.out_edges(node):
+                nxt = self.dst[e]
+                if not allowed[e] or nxt in done:
+                    continue
+                nd = d + self.cost[e]
+                if nd < dist.get(nxt, inf):
+                    dist[nxt] = nd
+                    pred[nxt] = e
+                    heapq.heappush(heap, (nd, nxt))
+
+        return pred
+
+    def path_from_tree(self, pred, source, target):
+        path = []
+        node = target
+        while node != source:
+            e = pred.get(node)
+            if e is None:
+                return None
+            path.append(e)
+            node = self.src[e]
+        return path[::-1]
+
+    def shortest_path(self, source, target, allowed, banned_edges=(), banned_nodes=()):
+        """
+        Bidirectional Dijkstra between two nodes.
+
+        The edges view holds both directions of every relation with the same
+        cost and filters, so the backward search walks the same adjacency
+        and maps each edge to its mirror.
+
+        Returns:
+            The list of edge indices along the path, or None.
+        """
+        if source == target:
+            return []
+
+        dist = ({source: 0.0}, {target: 0.0})
+        pred = ({}, {})
+        done = (set(), set())
+        heaps = ([(0.0, source)], [(0.0, target)])
+        best, meeting = inf, None
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            d, node = heapq.heappop(heaps[side])
+            if node in done[side]:
+                continue
+            done[side].add(node)
+
+            for e in self.out_edges(node):
+                # Backward steps walk the mirror of the edge in the path
+                step = e if side == 0 else self.mirror[e]
+                nxt = self.dst[e]
+                if (
+                    step is None
+                    or not allowed[step]
+                    or step in banned_edges
+                    or nxt in banned_nodes
+                    or nxt in done[side]
+                ):
+                    continue
+
+                nd = d + self.cost[step]
+                if nd < dist[side].get(nxt, inf):
+                    dist[side][nxt] = nd
+                    pred[side][nxt] = step
+                    heapq.heappush(heaps[side], (nd, nxt))
+
+                    total = nd + dist[1 - side].get(nxt, inf)
+                    if total < best:
+                        best, meeting = total, nxt
+
+        if meeting is None:
+            return None
+
+        path = []
+        node = meeting
+        while node != source:
+            e = pred[0][node]
+            path.append(e)
+            node = self.src[e]
+        path.reverse()
+
+        node = meeting
+        while node != target:
+            e = pred[1][node]
+            path.append(e)
+            node = self.dst[e]
+
+        return path
+
+    def k_shortest_paths(self, source, target, k, allowed):
+        """
+        Yen's algorithm for the `k` shortest loopless paths between two nodes.
+        """
+        first = self.shortest_path(source, target, allowed)
+        if first is None:
+            return []
+
+        paths = [first]
+        seen = {tuple(first)}
+        candidates = []
+
+        while len(paths) < k:
+            last = paths[-1]
+            nodes = [source] + [self.dst[e] for e in last]
+
+            for i in range(len(last)):
+                root = last[:i]
+                banned_edges = {p[i] for p in paths if len(p) > i and p[:i] == root}
+                spur = self.shortest_path(
+                    nodes[i], target, allowed, banned_edges, set(nodes[:i])
+                )
+                if spur is None:
+                    continue
+
+                candidate = tuple(root + spur)
+                if candidate not in seen:
+                    seen.add(candidate)
+                    heapq.heappush(candidates, (self.path_cost(candidate), candidate))
+
+            if not candidates:
+                break
+            paths.append(list(heapq.heappop(candidates)[1]))
+
+        return paths
+
+    def find_paths(self, sources, targets, allowed, k=1):
+        """
+        The union of the edges along the shortest paths from every source
+        to every target, or along the `k` shortest ones when k > 1.
+        """
+        edges = set()
+
+        for source in sources:
+            if k > 1:
+                for target in targets:
+                    for path in self.k_shortest_paths(source, target, k, allowed):
+                        edges.update(path)
+            elif len(targets) == 1:
+                edges.update(self.shortest_path(source, targets[0], allowed) or [])
+            else:
+                pred = self.shortest_tree(source, targets, allowed)
+                for target in targets:
+                    edges.update(self.path_from_tree(pred, source, target) or [])
+
+        return edges
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_graph_index() -> GraphIndex:
+    """
+    The process-wide GraphIndex, reloaded when the graph version changes.
+    """
+    global _index
+
+    version = get_graph_version()
+    if _index is None or _index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = GraphIndex.load(version)
+
+    return _index
+
+
+def path_cache_key(version, sources, targets, user, start_time, end_time, k):
+    access = "admin"
+    if not user.is_cradle_admin:
+        access = AccessVectorField.to_offsets(int(user.access_vector))
+
+    key = repr(
+        (
+            sorted(sources),
+            sorted(targets),
+            k,
+            start_time.isoformat(),
+            end_time.isoformat(),
+            access,
+        )
+    )
+    return f"pathfind:{version}:{hashlib.sha256(key.encode()).hexdigest()}"
+
+
+def find_path_edges(sources, targets, user, start_time, end_time, k=1):
+    """
+    Find the edges along the shortest paths between entries, as seen by a user.
+
+    Results are cached per graph version, so they are dropped whenever the
+    edges view is refreshed. Targets outside the component of a source are
+    skipped without searching.
+
+    Returns:
+        The GraphIndex used and the indices of the edges in it.
+    """
+    index = get_graph_index()
+    key = path_cache_key(
+        index.version, sources, targets, user, start_time, end_time, k
+    )
+
+    edge_ids = cache.get(key)
+    if edge_ids is None:
+        # Only search between entries in the same component, unreachable
+        # targets would make the search exhaust the source's component
+        pairs = [
+            (source, [t for t in targets if index.connected(source, t, user)])
+            for source in sources
+        ]
+        pairs = [(source, reachable) for source, reachable in pairs if reachable]
+
+        edges = set()
+        if pairs:
+            allowed = index.allowed_edges(user, start_time, end_time)
+            for source, reachable in pairs:
+                edges |= index.find_paths([source], reachable, allowed, k)
+
+        edge_ids = [index.ids[e] for e in edges]
+        cache.set(key, edge_ids, timeout=PATH_CACHE_TIMEOUT)
+
+    return index, [index.position[i] for i in edge_ids if i in index.position]
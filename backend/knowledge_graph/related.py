@@ -0,0 +1,280 @@
+import logging
+import threading
+
+import numpy as np
+import redis
+from django.db import connection
+
+from core.fields import AccessVectorField
+from core.utils import chunked, get_redis_client
+from management.settings import cradle_settings
+
+from .utils import visible_entries
+
+logger = logging.getLogger("django.request")
+
+RELATED_GENERATION_KEY = "related:generation"
+RELATED_PATCHES_KEY = "related:patches"
+FETCH_SIZE = 50000
+
+NOTE_ENTRIES_SQL = (
+    "SELECT n.id::text, n.access_vector, array_agg(ne.entry_id) "
+    "FROM notes_note AS n JOIN notes_note_entries AS ne ON ne.note_id = n.id "
+    "WHERE NOT n.fleeting {where} GROUP BY n.id"
+)
+
+
+def fetch_note_entries(note_ids=None):
+    """
+    The entries of every non-fleeting note, or of the given notes, as
+    (note id, access vector offsets, entry ids) rows.
+    """
+    where, params = "", None
+    if note_ids is not None:
+        where, params = "AND n.id = ANY(%s::uuid[])", [[str(i) for i in note_ids]]
+
+    rows = []
+    with connection.chunked_cursor() as cursor:
+        cursor.execute(NOTE_ENTRIES_SQL.format(where=where), params)
+        while chunk := cursor.fetchmany(FETCH_SIZE):
+            rows += chunk
+
+    return rows
+
+
+class RelatedIndex:
+    """
+    A sparse notes x entries incidence matrix, to rank the entries which
+    appear in the same notes as a given entry.
+
+    Rows are only ever appended: patching a note marks its previous row as
+    dead and appends its current entries. Notes keep the index of their
+    access vector in a table of distinct vectors, so masking notes for a user
+    only checks each distinct vector once.
+    """
+
+    def __init__(self, generation, rows):
+        from scipy.sparse import csr_matrix
+
+        self.generation = generation
+        self.applied = 0
+
+        self.entry_ids = []
+        self.column = {}
+        self.note_ids = []
+        self.row = {}
+
+        self.vectors = []
+        self.vector_ids = {}
+        self.vector_index = np.empty(0, dtype=np.int64)
+        self.live = np.empty(0, dtype=bool)
+        self.weights = np.empty(0)
+
+        self.matrix = csr_matrix((0, 0))
+        self.append(rows)
+
+    @classmethod
+    def load(cls, generation):
+        return cls(generation, fetch_note_entries())
+
+    def append(self, rows):
+        """
+        Add or replace the rows of the given notes.
+        """
+        from scipy.sparse import csr_matrix, vstack
+
+        indptr = [0]
+        indices = []
+        vector_index = []
+
+        for note_id, offsets, entry_ids in rows:
+            previous = self.row.get(note_id)
+            if previous is not None:
+                self.live[previous] = False
+
+            self.row[note_id] = len(self.note_ids)
+            self.note_ids.append(note_id)
+
+            for entry_id in set(entry_ids):
+                if entry_id not in self.column:
+                    self.column[entry_id] = len(self.entry_ids)
+                    self.entry_ids.append(entry_id)
+                indices.append(self.column[entry_id])
+            indptr.append(len(indices))
+
+            key = tuple(offsets)
+            if key not in self.vector_ids:
+                self.vector_ids[key] = len(self.vectors)
+                self.vectors.append(AccessVectorField.from_offsets(offsets))
+            vector_index.append(self.vector_ids[key])
+
+        shape = (len(indptr) - 1, len(self.entry_ids))
+        added = csr_matrix(
+            (np.ones(len(indices)), np.array(indices, dtype=np.int64), indptr),
+            shape=shape,
+        )
+
+        self.matrix.resize((self.matrix.shape[0], shape[1]))
+        self.matrix = vstack([self.matrix, added], format="csr")
+        self.by_entry = self.matrix.tocsc()
+
+        self.vector_index = np.concatenate(
+            [self.vector_index, np.array(vector_index, dtype=np.int64)]
+        )
+        self.live = np.concatenate([self.live, np.ones(shape[0], dtype=bool)])
+
+        # Large notes say less about each pair of their entries
+        sizes = np.diff(added.indptr)
+        self.weights = np.concatenate(
+            [self.weights, 1 / np.log2(1 + np.maximum(sizes, 1))]
+        )
+
+    def patch(self, note_ids):
+        """
+        Reload the given notes, dropping the ones which no longer exist or
+        have no entries.
+        """
+        note_ids = set(note_ids)
+        rows = fetch_note_entries(note_ids)
+
+        for note_id in note_ids - {row[0] for row in rows}:
+            previous = self.row.pop(note_id, None)
+            if previous is not None:
+                self.live[previous] = False
+
+        if rows:
+            self.append(rows)
+
+    def allowed_notes(self, user):
+        """
+        Which rows a user may rank with: the live notes whose access vector
+        the user holds.
+        """
+        allowed = self.live.copy()
+
+        if not user.is_cradle_admin and self.vectors:
+            vector = int(user.access_vector)
+            usable = np.array([(v & ~vector) == 0 for v in self.vectors])
+            allowed &= usable[self.vector_index]
+
+        return allowed
+
+    def related(self, entry_id, user):
+        """
+        Rank the entries sharing an accessible note with an entry.
+
+        Each shared note adds 1 / log2(1 + size) to the score, so entries
+        mentioned together in small notes rank above those which only meet
+        in large dumps.
+
+        Returns:
+            (entry id, score, shared note count) tuples, best first.
+        """
+        j = self.column.get(entry_id)
+        if j is None:
+            return []
+
+        start, end = self.by_entry.indptr[j], self.by_entry.indptr[j + 1]
+        rows = self.by_entry.indices[start:end]
+        rows = rows[self.allowed_notes(user)[rows]]
+        if len(rows) == 0:
+            return []
+
+        selected = self.matrix[rows]
+        scores = selected.T @ self.weights[rows]
+        shared = np.bincount(selected.indices, minlength=selected.shape[1])
+        shared[j] = 0
+
+        candidates = np.flatnonzero(shared)
+        order = candidates[np.lexsort((-shared[candidates], -scores[candidates]))]
+
+        return [
+            (self.entry_ids[c], float(scores[c]), int(shared[c])) for c in order
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_related_index() -> RelatedIndex:
+    """
+    The process-wide RelatedIndex. It is reloaded when the index is rebuilt,
+    and patched with the notes changed since it was loaded.
+    """
+    global _index
+
+    redis_client = get_redis_client()
+    generation, pending = (
+        redis_client.pipeline()
+        .get(RELATED_GENERATION_KEY)
+        .llen(RELATED_PATCHES_KEY)
+        .execute()
+    )
+    generation = int(generation) if generation else 0
+
+    with _index_lock:
+        if _index is None or _index.generation != generation:
+            _index = RelatedIndex.load(generation)
+            _index.applied = pending
+        elif _index.applied < pending:
+            note_ids = redis_client.lrange(
+                RELATED_PATCHES_KEY, _index.applied, pending - 1
+            )
+            _index.patch(i.decode() for i in note_ids)
+            _index.applied = pending
+
+    return _index
+
+
+def rebuild_related_index() -> int:
+    """
+    Make every process reload the index from the database on its next use.
+    """
+    redis_client = get_redis_client()
+    _, generation = (
+        redis_client.pipeline()
+        .delete(RELATED_PATCHES_KEY)
+        .incr(RELATED_GENERATION_KEY)
+        .execute()
+    )
+    return generation
+
+
+def mark_notes_changed(note_ids):
+    """
+    Queue notes whose entries or access changed for patching. Past
+    `related_max_patches` queued notes, the index is rebuilt instead.
+    """
+    note_ids = [str(i) for i in note_ids]
+    if not note_ids:
+        return
+
+    try:
+        redis_client = get_redis_client()
+        pending = redis_client.rpush(RELATED_PATCHES_KEY, *note_ids)
+        if pending > cradle_settings.graph.related_max_patches:
+            rebuild_related_index()
+    except redis.RedisError as e:
+        logger.warning(f"Could not queue related index patch: {e}")
+
+
+def get_related_entries(entry_id, user, k=10):
+    """
+    The `k` entries most related to an entry which the user can see, with
+    their score and number of shared notes.
+    """
+    ranked = get_related_index().related(entry_id, user)
+    result = []
+
+    for chunk in chunked(ranked, max(4 * k, 100)):
+        visible = set(
+            visible_entries(user)
+            .filter(id__in=[entry for entry, _, _ in chunk])
+            .values_list("id", flat=True)
+        )
+        result += [row for row in chunk if row[0] in visible]
+        if len(result) >= k:
+            break
+
+    return result[:k]
@@ -0,0 +1,30 @@
+import msgpack
+from rest_framework.renderers import BaseRenderer
+from rest_framework.request import Request
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renders responses as MessagePack. Graph views answer requests accepting
+    this media type with the columnar representation of their subgraph.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        return msgpack.packb(data, use_bin_type=True, datetime=True)
+
+
+def accepts_msgpack(request: Request) -> bool:
+    """
+    Whether content negotiation picked the MessagePack renderer for a request.
+    """
+    return getattr(request, "accepted_renderer", None) is not None and (
+        request.accepted_renderer.format == MessagePackRenderer.format
+    )
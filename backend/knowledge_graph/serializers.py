@@ -1,3 +1,4 @@
+import numpy as np
 from rest_framework import serializers
 from access.enums import AccessType
 from access.models import Access
@@ -13,30 +14,48 @@ from entries.serializers import (
 
 class PathfindQuery(serializers.Serializer):
     src = serializers.PrimaryKeyRelatedField(
-        queryset=Entry.objects.all(), required=True
+        queryset=Entry.objects.all(), required=False
+    )
+    srcs = serializers.PrimaryKeyRelatedField(
+        queryset=Entry.objects.all(), required=False, many=True
     )
     dsts = serializers.PrimaryKeyRelatedField(
         queryset=Entry.objects.all(), required=True, many=True
     )
     min_date = serializers.DateTimeField(required=True)
     max_date = serializers.DateTimeField(required=True)
+    k = serializers.IntegerField(
+        required=False,
+        default=1,
+        min_value=1,
+        max_value=10,
+        help_text="Number of shortest paths to find between each pair",
+    )
 
     class Meta:
-        fields = ["src", "dsts", "min_date", "max_date"]
+        fields = ["src", "srcs", "dsts", "min_date", "max_date", "k"]
 
     def __init__(self, *args, user=None, **kwargs):
         self.user = user
         super().__init__(*args, **kwargs)
 
     def validate(self, data):
-        if (
-            data["src"].entry_class.type == EntryType.ENTITY
-            and not Access.objects.has_access_to_entities(
-                self.user, {data["src"]}, {AccessType.READ, AccessType.READ_WRITE}
-            )
+        sources = list(data.get("srcs", []))
+        if data.get("src") is not None:
+            sources.insert(0, data["src"])
+
+        if not sources:
+            raise serializers.ValidationError("At least one source is required.")
+
+        if not Access.objects.has_access_to_entities(
+            self.user,
+            set([x for x in sources if x.entry_class.type == EntryType.ENTITY]),
+            {AccessType.READ, AccessType.READ_WRITE},
         ):
             raise serializers.ValidationError("The source entity is not accessible.")
 
+        data["sources"] = sources
+
         if not Access.objects.has_access_to_entities(
             self.user,
             set([x for x in data["dsts"] if x.entry_class.type == EntryType.ENTITY]),
@@ -49,6 +68,103 @@ class PathfindQuery(serializers.Serializer):
         return super().validate(data)
 
 
+class ViewportQuery(serializers.Serializer):
+    min_x = serializers.FloatField(required=True)
+    min_y = serializers.FloatField(required=True)
+    max_x = serializers.FloatField(required=True)
+    max_y = serializers.FloatField(required=True)
+    zoom = serializers.FloatField(required=False, default=1.0, min_value=1e-6)
+
+    class Meta:
+        fields = ["min_x", "min_y", "max_x", "max_y", "zoom"]
+
+    def validate(self, data):
+        if data["min_x"] > data["max_x"] or data["min_y"] > data["max_y"]:
+            raise serializers.ValidationError(
+                "The minimum corner of the viewport must be below the maximum one."
+            )
+
+        return super().validate(data)
+
+
+class TimelineQuery(serializers.Serializer):
+    src = serializers.PrimaryKeyRelatedField(
+        queryset=Entry.objects.all(), required=False
+    )
+    depth = serializers.IntegerField(
+        required=False, default=1, min_value=0, max_value=3
+    )
+    bucket = serializers.ChoiceField(
+        choices=["day", "week", "month"], required=False, default="day"
+    )
+    start_date = serializers.DateTimeField(required=False, default=None)
+    end_date = serializers.DateTimeField(required=False, default=None)
+
+    class Meta:
+        fields = ["src", "depth", "bucket", "start_date", "end_date"]
+
+    def __init__(self, *args, user=None, **kwargs):
+        self.user = user
+        super().__init__(*args, **kwargs)
+
+    def validate(self, data):
+        src = data.get("src")
+        if (
+            src is not None
+            and src.entry_class.type == EntryType.ENTITY
+            and not Access.objects.has_access_to_entities(
+                self.user, {src}, {AccessType.READ, AccessType.READ_WRITE}
+            )
+        ):
+            raise serializers.ValidationError("The source entity is not accessible.")
+
+        return super().validate(data)
+
+
+class RelatedQuery(serializers.Serializer):
+    src = serializers.PrimaryKeyRelatedField(
+        queryset=Entry.objects.all(), required=True
+    )
+    k = serializers.IntegerField(required=False, default=10, min_value=1, max_value=100)
+
+    class Meta:
+        fields = ["src", "k"]
+
+    def __init__(self, *args, user=None, **kwargs):
+        self.user = user
+        super().__init__(*args, **kwargs)
+
+    def validate(self, data):
+        src = data["src"]
+        if src.entry_class.type == EntryType.ENTITY and not (
+            Access.objects.has_access_to_entities(
+                self.user, {src}, {AccessType.READ, AccessType.READ_WRITE}
+            )
+        ):
+            raise serializers.ValidationError("The source entity is not accessible.")
+
+        return super().validate(data)
+
+
+class RelatedEntrySerializer(EntrySerializer):
+    score = serializers.FloatField(read_only=True)
+    shared_notes = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Entry
+        fields = ["id", "name", "entry_class", "score", "shared_notes"]
+
+
+class TimelineBucketSerializer(serializers.Serializer):
+    start = serializers.DateTimeField(help_text="Start of the bucket")
+    edges_created = serializers.IntegerField()
+    edges_last_seen = serializers.IntegerField()
+    edges_active = serializers.IntegerField(
+        help_text="Edges active at some point during the bucket"
+    )
+    entries_created = serializers.IntegerField()
+
+
 class EdgeRelationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Edge
@@ -110,6 +226,91 @@ class SubGraphSerializer(serializers.Serializer):
         return serializer
 
 
+class GraphClusterSerializer(serializers.Serializer):
+    x = serializers.FloatField(help_text="Centroid of the clustered entries")
+    y = serializers.FloatField(help_text="Centroid of the clustered entries")
+    count = serializers.IntegerField(help_text="Number of clustered entries")
+
+
+class GraphViewportSerializer(SubGraphSerializer):
+    clusters = GraphClusterSerializer(many=True)
+
+    class Meta:
+        fields = ["entries", "relations", "colors", "clusters"]
+
+
+class ColumnarEntriesSerializer(serializers.BaseSerializer):
+    """
+    Serializes entries as column arrays instead of one object per entry.
+
+    Entry classes are listed once under `classes`, and each entry refers to
+    its class by index. Coordinates are little-endian float32 buffers, with
+    NaN for entries which were not laid out yet.
+    """
+
+    def __init__(self, *args, extra_fields=(), **kwargs):
+        self.extra_fields = extra_fields
+        super().__init__(*args, **kwargs)
+
+    def entry_columns(self, entries):
+        classes = {"subtype": [], "type": [], "color": []}
+        class_index = {}
+        columns = {"id": [], "name": [], "class": []}
+        columns.update({field: [] for field in self.extra_fields})
+        xs, ys = [], []
+
+        for entry in entries:
+            entry_class = entry.entry_class
+            index = class_index.get(entry_class.subtype)
+            if index is None:
+                index = class_index[entry_class.subtype] = len(class_index)
+                classes["subtype"].append(entry_class.subtype)
+                classes["type"].append(entry_class.type)
+                classes["color"].append(entry_class.color)
+
+            columns["id"].append(entry.id)
+            columns["name"].append(entry.name)
+            columns["class"].append(index)
+            for field in self.extra_fields:
+                columns[field].append(getattr(entry, field))
+
+            location = entry.location
+            xs.append(location.x if location else np.nan)
+            ys.append(location.y if location else np.nan)
+
+        columns["x"] = np.array(xs, dtype="<f4").tobytes()
+        columns["y"] = np.array(ys, dtype="<f4").tobytes()
+
+        return classes, columns
+
+    def to_representation(self, data):
+        classes, columns = self.entry_columns(data)
+        return {"classes": classes, "entries": columns}
+
+
+class ColumnarSubGraphSerializer(ColumnarEntriesSerializer):
+    """
+    Columnar counterpart of SubGraphSerializer. Relations are columns of
+    edge ids, endpoints and Unix timestamps.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, extra_fields=("degree",), **kwargs)
+
+    def to_representation(self, data):
+        classes, columns = self.entry_columns(data["entries"])
+        relations = {"id": [], "src": [], "dst": [], "created_at": [], "last_seen": []}
+
+        for edge in data["relations"]:
+            relations["id"].append(edge.id)
+            relations["src"].append(edge.src)
+            relations["dst"].append(edge.dst)
+            relations["created_at"].append(int(edge.created_at.timestamp()))
+            relations["last_seen"].append(int(edge.last_seen.timestamp()))
+
+        return {"classes": classes, "entries": columns, "relations": relations}
+
+
 class EntryWithDepthSerializer(EntrySerializer):
     entry_class = EntryClassSerializerNoChildren(read_only=True)
     depth = serializers.IntegerField(read_only=True)
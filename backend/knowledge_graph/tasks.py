@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .related import rebuild_related_index
+
+
+@shared_task
+def rebuild_related_index_task():
+    return rebuild_related_index()
@@ -0,0 +1,37 @@
+import pickle
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import redis
+from django.test import SimpleTestCase
+
+from ..cache import get_or_compute
+
+
+@patch("knowledge_graph.cache.get_graph_version", return_value=1)
+@patch(
+    "knowledge_graph.cache.cradle_settings",
+    SimpleNamespace(graph=SimpleNamespace(neighbourhood_cache_ttl=60)),
+)
+@patch("knowledge_graph.cache.get_redis_client")
+class GraphCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.admin = SimpleNamespace(is_cradle_admin=True)
+
+    def test_hit_returned_when_stats_fail(self, get_client, _):
+        client = get_client.return_value
+        client.get.return_value = pickle.dumps(["cached"])
+        client.hincrby.side_effect = redis.RedisError
+        compute = MagicMock()
+
+        result = get_or_compute("paths", (1, 2), self.admin, compute)
+
+        self.assertEqual(result, ["cached"])
+        compute.assert_not_called()
+
+    def test_computed_without_redis(self, get_client, _):
+        get_client.return_value.get.side_effect = redis.RedisError
+
+        result = get_or_compute("paths", (1, 2), self.admin, lambda: ["computed"])
+
+        self.assertEqual(result, ["computed"])
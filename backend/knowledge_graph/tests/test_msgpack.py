@@ -0,0 +1,95 @@
+from datetime import datetime, timezone
+
+import msgpack
+import numpy as np
+from django.contrib.gis.geos import Point
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+
+from entries.models import Entry
+
+from .utils import GraphTestCase
+
+
+class MessagePackGraphTest(GraphTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.a, self.b, self.c = [
+            Entry.objects.create(
+                name=name,
+                entry_class=self.entryclass_username,
+                location=Point(i * 10.0, -i * 5.0, srid=0),
+            )
+            for i, name in enumerate(["a", "b", "c"])
+        ]
+
+        seen = datetime(2024, 1, 2, 12, tzinfo=timezone.utc)
+        self.relate(self.a, self.b, last_seen=seen)
+        self.relate(self.a, self.c, last_seen=seen)
+        self.refresh_edges()
+
+    def fetch(self, **headers):
+        response = self.client.get(
+            reverse("graph_fetch"),
+            {"src": self.a.id, "depth": 1},
+            **self.headers_admin,
+            **headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_msgpack_round_trips_to_json(self):
+        response = self.fetch(HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        columnar = msgpack.unpackb(response.content)["results"]
+
+        data = self.fetch(HTTP_ACCEPT="application/json").json()["results"]
+
+        entries = columnar["entries"]
+        xs = np.frombuffer(entries["x"], dtype="<f4")
+        ys = np.frombuffer(entries["y"], dtype="<f4")
+        subtypes = [columnar["classes"]["subtype"][i] for i in entries["class"]]
+        self.assertEqual(
+            {
+                (subtype, id, name, degree, (float(x), float(y)))
+                for subtype, id, name, degree, x, y in zip(
+                    subtypes,
+                    entries["id"],
+                    entries["name"],
+                    entries["degree"],
+                    xs,
+                    ys,
+                )
+            },
+            {
+                (subtype, e["id"], e["name"], e["degree"], tuple(e["location"]))
+                for subtype, items in data["entries"]["artifacts"].items()
+                for e in items
+            },
+        )
+        self.assertEqual(set(entries["id"]), {self.a.id, self.b.id, self.c.id})
+
+        relations = columnar["relations"]
+        self.assertEqual(
+            set(
+                zip(
+                    map(str, relations["id"]),
+                    relations["src"],
+                    relations["dst"],
+                    relations["created_at"],
+                    relations["last_seen"],
+                )
+            ),
+            {
+                (
+                    str(r["id"]),
+                    r["src"],
+                    r["dst"],
+                    int(parse_datetime(r["created_at"]).timestamp()),
+                    int(parse_datetime(r["last_seen"]).timestamp()),
+                )
+                for r in data["relations"]
+            },
+        )
+        self.assertEqual(len(data["relations"]), 2)
@@ -0,0 +1,90 @@
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from ..pathfinding import GraphIndex
+
+
+def make_rows(edges, now):
+    rows = []
+    for src, dst, cost, offsets in edges:
+        for a, b in [(src, dst), (dst, src)]:
+            rows.append(((a << 32) | b, a, b, offsets, now, now, cost))
+    return rows
+
+
+class GraphIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.window = (self.now - timedelta(days=1), self.now + timedelta(days=1))
+        self.admin = SimpleNamespace(is_cradle_admin=True)
+
+        # 1 - 2 - 3 - 4 is cheap, 1 - 5 - 4 is expensive and 5 is restricted
+        self.index_rows = make_rows(
+            [
+                (1, 2, 1, []),
+                (2, 3, 1, []),
+                (3, 4, 1, []),
+                (1, 5, 5, [7]),
+                (5, 4, 5, [7]),
+            ],
+            self.now,
+        )
+        self.index = GraphIndex(1, self.index_rows)
+
+    def nodes(self, path):
+        return [self.index.src[path[0]]] + [self.index.dst[e] for e in path]
+
+    def test_shortest_path(self):
+        allowed = self.index.allowed_edges(self.admin, *self.window)
+
+        path = self.index.shortest_path(1, 4, allowed)
+
+        self.assertEqual(self.nodes(path), [1, 2, 3, 4])
+
+    def test_k_shortest_paths(self):
+        allowed = self.index.allowed_edges(self.admin, *self.window)
+
+        paths = self.index.k_shortest_paths(1, 4, 3, allowed)
+
+        self.assertEqual(
+            [self.nodes(p) for p in paths], [[1, 2, 3, 4], [1, 5, 4]]
+        )
+
+    def test_access_mask(self):
+        user = SimpleNamespace(is_cradle_admin=False, access_vector=1)
+        allowed = self.index.allowed_edges(user, *self.window)
+
+        self.assertEqual(self.index.k_shortest_paths(1, 4, 3, allowed)[1:], [])
+        self.assertIsNone(self.index.shortest_path(1, 5, allowed))
+
+    def test_time_window(self):
+        later = (self.now + timedelta(days=2), self.now + timedelta(days=3))
+        allowed = self.index.allowed_edges(self.admin, *later)
+
+        self.assertIsNone(self.index.shortest_path(1, 4, allowed))
+
+    def test_multiple_targets(self):
+        allowed = self.index.allowed_edges(self.admin, *self.window)
+
+        edges = self.index.find_paths([1], [3, 5], allowed)
+
+        self.assertEqual(
+            {(self.index.src[e], self.index.dst[e]) for e in edges},
+            {(1, 2), (2, 3), (1, 5)},
+        )
+
+    def test_components(self):
+        user = SimpleNamespace(is_cradle_admin=False, access_vector=1)
+        index = GraphIndex(
+            2, self.index_rows + make_rows([(6, 7, 1, [])], self.now)
+        )
+
+        self.assertEqual(index.component_size(1, self.admin), 5)
+        self.assertEqual(index.component_size(6, self.admin), 2)
+        self.assertEqual(index.component_size(42, self.admin), 1)
+        self.assertTrue(index.connected(1, 5, self.admin))
+        self.assertFalse(index.connected(1, 5, user))
+        self.assertFalse(index.connected(1, 6, self.admin))
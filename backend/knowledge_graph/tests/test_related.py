@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from ..related import RelatedIndex
+
+
+class RelatedIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.admin = SimpleNamespace(is_cradle_admin=True)
+
+        # 1 and 2 share two notes, 1 and 3 one small note, 1 and 4 a large one
+        # which is restricted
+        self.index = RelatedIndex(
+            1,
+            [
+                ("a", [], [1, 2]),
+                ("b", [], [1, 2, 5]),
+                ("c", [], [1, 3]),
+                ("d", [7], [1, 4, 5, 6, 8]),
+            ],
+        )
+
+    def ranked(self, entry_id, user):
+        return [entry for entry, _, _ in self.index.related(entry_id, user)]
+
+    def test_ranking(self):
+        related = self.index.related(1, self.admin)
+
+        self.assertEqual([entry for entry, _, _ in related][:2], [2, 5])
+        self.assertEqual(dict((e, n) for e, _, n in related)[2], 2)
+        self.assertNotIn(1, [entry for entry, _, _ in related])
+
+    def test_access_mask(self):
+        user = SimpleNamespace(is_cradle_admin=False, access_vector=1)
+
+        self.assertEqual(self.ranked(1, user), [2, 3, 5])
+        self.assertEqual(self.ranked(4, user), [])
+
+    def test_replaced_note(self):
+        self.index.append([("c", [], [1, 9])])
+
+        self.assertIn(9, self.ranked(1, self.admin))
+        self.assertNotIn(3, self.ranked(1, self.admin))
+
+    def test_unknown_entry(self):
+        self.assertEqual(self.index.related(42, self.admin), [])
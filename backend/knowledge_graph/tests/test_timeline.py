@@ -0,0 +1,109 @@
+from datetime import date, datetime, timezone
+
+from django.urls import reverse
+
+from entries.models import Edge, Entry
+
+from ..utils import get_timeline
+from .utils import GraphTestCase
+
+
+def day(d, hour=12):
+    return datetime(2024, 1, d, hour, tzinfo=timezone.utc)
+
+
+class TimelineTest(GraphTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.a, self.b, self.c = [
+            Entry.objects.create(name=name, entry_class=self.entryclass_username)
+            for name in ["a", "b", "c"]
+        ]
+        self.case = Entry.objects.create(name="case", entry_class=self.entryclass_case)
+
+        self.relate(self.a, self.b, created_at=day(1), last_seen=day(3))
+        self.relate(self.b, self.c, created_at=day(2), last_seen=day(5))
+        self.relate(
+            self.a, self.c, public=False, created_at=day(10), last_seen=day(12)
+        )
+        self.relate(self.a, self.case, created_at=day(20), last_seen=day(20))
+        self.refresh_edges()
+
+    def active(self, start=None, end=None):
+        return set(
+            Edge.objects.remove_mirrors()
+            .active_between(start, end)
+            .values_list("src", "dst")
+        )
+
+    def test_active_between_open_start(self):
+        self.assertEqual(self.active(end=day(1, hour=23)), {(self.a.id, self.b.id)})
+
+    def test_active_between_open_end(self):
+        self.assertEqual(
+            self.active(start=day(11)),
+            {(self.a.id, self.c.id), (self.a.id, self.case.id)},
+        )
+
+    def test_active_between_window(self):
+        self.assertEqual(
+            self.active(day(4), day(10, hour=0)), {(self.b.id, self.c.id)}
+        )
+        self.assertEqual(self.active(day(6), day(9)), set())
+
+    def test_bucket_counts(self):
+        timeline = get_timeline(
+            self.admin_user, "day", [self.a.id, self.b.id, self.c.id], end=day(31)
+        )
+
+        self.assertEqual(
+            [
+                (
+                    b["start"].date(),
+                    b["edges_created"],
+                    b["edges_last_seen"],
+                    b["edges_active"],
+                )
+                for b in timeline
+            ],
+            [
+                (date(2024, 1, 1), 1, 0, 1),
+                (date(2024, 1, 2), 1, 0, 2),
+                (date(2024, 1, 3), 0, 1, 2),
+                (date(2024, 1, 5), 0, 1, 1),
+                (date(2024, 1, 10), 1, 0, 1),
+                (date(2024, 1, 12), 0, 1, 1),
+            ],
+        )
+
+    def test_active_count_carries_over(self):
+        timeline = get_timeline(
+            self.admin_user,
+            "day",
+            [self.a.id, self.b.id, self.c.id],
+            start=day(4),
+            end=day(31),
+        )
+
+        # b - c was created before the window and is still active in it
+        self.assertEqual(timeline[0]["start"].date(), date(2024, 1, 2))
+        self.assertEqual(
+            [(b["start"].date(), b["edges_active"]) for b in timeline[1:]],
+            [(date(2024, 1, 5), 1), (date(2024, 1, 10), 1), (date(2024, 1, 12), 1)],
+        )
+
+    def test_endpoint_access_filtering(self):
+        def totals(headers):
+            response = self.client.get(
+                reverse("graph_timeline"), {"bucket": "month"}, **headers
+            )
+            self.assertEqual(response.status_code, 200)
+            return (
+                sum(b["edges_created"] for b in response.data),
+                sum(b["entries_created"] for b in response.data),
+            )
+
+        # The restricted edge and the inaccessible entity are left out
+        self.assertEqual(totals(self.headers_normal), (3, 3))
+        self.assertEqual(totals(self.headers_admin), (4, 4))
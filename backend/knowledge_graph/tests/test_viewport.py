@@ -0,0 +1,101 @@
+import math
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from access.enums import AccessType
+from access.models import Access
+from entries.models import Entry
+
+from ..utils import viewport_cell
+from .utils import GraphTestCase
+
+
+def viewport_settings(max_entries=100, cell_size=50):
+    return SimpleNamespace(
+        graph=SimpleNamespace(
+            viewport_max_entries=max_entries, viewport_cell_size=cell_size
+        )
+    )
+
+
+@patch("knowledge_graph.utils.cradle_settings", viewport_settings())
+class ViewportCellTest(SimpleTestCase):
+    def test_cell_follows_zoom(self):
+        self.assertEqual(viewport_cell(100, 100, zoom=2.0), 25)
+
+    def test_cells_capped_when_zoomed_in(self):
+        cell = viewport_cell(10000, 500, zoom=1e6)
+
+        columns = math.floor(10000 / cell) + 1
+        rows = math.floor(500 / cell) + 1
+        self.assertLessEqual(columns * rows, 100)
+
+
+class GraphViewportTest(GraphTestCase):
+    def setUp(self):
+        super().setUp()
+
+        def create(name, entry_class, x):
+            return Entry.objects.create(
+                name=name, entry_class=entry_class, location=Point(x, 0.0, srid=0)
+            )
+
+        self.visible_case = create("visible", self.entryclass_case, 0.0)
+        self.hidden_case = create("hidden", self.entryclass_case, 1.0)
+        self.artifact = create("artifact", self.entryclass_username, 2.0)
+        self.orphan = create("orphan", self.entryclass_username, 3.0)
+
+        Access.objects.create(
+            user=self.normal_user,
+            entity=self.visible_case,
+            access_type=AccessType.READ,
+        )
+
+        self.relate(self.artifact, self.visible_case)
+        self.relate(self.orphan, self.hidden_case, public=False)
+        self.refresh_edges()
+
+    def viewport(self, headers):
+        response = self.client.get(
+            reverse("graph_viewport"),
+            {"min_x": -10, "min_y": -10, "max_x": 10, "max_y": 10},
+            **headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def names(self, data):
+        return {
+            entry["name"]
+            for kind in data["entries"].values()
+            for entries in kind.values()
+            for entry in entries
+        }
+
+    def test_inaccessible_entries_left_out(self):
+        data = self.viewport(self.headers_normal)
+
+        self.assertEqual(self.names(data), {"visible", "artifact"})
+        self.assertEqual(len(data["relations"]), 1)
+        self.assertEqual(data["clusters"], [])
+
+        data = self.viewport(self.headers_admin)
+
+        self.assertEqual(
+            self.names(data), {"visible", "hidden", "artifact", "orphan"}
+        )
+
+    @patch("knowledge_graph.utils.cradle_settings", viewport_settings(1, 48))
+    def test_clusters_above_max_entries(self):
+        data = self.viewport(self.headers_normal)
+
+        self.assertEqual(self.names(data), set())
+        self.assertEqual([c["count"] for c in data["clusters"]], [2])
+
+        data = self.viewport(self.headers_admin)
+
+        self.assertEqual([c["count"] for c in data["clusters"]], [4])
@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from entries.enums import EntryType, RelationReason
+from entries.models import EntryClass, Relation
+from user.models import CradleUser, UserRoles
+
+
+class GraphTestCase(TestCase):
+    def setUp(self):
+        self.patcher = patch("file_transfer.utils.MinioClient.create_user_bucket")
+        self.mocked_create_user_bucket = self.patcher.start()
+
+        self.success_logger_patcher = patch("logs.utils.success_logger")
+        self.error_logger_patcher = patch("logs.utils.error_logger")
+
+        self.mocked_success_logger = self.success_logger_patcher.start()
+        self.mocked_error_logger = self.error_logger_patcher.start()
+
+        # Graph queries are computed on every request
+        self.cache_patcher = patch(
+            "knowledge_graph.cache.get_or_compute",
+            side_effect=lambda kind, params, user, compute: compute(),
+        )
+        self.cache_patcher.start()
+
+        self.client = APIClient()
+        self.admin_user = CradleUser.objects.create_user(
+            username="admin",
+            password="password",
+            role=UserRoles.ADMIN,
+            is_staff=True,
+            email="alabala@gmail.com",
+        )
+        self.normal_user = CradleUser.objects.create_user(
+            username="user",
+            password="password",
+            is_staff=False,
+            email="b@c.d",
+        )
+        self.headers_admin = {
+            "HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.admin_user)}"
+        }
+        self.headers_normal = {
+            "HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.normal_user)}"
+        }
+
+        self.entryclass_username = EntryClass.objects.create(
+            type=EntryType.ARTIFACT, subtype="username"
+        )
+        self.entryclass_case = EntryClass.objects.create(
+            type=EntryType.ENTITY, subtype="case"
+        )
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.success_logger_patcher.stop()
+        self.error_logger_patcher.stop()
+        self.cache_patcher.stop()
+
+    def relate(self, e1, e2, public=True, **kwargs):
+        """
+        Relate two entries, the relation is public unless `public` is unset.
+        """
+        if public:
+            kwargs["access_vector"] = 1
+
+        return Relation.objects.create(
+            e1=e1, e2=e2, content_object=e1, reason=RelationReason.DIGEST, **kwargs
+        )
+
+    def refresh_edges(self):
+        with connection.cursor() as cursor:
+            cursor.execute("REFRESH MATERIALIZED VIEW edges")
@@ -1,9 +1,13 @@
 from django.urls import path
 from .views import (
+    GraphCacheStatsView,
     FetchGraphView,
     GraphPathFindView,
     GraphInaccessibleView,
     GraphNeighborsView,
+    GraphRelatedView,
+    GraphTimelineView,
+    GraphViewportView,
 )
 
 urlpatterns = [
@@ -19,4 +23,8 @@ urlpatterns = [
         FetchGraphView.as_view(),
         name="graph_fetch",
     ),
+    path("viewport/", GraphViewportView.as_view(), name="graph_viewport"),
+    path("related/", GraphRelatedView.as_view(), name="graph_related"),
+    path("timeline/", GraphTimelineView.as_view(), name="graph_timeline"),
+    path("cache/", GraphCacheStatsView.as_view(), name="graph_cache_stats"),
 ]
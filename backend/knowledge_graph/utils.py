@@ -1,13 +1,15 @@
+import math
 from typing import List
-from django.db import connection
-from django.db.models import Q
+from django.contrib.gis.geos import Polygon
+from django.db.models import Avg, Count, F, FloatField, Func, Min, Q
+from django.db.models.functions import Floor, Trunc
 
-from core.fields import BitStringField
+from access.models import Access
+from entries.enums import EntryType
 from entries.models import Edge, Entry
 from django.db.models import Value, IntegerField
-
-
-fieldtype = BitStringField(max_length=2048, null=False, default=1, varying=False)
+from knowledge_graph.pathfinding import find_path_edges
+from management.settings import cradle_settings
 
 
 def get_neighbors(
@@ -154,50 +156,31 @@ def get_neighbors_paginated(
     return final_result
 
 
-def get_edges_for_paths(start_id, targets, user, start_time, end_time) -> List[Edge]:
-    """
-    Compute Dijkstra shortest paths from a single source to multiple targets with time and access vector filtering.
-    """
-    # Safely format the target array as SQL literal
-    target_array = "ARRAY[%s]" % ",".join(str(int(t)) for t in targets)
-
-    # The dynamic SQL for the filtered edge set
-    inner_sql = f"""
-        SELECT id, src AS source, dst AS target, age AS cost
-        FROM edges
-        WHERE created_at <= %s
-          AND last_seen >= %s
-          AND (%s & access_vector) = '{fieldtype.get_prep_value(0)}'
+def get_edges_for_paths(
+    sources, targets, user, start_time, end_time, k=1
+) -> List[Edge]:
     """
+    Find the edges along the shortest paths from the sources to the targets,
+    or along the `k` shortest ones between each pair, using only the edges
+    seen between `start_time` and `end_time` which the user can access.
 
-    # The full pgr_dijkstra SQL
-    full_sql = f"""
-        SELECT seq, path_seq, node, edge, cost, agg_cost
-        FROM pgr_dijkstra(
-            $$ {inner_sql} $$,
-            %s,
-            {target_array},
-            directed := true
-        );
+    Paths are computed in process over the graph index, see
+    `knowledge_graph.pathfinding`. Edge costs are their age, so recently seen
+    relations are preferred.
     """
-
-    params = [
-        end_time,
-        start_time,
-        user.access_vector_inv,
-        start_id,
+    index, edges = find_path_edges(sources, targets, user, start_time, end_time, k)
+
+    return [
+        Edge(
+            id=index.ids[e],
+            src=index.src[e],
+            dst=index.dst[e],
+            created_at=index.created_at[e],
+            last_seen=index.last_seen[e],
+        )
+        for e in edges
     ]
 
-    with connection.cursor() as cursor:
-        cursor.execute(full_sql, params)
-        edge_ids = [row[3] for row in cursor.fetchall()]
-
-    if not edge_ids:
-        return []
-
-    edges = list(Edge.objects.filter(id__in=edge_ids))
-    return edges
-
 
 def filter_valid_edges(edges: List[Edge]) -> List[Edge]:
     srcids = {edge.src for edge in edges}
@@ -209,3 +192,172 @@ def filter_valid_edges(edges: List[Edge]) -> List[Edge]:
 
     edges = [edge for edge in edges if edge.src in entries and edge.dst in entries]
     return edges
+
+
+def visible_entries(user):
+    """
+    Entries a user may see on the graph: the entities they can read and
+    the artifacts with at least one accessible edge.
+    """
+    if user.is_cradle_admin:
+        return Entry.objects.all()
+
+    return Entry.objects.filter(
+        Q(
+            entry_class__type=EntryType.ENTITY,
+            id__in=Access.objects.get_accessible_entity_ids(user.id),
+        )
+        | Q(
+            entry_class__type=EntryType.ARTIFACT,
+            id__in=Edge.objects.accessible(user).values("src"),
+        )
+    )
+
+
+def viewport_cell(width, height, zoom):
+    """
+    The side of the aggregation cells of a viewport, in layout units.
+
+    Cells are `viewport_cell_size` screen pixels wide at the given zoom, but
+    never so small that the box spans more than `viewport_max_entries` cells,
+    however far the client zooms in.
+    """
+    side = max(1, math.isqrt(cradle_settings.graph.viewport_max_entries) - 1)
+    return max(
+        cradle_settings.graph.viewport_cell_size / zoom, max(width, height) / side
+    )
+
+
+def get_viewport(user, min_x, min_y, max_x, max_y, zoom=1.0):
+    """
+    Get the part of the graph inside a bounding box of the layout.
+
+    When the box holds more than `viewport_max_entries` entries, entries are
+    aggregated on a grid whose cells are `viewport_cell_size` screen pixels
+    wide at the given zoom (pixels per layout unit), see `viewport_cell`.
+    Cells holding a single entry still return it, the others become clusters.
+
+    Returns:
+        A dict with the `entries` and `relations` between them, the entry
+        class `colors`, and the `clusters`, each with its centroid and size.
+    """
+    bbox = Polygon.from_bbox((min_x, min_y, max_x, max_y))
+    bbox.srid = 0
+
+    inside = visible_entries(user).filter(location__bboverlaps=bbox)
+    clusters = []
+
+    if inside.count() <= cradle_settings.graph.viewport_max_entries:
+        entry_ids = list(inside.values_list("id", flat=True))
+    else:
+        cell = viewport_cell(max_x - min_x, max_y - min_y, zoom)
+        cells = (
+            inside.annotate(
+                px=Func("location", function="ST_X", output_field=FloatField()),
+                py=Func("location", function="ST_Y", output_field=FloatField()),
+            )
+            .annotate(cx=Floor(F("px") / cell), cy=Floor(F("py") / cell))
+            .values("cx", "cy")
+            .annotate(
+                count=Count("id"), x=Avg("px"), y=Avg("py"), entry_id=Min("id")
+            )
+            .order_by()
+        )
+
+        entry_ids = []
+        for row in cells:
+            if row["count"] == 1:
+                entry_ids.append(row["entry_id"])
+            else:
+                clusters.append({"x": row["x"], "y": row["y"], "count": row["count"]})
+
+    entries = Entry.objects.filter(id__in=entry_ids).select_related("entry_class")
+
+    edges = (
+        Edge.objects.filter(src__in=entry_ids, dst__in=entry_ids)
+        .remove_mirrors()
+        .accessible(user)
+    )
+
+    colors = {i.entry_class_id: i.entry_class.color for i in entries}
+
+    return {
+        "entries": entries,
+        "relations": list(edges),
+        "colors": colors,
+        "clusters": clusters,
+    }
+
+
+def get_timeline(user, bucket, entry_ids=None, start=None, end=None):
+    """
+    Count the activity of a subgraph per time bucket.
+
+    Edges are counted in the bucket they were created in and in the one they
+    were last seen in. The number of edges active in a bucket follows from
+    the running sums of both, so only the buckets where something changed
+    are returned, and the active count carries over between them.
+
+    Args:
+        user: The user whose accessible edges are counted
+        bucket: One of "day", "week" or "month"
+        entry_ids: Entries of the subgraph, or None for the whole graph
+        start: Optional start of the time window
+        end: Optional end of the time window
+
+    Returns:
+        A list of buckets, each with its `start`, the number of edges
+        created, last seen and active in it, and of entries created.
+    """
+    edges = Edge.objects.accessible(user).remove_mirrors()
+    entries = visible_entries(user)
+
+    if entry_ids is not None:
+        edges = edges.filter(src__in=entry_ids, dst__in=entry_ids)
+        entries = entries.filter(id__in=entry_ids)
+
+    edges = edges.active_between(start, end)
+    if start is not None:
+        entries = entries.filter(created_at__gte=start)
+    if end is not None:
+        entries = entries.filter(created_at__lte=end)
+
+    def histogram(queryset, field):
+        return dict(
+            queryset.annotate(bucket=Trunc(field, bucket))
+            .values("bucket")
+            .annotate(count=Count("id"))
+            .order_by()
+            .values_list("bucket", "count")
+        )
+
+    created = histogram(edges, "created_at")
+    last_seen = histogram(edges, "last_seen")
+    entries_created = histogram(entries, "created_at")
+
+    timeline = []
+    active = 0
+    for key in sorted(set(created) | set(last_seen) | set(entries_created)):
+        active += created.get(key, 0)
+        timeline.append(
+            {
+                "start": key,
+                "edges_created": created.get(key, 0),
+                "edges_last_seen": last_seen.get(key, 0),
+                "edges_active": active,
+                "entries_created": entries_created.get(key, 0),
+            }
+        )
+        # Edges last seen in this bucket are no longer active in the next
+        active -= last_seen.get(key, 0)
+
+    # Buckets before the window only seed the running sum, keep the one the
+    # window starts in
+    if start is not None:
+        before = [i for i, b in enumerate(timeline) if b["start"] <= start]
+        if before:
+            timeline = timeline[before[-1] :]
+    if end is not None:
+        timeline = [b for b in timeline if b["start"] <= end]
+
+    return timeline
@@ -3,6 +3,7 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.request import Request
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema, OpenApiParameter
@@ -18,21 +19,48 @@ from knowledge_graph.utils import (
     get_edges_for_paths,
     get_neighbors,
     get_neighbors_paginated,
+    get_timeline,
+    get_viewport,
 )
 from query.filters import EntryFilter
 from query.utils import parse_query
+from user.permissions import HasAdminRole
+from . import cache as graph_cache
+from .pathfinding import get_graph_index
+from .related import get_related_entries
+from .renderers import MessagePackRenderer, accepts_msgpack
 from .serializers import (
+    ColumnarEntriesSerializer,
+    ColumnarSubGraphSerializer,
     PathfindQuery,
+    RelatedEntrySerializer,
+    RelatedQuery,
     SubGraphSerializer,
     GraphInaccessibleResponseSerializer,
     EntryWithDepthSerializer,
+    GraphViewportSerializer,
+    TimelineBucketSerializer,
+    TimelineQuery,
+    ViewportQuery,
 )
 from django.utils.dateparse import parse_datetime
 
 
+def cache_params(request: Request):
+    """
+    Everything a cached graph response depends on besides the user's access:
+    the query parameters (source, depth, filters, page) and the format.
+    """
+    return (
+        sorted(request.query_params.lists()),
+        request.accepted_renderer.format,
+    )
+
+
 @extend_schema(
     summary="Find paths in knowledge graph",
-    description="Find paths between source and destination entries in the knowledge graph.",
+    description="Find the shortest paths, or the k shortest ones, between one or more "
+    "source entries and the destination entries in the knowledge graph.",
     request=PathfindQuery,
     responses={
         200: SubGraphSerializer,
@@ -43,22 +71,24 @@ from django.utils.dateparse import parse_datetime
 class GraphPathFindView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, MessagePackRenderer]
     serializer_class = SubGraphSerializer
 
     def post(self, request: Request) -> Response:
         query = PathfindQuery(data=request.data, user=request.user)
         query.is_valid(raise_exception=True)
 
-        start = query.validated_data["src"]
+        starts = query.validated_data["sources"]
         ends = query.validated_data["dsts"]
 
         edges = filter_valid_edges(
             get_edges_for_paths(
-                start.id,
+                [x.id for x in starts],
                 [x.id for x in ends],
                 request.user,
                 query.validated_data["min_date"],
                 query.validated_data["max_date"],
+                k=query.validated_data["k"],
             )
         )
 
@@ -68,15 +98,20 @@ class GraphPathFindView(APIView):
             entry_ids.add(i.src)
             entry_ids.add(i.dst)
 
-        entries = Entry.objects.filter(id__in=entry_ids)
+        entries = Entry.objects.filter(id__in=entry_ids).select_related("entry_class")
 
         colors = {}
 
-        for i in entries.all():
+        for i in entries:
             if i.entry_class_id not in colors:
                 colors[i.entry_class_id] = i.entry_class.color
 
-        serializer = SubGraphSerializer(
+        serializer_class = (
+            ColumnarSubGraphSerializer
+            if accepts_msgpack(request)
+            else SubGraphSerializer
+        )
+        serializer = serializer_class(
             {"relations": edges, "entries": entries, "colors": colors}
         )
 
@@ -135,6 +170,7 @@ class GraphPathFindView(APIView):
 class GraphNeighborsView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, MessagePackRenderer]
     serializer_class = EntrySerializer
 
     def get(self, request: Request) -> Response:
@@ -187,45 +223,58 @@ class GraphNeighborsView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
+            def level_filter(qs):
+                return qs.filter(query_filter)
+
+        else:
+            filterset = EntryFilter(request.query_params)
+
+            if not filterset.is_valid():
+                return Response(
+                    {"error": f"Invalid query syntax: {filterset.errors}"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            def level_filter(qs):
+                return EntryFilter(request.query_params, queryset=qs).qs
+
+        page_number = int(request.query_params.get("page", 1))
+
+        def compute():
             neighbors_qs = get_neighbors_paginated(
                 sourceset,
                 depth,
                 request.user,
                 True,
                 True,
-                lambda qs: qs.filter(query_filter),
+                level_filter,
                 page_size=page_size,
-                page_number=int(request.query_params.get("page", 1)),
+                page_number=page_number,
                 order_by="-last_seen",
             )
-        else:
-            filterset = EntryFilter(request.query_params)
 
-            if filterset.is_valid():
-                neighbors_qs = get_neighbors_paginated(
-                    sourceset,
-                    depth,
-                    request.user,
-                    True,
-                    True,
-                    lambda qs: EntryFilter(request.query_params, queryset=qs).qs,
-                    page_size=page_size,
-                    page_number=int(request.query_params.get("page", 1)),
-                    order_by="-last_seen",
-                )
+            if accepts_msgpack(request):
+                results = ColumnarEntriesSerializer(
+                    neighbors_qs, extra_fields=("depth",)
+                ).data
+                count = len(results["entries"]["id"])
             else:
-                return Response(
-                    {"error": f"Invalid query syntax: {filterset.errors}"},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+                results = EntryWithDepthSerializer(neighbors_qs, many=True).data
+                count = len(results)
+
+            return {
+                "page": page_number,
+                "has_next": count == page_size,
+                "component_size": get_graph_index().component_size(
+                    source_entry.id, request.user
+                ),
+                "results": results,
+            }
 
-        serializer = EntryWithDepthSerializer(neighbors_qs, many=True)
         return Response(
-            {
-                "page": int(request.query_params.get("page", 1)),
-                "has_next": len(serializer.data) == page_size,
-                "results": serializer.data,
-            }
+            graph_cache.get_or_compute(
+                "neighbors", cache_params(request), request.user, compute
+            )
         )
 
 
@@ -349,6 +398,7 @@ class GraphInaccessibleView(APIView):
 class FetchGraphView(APIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, MessagePackRenderer]
     serializer_class = SubGraphSerializer
 
     def get(self, request: Request) -> Response:
@@ -406,47 +456,272 @@ class FetchGraphView(APIView):
         except ValueError:
             return Response({"error": "page_size must be integer."}, status=400)
 
-        paginator = LazyPaginator(page_size=page_size)
-        paginated_at_depth = paginator.paginate_queryset(at_depth, request)
+        def compute():
+            paginator = LazyPaginator(page_size=page_size)
+            paginated_at_depth = paginator.paginate_queryset(at_depth, request)
 
-        edges = Edge.objects.filter(
-            (Q(src__in=prev_depth) & Q(dst__in=paginated_at_depth))
-            | (
-                Q(src__in=paginated_at_depth, dst__in=paginated_at_depth)
-                & Q(src__gt=F("dst"))
+            edges = Edge.objects.filter(
+                (Q(src__in=prev_depth) & Q(dst__in=paginated_at_depth))
+                | (
+                    Q(src__in=paginated_at_depth, dst__in=paginated_at_depth)
+                    & Q(src__gt=F("dst"))
+                )
+            ).order_by("-last_seen")
+
+            # Parse optional date filters
+            start_date = parse_datetime(
+                request.query_params.get("start_date")
+            )  # ISO format expected
+            end_date = parse_datetime(request.query_params.get("end_date"))
+
+            edges = edges.active_between(start_date, end_date)
+
+            if depth == 0:
+                entries = sourceset
+            else:
+                entry_ids = {i.src for i in edges} | {i.dst for i in edges}
+                entries = Entry.objects.filter(id__in=entry_ids)
+
+            entries = entries.select_related("entry_class")
+            colors = {i.entry_class_id: i.entry_class.color for i in entries}
+
+            serializer_class = (
+                ColumnarSubGraphSerializer
+                if accepts_msgpack(request)
+                else SubGraphSerializer
             )
-        ).order_by("-last_seen")
-
-        # Parse optional date filters
-        start_date = parse_datetime(
-            request.query_params.get("start_date")
-        )  # ISO format expected
-        end_date = parse_datetime(request.query_params.get("end_date"))
-
-        if start_date and end_date:
-            edges = edges.filter(
-                Q(created_at__range=(start_date, end_date))
-                | Q(last_seen__range=(start_date, end_date))
+            serializer = serializer_class(
+                {"relations": edges, "entries": entries, "colors": colors}
             )
-        elif start_date:
-            edges = edges.filter(
-                Q(created_at__gte=start_date) | Q(last_seen__gte=start_date)
+
+            return paginator.get_paginated_response(serializer.data).data
+
+        return Response(
+            graph_cache.get_or_compute(
+                "fetch", cache_params(request), request.user, compute
+            )
+        )
+
+
+@extend_schema(
+    summary="Fetch the graph inside a viewport",
+    description="Fetch the entries and edges positioned inside a bounding box of the "
+    "graph layout. Dense areas are aggregated into clusters depending on the zoom.",
+    parameters=[
+        OpenApiParameter(
+            name="min_x",
+            type=float,
+            location=OpenApiParameter.QUERY,
+            description="Left edge of the viewport",
+            required=True,
+        ),
+        OpenApiParameter(
+            name="min_y",
+            type=float,
+            location=OpenApiParameter.QUERY,
+            description="Bottom edge of the viewport",
+            required=True,
+        ),
+        OpenApiParameter(
+            name="max_x",
+            type=float,
+            location=OpenApiParameter.QUERY,
+            description="Right edge of the viewport",
+            required=True,
+        ),
+        OpenApiParameter(
+            name="max_y",
+            type=float,
+            location=OpenApiParameter.QUERY,
+            description="Top edge of the viewport",
+            required=True,
+        ),
+        OpenApiParameter(
+            name="zoom",
+            type=float,
+            location=OpenApiParameter.QUERY,
+            description="Screen pixels per layout unit",
+            default=1.0,
+        ),
+    ],
+    responses={
+        200: GraphViewportSerializer,
+        400: {"description": "Invalid viewport"},
+        401: {"description": "User is not authenticated"},
+    },
+)
+class GraphViewportView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = GraphViewportSerializer
+
+    def get(self, request: Request) -> Response:
+        query = ViewportQuery(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        viewport = get_viewport(request.user, **query.validated_data)
+
+        return Response(GraphViewportSerializer(viewport).data)
+
+
+@extend_schema(
+    summary="Graph activity timeline",
+    description="Count the edges created, last seen and active, and the entries "
+    "created, per time bucket. Restricted to the neighbourhood of a source entry "
+    "when one is given.",
+    parameters=[
+        OpenApiParameter(
+            name="src",
+            type=int,
+            location=OpenApiParameter.QUERY,
+            description="Source entry ID, the whole graph when omitted",
+        ),
+        OpenApiParameter(
+            name="depth",
+            type=int,
+            location=OpenApiParameter.QUERY,
+            description="Depth of the neighbourhood of the source entry",
+            default=1,
+        ),
+        OpenApiParameter(
+            name="bucket",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description="Size of the time buckets",
+            enum=["day", "week", "month"],
+            default="day",
+        ),
+        OpenApiParameter(
+            name="start_date",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description="Start of the time window (ISO format)",
+        ),
+        OpenApiParameter(
+            name="end_date",
+            type=str,
+            location=OpenApiParameter.QUERY,
+            description="End of the time window (ISO format)",
+        ),
+    ],
+    responses={
+        200: TimelineBucketSerializer(many=True),
+        400: {"description": "Invalid query"},
+        401: {"description": "User is not authenticated"},
+    },
+)
+class GraphTimelineView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = TimelineBucketSerializer
+
+    def get(self, request: Request) -> Response:
+        query = TimelineQuery(data=request.query_params, user=request.user)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+
+        def compute():
+            entry_ids = None
+            if params.get("src") is not None:
+                entry_ids = list(
+                    get_neighbors(
+                        Entry.objects.filter(pk=params["src"].pk),
+                        params["depth"],
+                        request.user,
+                        False,
+                        cumulative=True,
+                    ).values_list("id", flat=True)
+                )
+
+            timeline = get_timeline(
+                request.user,
+                params["bucket"],
+                entry_ids,
+                params["start_date"],
+                params["end_date"],
             )
-        elif end_date:
-            edges = edges.filter(
-                Q(created_at__lte=end_date) | Q(last_seen__lte=end_date)
+            return TimelineBucketSerializer(timeline, many=True).data
+
+        return Response(
+            graph_cache.get_or_compute(
+                "timeline", cache_params(request), request.user, compute
             )
+        )
 
-        if depth == 0:
-            entries = sourceset
-        else:
-            entry_ids = {i.src for i in edges} | {i.dst for i in edges}
-            entries = Entry.objects.filter(id__in=entry_ids)
 
-        colors = {i.entry_class_id: i.entry_class.color for i in entries}
+@extend_schema(
+    summary="Related entries",
+    description="Rank the entries most related to an entry, by the accessible notes "
+    "they share with it. Entries sharing small notes rank above entries which only "
+    "appear together in large ones.",
+    parameters=[
+        OpenApiParameter(
+            name="src",
+            type=int,
+            location=OpenApiParameter.QUERY,
+            description="Entry ID",
+            required=True,
+        ),
+        OpenApiParameter(
+            name="k",
+            type=int,
+            location=OpenApiParameter.QUERY,
+            description="Number of entries to return",
+            default=10,
+        ),
+    ],
+    responses={
+        200: RelatedEntrySerializer(many=True),
+        400: {"description": "Invalid query"},
+        401: {"description": "User is not authenticated"},
+    },
+)
+class GraphRelatedView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    serializer_class = RelatedEntrySerializer
+
+    def get(self, request: Request) -> Response:
+        query = RelatedQuery(data=request.query_params, user=request.user)
+        query.is_valid(raise_exception=True)
+
+        ranked = get_related_entries(
+            query.validated_data["src"].pk,
+            request.user,
+            query.validated_data["k"],
+        )
 
-        serializer = SubGraphSerializer(
-            {"relations": edges, "entries": entries, "colors": colors}
+        entries = Entry.objects.select_related("entry_class").in_bulk(
+            [entry_id for entry_id, _, _ in ranked]
         )
+        related = []
+        for entry_id, score, shared in ranked:
+            entry = entries.get(entry_id)
+            if entry is not None:
+                entry.score = score
+                entry.shared_notes = shared
+                related.append(entry)
+
+        return Response(RelatedEntrySerializer(related, many=True).data)
+
+
+@extend_schema(
+    summary="Graph cache statistics",
+    description="Hit and miss counts of the graph query cache per query kind, and the "
+    "number of entries cached for the current graph version. Admin only.",
+    responses={
+        200: {"description": "Cache statistics"},
+        401: {"description": "User is not authenticated"},
+        403: {"description": "User is not an admin"},
+    },
+)
+class GraphCacheStatsView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated, HasAdminRole]
+
+    def get(self, request: Request) -> Response:
+        return Response(graph_cache.get_stats())
 
-        return paginator.get_paginated_response(serializer.data)
+    def delete(self, request: Request) -> Response:
+        graph_cache.reset_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,123 @@
+import json
+import logging
+import uuid
+
+import redis
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.utils import timezone
+from psycopg2.extras import execute_values
+
+from core.utils import get_redis_client
+from management.settings import cradle_settings
+
+from .enums import EventType
+from .models import EventLog
+
+logger = logging.getLogger("django.request")
+
+FETCH_BUFFER_KEY = "logs:fetch:buffer"
+FETCH_FLUSH_SCHEDULED_KEY = "logs:fetch:flush_scheduled"
+
+INSERT_SQL = """
+INSERT INTO {table} (id, timestamp, type, user_id, content_type_id, object_id)
+SELECT v.id, v.timestamp, v.type, v.user_id, v.content_type_id, v.object_id
+FROM (VALUES %s) AS v (id, timestamp, type, user_id, content_type_id, object_id)
+WHERE EXISTS (SELECT 1 FROM {user_table} AS u WHERE u.id = v.user_id)
+ON CONFLICT (id, timestamp) DO NOTHING
+"""
+INSERT_TEMPLATE = "(%s::uuid, %s::timestamptz, %s, %s::uuid, %s::integer, %s)"
+
+
+def buffer_fetch(user, obj):
+    """
+    Append a fetch event to the Redis buffer, to be written by
+    `flush_fetch_logs`. The event is written directly when the buffer holds
+    `logs.fetch_buffer_max` events or Redis is unavailable.
+
+    A flush is scheduled as soon as the buffer reaches `logs.fetch_batch_size`
+    events, the periodic flush picks up the rest.
+    """
+    event = {
+        "id": str(uuid.uuid4()),
+        "timestamp": timezone.now().isoformat(),
+        "user_id": str(user.pk),
+        "content_type_id": ContentType.objects.get_for_model(obj).id,
+        "object_id": str(obj.pk),
+    }
+
+    try:
+        redis_client = get_redis_client()
+        buffered = redis_client.llen(FETCH_BUFFER_KEY)
+        if buffered < cradle_settings.logs.fetch_buffer_max:
+            pending = redis_client.rpush(FETCH_BUFFER_KEY, json.dumps(event))
+            if pending >= cradle_settings.logs.fetch_batch_size and redis_client.set(
+                FETCH_FLUSH_SCHEDULED_KEY, 1, nx=True, ex=60
+            ):
+                from .tasks import flush_fetch_logs_task
+
+                flush_fetch_logs_task.apply_async()
+            return
+    except redis.RedisError as e:
+        logger.warning(f"Fetch log buffer unavailable: {e}")
+
+    write_fetch_events([event])
+
+
+def write_fetch_events(events):
+    """
+    Insert buffered fetch events. Events already written are skipped, so a
+    batch can be written more than once, and events of deleted users are
+    dropped.
+    """
+    rows = [
+        (
+            e["id"],
+            e["timestamp"],
+            EventType.FETCH,
+            e["user_id"],
+            e["content_type_id"],
+            e["object_id"],
+        )
+        for e in events
+    ]
+
+    sql = INSERT_SQL.format(
+        table=EventLog._meta.db_table,
+        user_table=EventLog._meta.get_field("user").related_model._meta.db_table,
+    )
+    with connection.cursor() as cursor:
+        execute_values(cursor.cursor, sql, rows, template=INSERT_TEMPLATE)
+
+
+def flush_fetch_logs(batch_size=None):
+    """
+    Write the buffered fetch events in batches until the buffer is empty.
+
+    Events are only removed from the buffer once their batch is committed,
+    so an interrupted flush writes them again on the next one. Only one
+    flush may run at a time, producers only append to the buffer.
+
+    Returns:
+        The number of events flushed.
+    """
+    batch_size = batch_size or cradle_settings.logs.fetch_batch_size
+    redis_client = get_redis_client()
+    redis_client.delete(FETCH_FLUSH_SCHEDULED_KEY)
+
+    flushed = 0
+    while batch := redis_client.lrange(FETCH_BUFFER_KEY, 0, batch_size - 1):
+        events = []
+        for raw in batch:
+            try:
+                events.append(json.loads(raw))
+            except ValueError:
+                logger.warning(f"Dropping malformed fetch log: {raw!r}")
+
+        with transaction.atomic():
+            write_fetch_events(events)
+
+        redis_client.ltrim(FETCH_BUFFER_KEY, len(batch), -1)
+        flushed += len(batch)
+
+    return flushed
@@ -0,0 +1,108 @@
+# Generated by Django 5.0.4 on 2026-10-19 14:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The existing table becomes the partition holding every row up to the end of
+# the current month, so no rows are copied. Postgres requires the partition key
+# in the primary key, and foreign keys to a partitioned table must include it,
+# so the primary key becomes (id, timestamp) and src_log loses its constraint.
+PARTITION_SQL = """
+ALTER TABLE logs_eventlog RENAME TO logs_eventlog_legacy;
+ALTER INDEX logs_eventlog_pkey RENAME TO logs_eventlog_legacy_pkey;
+
+DO $$
+DECLARE c record;
+BEGIN
+    FOR c IN
+        SELECT conname FROM pg_constraint
+        WHERE conrelid = 'logs_eventlog_legacy'::regclass
+          AND confrelid = 'logs_eventlog_legacy'::regclass
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE logs_eventlog_legacy DROP CONSTRAINT %I', c.conname
+        );
+    END LOOP;
+END $$;
+
+CREATE TABLE logs_eventlog (LIKE logs_eventlog_legacy INCLUDING DEFAULTS)
+    PARTITION BY RANGE (timestamp);
+ALTER TABLE logs_eventlog ADD PRIMARY KEY (id, timestamp);
+ALTER TABLE logs_eventlog
+    ADD CONSTRAINT logs_eventlog_user_fk FOREIGN KEY (user_id)
+    REFERENCES user_cradleuser (id) DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE logs_eventlog
+    ADD CONSTRAINT logs_eventlog_content_type_fk FOREIGN KEY (content_type_id)
+    REFERENCES django_content_type (id) DEFERRABLE INITIALLY DEFERRED;
+
+CREATE INDEX eventlog_object_idx
+    ON logs_eventlog (content_type_id, object_id, timestamp);
+CREATE INDEX eventlog_user_idx ON logs_eventlog (user_id, timestamp);
+CREATE INDEX eventlog_timestamp_idx ON logs_eventlog (timestamp, id);
+CREATE INDEX eventlog_src_log_idx ON logs_eventlog (src_log_id);
+
+ALTER TABLE logs_eventlog ATTACH PARTITION logs_eventlog_legacy
+    FOR VALUES FROM (MINVALUE) TO (date_trunc('month', now()) + interval '1 month');
+CREATE TABLE logs_eventlog_default PARTITION OF logs_eventlog DEFAULT;
+
+DO $$
+DECLARE
+    bound timestamptz;
+BEGIN
+    FOR i IN 1..3 LOOP
+        bound := date_trunc('month', now()) + make_interval(months => i);
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF logs_eventlog FOR VALUES FROM (%L) TO (%L)',
+            'logs_eventlog_' || to_char(bound, 'YYYY_MM'),
+            bound,
+            bound + interval '1 month'
+        );
+    END LOOP;
+END $$;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("logs", "0004_auto_20250423_1847"),
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunSQL(PARTITION_SQL)],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="eventlog",
+                    name="src_log",
+                    field=models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="propagated_logs",
+                        to="logs.eventlog",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="eventlog",
+                    index=models.Index(
+                        fields=["content_type", "object_id", "timestamp"],
+                        name="eventlog_object_idx",
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="eventlog",
+                    index=models.Index(
+                        fields=["user", "timestamp"], name="eventlog_user_idx"
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="eventlog",
+                    index=models.Index(
+                        fields=["timestamp", "id"], name="eventlog_timestamp_idx"
+                    ),
+                ),
+            ],
+        ),
+    ]
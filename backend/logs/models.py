@@ -3,8 +3,8 @@ from typing import Optional, Union
 
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
-from django.db.models.fields.related import ReverseManyToOneDescriptor
+from django.db import models, transaction
+from management.settings import cradle_settings
 
 from .enums import EventType
 from .managers import EventLogManager
@@ -27,12 +27,15 @@ class EventLog(models.Model):
     details: Optional[dict] = models.CharField(blank=True, null=True)
 
     # Reference to the log that triggered this event, if applicable
+    # Not enforced by the database, foreign keys to a partitioned table must
+    # include the partition key
     src_log: Optional[models.ForeignKey] = models.ForeignKey(
         "self",
         null=True,
         blank=True,
         on_delete=models.SET_NULL,
         related_name="propagated_logs",
+        db_constraint=False,
     )
 
     # Generic relation fields
@@ -46,6 +49,19 @@ class EventLog(models.Model):
 
     class Meta:
         ordering = ["-timestamp"]  # Orders by most recent events first
+        # The table is partitioned by month on timestamp, see migration 0005
+        indexes = [
+            models.Index(
+                fields=["content_type", "object_id", "timestamp"],
+                name="eventlog_object_idx",
+            ),  # For the activity of an object
+            models.Index(
+                fields=["user", "timestamp"], name="eventlog_user_idx"
+            ),  # For the activity of a user
+            models.Index(
+                fields=["timestamp", "id"], name="eventlog_timestamp_idx"
+            ),  # For keyset pagination
+        ]
 
     objects = EventLogManager()  # Assign custom manager
 
@@ -54,9 +70,10 @@ class EventLog(models.Model):
 
     def propagate(self, obj):
         """
-        Create a propagated log entry with reference to the originating log (src_log).
+        Build a propagated log entry with reference to the originating log (src_log).
+        The entry is not saved, propagated logs are inserted in bulk.
         """
-        return EventLog.objects.create(
+        return EventLog(
             user=self.user,
             content_object=obj,
             type=EventType.EDIT,
@@ -65,36 +82,67 @@ class EventLog(models.Model):
 
 
 class LoggableModelMixin:
-    def _linked_loggables(self):
-        for field in self._meta.get_fields():
-            if isinstance(field, (models.ForeignKey, models.OneToOneField)):
-                related_instance = getattr(self, field.name, None)
-                if isinstance(related_instance, LoggableModelMixin):
-                    yield related_instance
+    # Related objects to fetch along with linked loggables of this model,
+    # for the fields propagate_from reads
+    propagation_select_related = ()
 
-            elif isinstance(field, models.ManyToManyField):
-                related_manager = getattr(self, field.name)
-                if issubclass(field.model, LoggableModelMixin):
-                    for related_instance in related_manager.all():
-                        yield related_instance
+    _link_fields = None
+
+    @classmethod
+    def _loggable_link_fields(cls):
+        """
+        The names of the forward and many-to-many fields of this model which
+        point to loggable models, computed once per model class.
+        """
+        if cls.__dict__.get("_link_fields") is None:
+            fields = []
+            for field in cls._meta.get_fields():
+                if not isinstance(
+                    field, (models.ForeignKey, models.ManyToManyField)
+                ) or not issubclass(field.related_model, LoggableModelMixin):
+                    continue
+                fields.append((field.name, field.many_to_many))
+            cls._link_fields = fields
+
+        return cls._link_fields
 
-            elif isinstance(field, ReverseManyToOneDescriptor):  # One-to-many relation
-                related_manager = getattr(self, field.get_accessor_name())
+    def _linked_loggables(self):
+        for name, many in self._loggable_link_fields():
+            if not many:
+                related_instance = getattr(self, name, None)
+                if related_instance is not None:
+                    yield related_instance
+                continue
 
-                if issubclass(field.model, LoggableModelMixin):
-                    for related_instance in related_manager.all():
-                        yield related_instance
+            related_manager = getattr(self, name)
+            yield from related_manager.select_related(
+                *related_manager.model.propagation_select_related
+            )
 
     def _propagate_log(self, log):
-        for i in self._linked_loggables():
-            i.propagate_from(log)
+        logs = [i.propagate_from(log) for i in self._linked_loggables()]
+        logs = [i for i in logs if i is not None]
+        EventLog.objects.bulk_create(logs)
+        return len(logs)
 
     def propagate_from(self, log: EventLog):
-        log.propagate(self).save()
+        """
+        The log to record on this object for a log on a linked object,
+        or None to skip it.
+        """
+        return log.propagate(self)
 
     def _save_log(self, log):
         log.save()
-        self._propagate_log(log)
+
+        # Deleted objects cannot be reloaded later to find their links
+        if cradle_settings.logs.defer_propagation and log.type != EventType.DELETE:
+            from .tasks import propagate_log
+
+            transaction.on_commit(lambda: propagate_log.apply_async((log.id,)))
+        else:
+            self._propagate_log(log)
+
         return log
 
     def log_create(self, user, details=None):
@@ -119,10 +167,10 @@ class LoggableModelMixin:
         )
 
     def log_fetch(self, user, details=None):
-        # Fetch events are not propagated
-        return EventLog.objects.create(
-            user=user, content_object=self, type=EventType.FETCH
-        )
+        # Fetch events are not propagated, and are written in batches
+        from .buffer import buffer_fetch
+
+        buffer_fetch(user, self)
 
     def __repr__(self):
         return f"<{self.__class__.__name__}:{self.pk}>"
@@ -0,0 +1,153 @@
+import logging
+import re
+from datetime import datetime
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from management.settings import cradle_settings
+
+from .models import EventLog
+
+logger = logging.getLogger("django.request")
+
+BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def month_start(value: datetime, offset=0) -> datetime:
+    """
+    The first instant of the month `offset` months after the one of `value`.
+    """
+    index = value.year * 12 + value.month - 1 + offset
+    return value.replace(
+        year=index // 12,
+        month=index % 12 + 1,
+        day=1,
+        hour=0,
+        minute=0,
+        second=0,
+        microsecond=0,
+    )
+
+
+def partition_name(start: datetime) -> str:
+    return f"{EventLog._meta.db_table}_{start:%Y_%m}"
+
+
+def parse_bound(bound):
+    if bound == "MINVALUE" or bound == "MAXVALUE":
+        return None
+    return parse_datetime(bound.strip("'"))
+
+
+def get_partitions():
+    """
+    The range partitions of the event log table, with the lower and upper
+    bound of each, None when unbounded. The default partition is left out.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits AS i JOIN pg_class AS c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [EventLog._meta.db_table],
+        )
+        rows = cursor.fetchall()
+
+    partitions = {}
+    for name, bound in rows:
+        match = BOUND_RE.search(bound)
+        if match:
+            partitions[name] = (parse_bound(match[1]), parse_bound(match[2]))
+
+    return partitions
+
+
+def create_partition(start: datetime):
+    """
+    Create the partition for the month starting at `start`. Rows of that month
+    which already landed in the default partition are moved into it.
+    """
+    table = EventLog._meta.db_table
+    name = partition_name(start)
+    end = month_start(start, 1)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {name} "
+            f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {table}_default "
+            "WHERE timestamp >= %s AND timestamp < %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            [start, end],
+        )
+        cursor.execute(
+            f"ALTER TABLE {table} ATTACH PARTITION {name} "
+            "FOR VALUES FROM (%s) TO (%s)",
+            [start, end],
+        )
+
+
+def ensure_partitions(months_ahead=3):
+    """
+    Create the monthly partitions from the current month to `months_ahead`
+    months ahead which do not exist yet.
+
+    Returns:
+        The names of the created partitions.
+    """
+    existing = get_partitions()
+    now = timezone.now()
+    created = []
+
+    for offset in range(months_ahead + 1):
+        start, end = month_start(now, offset), month_start(now, offset + 1)
+        # Months may already be covered, e.g. by the legacy partition
+        if any(
+            (lower is None or lower < end) and (upper is None or start < upper)
+            for lower, upper in existing.values()
+        ):
+            continue
+
+        create_partition(start)
+        created.append(partition_name(start))
+
+    return created
+
+
+def apply_retention():
+    """
+    Detach the partitions whose rows are all older than `logs.retention_months`
+    months. Detached partitions are renamed with an `archive_` prefix and kept,
+    to be exported and dropped by hand, or dropped right away when
+    `logs.retention_action` is "drop".
+
+    Returns:
+        The names of the partitions which were detached.
+    """
+    months = cradle_settings.logs.retention_months
+    if not months:
+        return []
+
+    table = EventLog._meta.db_table
+    cutoff = month_start(timezone.now(), -months)
+    detached = []
+
+    for name, (_, upper) in get_partitions().items():
+        if upper is None or upper > cutoff:
+            continue
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+            if cradle_settings.logs.retention_action == "drop":
+                cursor.execute(f"DROP TABLE {name}")
+            else:
+                cursor.execute(f"ALTER TABLE {name} RENAME TO archive_{name}")
+
+        logger.info(f"Detached event log partition {name}")
+        detached.append(name)
+
+    return detached
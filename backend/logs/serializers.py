@@ -36,8 +36,14 @@ class EventLogSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(serializers.DictField(allow_null=True))
     def get_src_log(self, obj):
-        if obj.src_log is not None:
-            return EventLogSerializer(obj.src_log).data
+        try:
+            src_log = obj.src_log
+        except EventLog.DoesNotExist:
+            # The source log was in a partition past retention
+            return None
+
+        if src_log is not None:
+            return EventLogSerializer(src_log).data
         else:
             return None
 
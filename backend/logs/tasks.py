@@ -0,0 +1,39 @@
+from celery import shared_task
+from core.decorators import distributed_lock
+
+from management.settings import cradle_settings
+
+from .buffer import flush_fetch_logs
+from .models import EventLog
+from .partitions import apply_retention, ensure_partitions
+
+
+@shared_task
+def propagate_log(log_id):
+    """
+    Record a log on the objects linked to its subject, for logs whose
+    propagation was deferred.
+    """
+    log = EventLog.objects.select_related("user").filter(id=log_id).first()
+    if log is None or log.content_object is None:
+        return 0
+
+    return log.content_object._propagate_log(log)
+
+
+@shared_task
+@distributed_lock("flush_fetch_logs", timeout=300)
+def flush_fetch_logs_task():
+    return flush_fetch_logs()
+
+
+@shared_task
+@distributed_lock("maintain_log_partitions", timeout=300)
+def maintain_log_partitions():
+    """
+    Create the upcoming monthly partitions of the event log, and detach the
+    ones past the retention period.
+    """
+    created = ensure_partitions(cradle_settings.logs.partitions_ahead)
+    detached = apply_retention()
+    return {"created": created, "detached": detached}
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from user.models import CradleUser
+
+from ..enums import EventType
+from ..models import EventLog
+from ..partitions import ensure_partitions, month_start
+from .utils import LogsTestCase
+
+
+class EventLogListTest(LogsTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.admin = CradleUser.objects.create_superuser(
+            username="admin", password="pass", email="b@c.d"
+        )
+        self.headers = {
+            "HTTP_AUTHORIZATION": f"Bearer {AccessToken.for_user(self.admin)}"
+        }
+
+        for _ in range(25):
+            EventLog.objects.create(
+                user=self.admin, content_object=self.admin, type=EventType.LOGIN
+            )
+
+    def test_keyset_pages(self):
+        seen = []
+        cursor = ""
+
+        while cursor is not None:
+            response = self.client.get(
+                reverse("event-log-list"),
+                {"cursor": cursor, "page_size": 10},
+                **self.headers,
+            )
+            self.assertEqual(response.status_code, 200)
+            seen += [log["id"] for log in response.json()["results"]]
+            cursor = response.json()["next"]
+
+        expected = EventLog.objects.order_by("-timestamp", "-id")
+        self.assertEqual(seen, [str(i) for i in expected.values_list("id", flat=True)])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(
+            reverse("event-log-list"), {"cursor": "nope"}, **self.headers
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_numbers_without_cursor(self):
+        response = self.client.get(reverse("event-log-list"), **self.headers)
+
+        self.assertEqual(response.json()["count"], 25)
+
+
+class PartitionTest(LogsTestCase):
+    def test_month_start(self):
+        value = datetime(2026, 12, 15, 10, 30, tzinfo=timezone.utc)
+
+        self.assertEqual(
+            month_start(value, 1), datetime(2027, 1, 1, tzinfo=timezone.utc)
+        )
+        self.assertEqual(
+            month_start(value, -12), datetime(2025, 12, 1, tzinfo=timezone.utc)
+        )
+
+    def test_ensure_partitions_is_idempotent(self):
+        ensure_partitions(6)
+
+        self.assertEqual(ensure_partitions(6), [])
@@ -4,7 +4,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from drf_spectacular.utils import extend_schema
 
-from core.pagination import TotalPagesPagination
+from core.pagination import KeysetPagination, TotalPagesPagination
 from user.permissions import HasAdminRole
 from .models import EventLog
 from .filters import EventLogFilter
@@ -13,7 +13,9 @@ from .serializers import EventLogSerializer  # Create this serializer in step 3
 
 @extend_schema(
     summary="List event logs",
-    description="Returns a filtered list of event logs. Only available to admin users.",
+    description="Returns a filtered list of event logs. Only available to admin users. "
+    "Pass `cursor` (empty for the first page) to page by keyset instead of by page "
+    "number, following the `next` cursor of each response.",
     responses={
         200: TotalPagesPagination().get_paginated_response_serializer(
             EventLogSerializer
@@ -30,3 +32,12 @@ class EventLogListView(ListAPIView):
 
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated, HasAdminRole]
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.request.query_params.get("cursor") is not None:
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = TotalPagesPagination()
+        return self._paginator
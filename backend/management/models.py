@@ -1,6 +1,18 @@
+import logging
+import os
+import threading
+import time
+
+import redis
 from django.conf import settings
-from django.db import models
-from django.core.cache import cache
+from django.db import models, transaction
+
+from core.utils import get_redis_client
+
+logger = logging.getLogger("django.request")
+
+SETTINGS_VERSION_KEY = "settings:version"
+SETTINGS_CHANNEL = "settings:changed"
 
 
 class Setting(models.Model):
@@ -12,28 +24,119 @@ class Setting(models.Model):
 
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        cache.delete(f"setting:{self.key}")
+        settings_snapshot.invalidate()
+        transaction.on_commit(publish_settings_change)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        settings_snapshot.invalidate()
+        transaction.on_commit(publish_settings_change)
+        return result
+
+
+def get_settings_version():
+    """
+    The version of the settings table, bumped on every change. None when
+    Redis is unavailable.
+    """
+    try:
+        value = get_redis_client().get(SETTINGS_VERSION_KEY)
+    except redis.RedisError:
+        return None
+    return int(value) if value else 0
+
+
+def publish_settings_change():
+    """
+    Bump the settings version and notify the other processes, which drop
+    their snapshot.
+    """
+    settings_snapshot.invalidate()
+    try:
+        redis_client = get_redis_client()
+        redis_client.publish(SETTINGS_CHANNEL, redis_client.incr(SETTINGS_VERSION_KEY))
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish settings change: {e}")
+
+
+class SettingsSnapshot:
+    """
+    A process-local copy of every stored setting, so reading a setting is a
+    dict lookup.
+
+    The snapshot is dropped when a change is published on SETTINGS_CHANNEL,
+    which a background thread of each process listens to. The version is
+    also checked every `poll_interval` seconds, in case a message was missed.
+    """
+
+    poll_interval = 60
+
+    def __init__(self):
+        self.values = None
+        self.version = None
+        self.checked_at = 0.0
+        self.pid = None
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        values = self.values
+        if (
+            values is None
+            or self.pid != os.getpid()
+            or time.monotonic() - self.checked_at > self.poll_interval
+        ):
+            values = self.refresh()
+        return values.get(key)
+
+    def refresh(self):
+        with self.lock:
+            # Forked workers start their own listener
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.values = None
+                threading.Thread(
+                    target=self.listen, name="settings-listener", daemon=True
+                ).start()
+
+            version = get_settings_version()
+            if self.values is None or version != self.version:
+                self.values = dict(Setting.objects.values_list("key", "value"))
+                self.version = version
+            self.checked_at = time.monotonic()
+
+            return self.values
+
+    def invalidate(self):
+        self.values = None
+
+    def listen(self):
+        pid = os.getpid()
+        while self.pid == pid:
+            try:
+                pubsub = get_redis_client().pubsub(
+                    ignore_subscribe_messages=True
+                )
+                pubsub.subscribe(SETTINGS_CHANNEL)
+                for message in pubsub.listen():
+                    if int(message["data"]) != self.version:
+                        self.invalidate()
+            except (redis.RedisError, ValueError) as e:
+                logger.warning(f"Settings listener disconnected: {e}")
+                time.sleep(self.poll_interval)
+
+
+settings_snapshot = SettingsSnapshot()
 
 
 class BaseSettingsSection:
     prefix = ""
 
     def get(self, key, default=None):
-        full_key = f"{self.prefix}.{key}"
-        from .models import Setting
-
-        value = cache.get_or_set(
-            f"setting:{full_key}",
-            lambda: Setting.objects.filter(key=full_key)
-            .values_list("value", flat=True)
-            .first(),
-            timeout=300,
-        )
+        value = settings_snapshot.get(f"{self.prefix}.{key}")
 
         default = settings.DEFAULT_SETTINGS.get(self.prefix, {}).get(key, default)
 
         if value is None:
-            cache.set(f"setting:{full_key}", default, timeout=300)
             return default
 
         return value
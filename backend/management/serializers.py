@@ -15,3 +15,25 @@ class ManagementActionResponseSerializer(serializers.Serializer):
 
     class Meta:
         ref_name = "ManagementActionResponse"
+
+
+class MetricSummarySerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    mean = serializers.FloatField(allow_null=True)
+    p50 = serializers.FloatField(allow_null=True)
+    p95 = serializers.FloatField(allow_null=True)
+
+
+class TaskTelemetrySerializer(serializers.Serializer):
+    task = serializers.CharField()
+    runtime = MetricSummarySerializer(help_text="Runtime in seconds")
+    queue_wait = MetricSummarySerializer(help_text="Time spent queued in seconds")
+    db_queries = MetricSummarySerializer(help_text="Database queries per run")
+    db_query_time = MetricSummarySerializer(
+        help_text="Time spent in database queries per run, in seconds"
+    )
+    rss_growth = MetricSummarySerializer(
+        help_text="Bytes a run raised the peak resident memory of its worker by"
+    )
+    failures = serializers.IntegerField()
+    total_runtime = serializers.FloatField()
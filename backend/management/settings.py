@@ -112,6 +112,82 @@ class GraphSettings(BaseSettingsSection):
     def gravity(self):
         return self.get("gravity", 1.0)
 
+    @property
+    def incremental_depth(self):
+        return self.get("incremental_depth", 1)
+
+    @property
+    def incremental_iterations(self):
+        return self.get("incremental_iterations", 50)
+
+    @property
+    def incremental_max_nodes(self):
+        return self.get("incremental_max_nodes", 2000)
+
+    @property
+    def incremental_max_ratio(self):
+        return self.get("incremental_max_ratio", 0.25)
+
+    @property
+    def viewport_max_entries(self):
+        return self.get("viewport_max_entries", 2000)
+
+    @property
+    def viewport_cell_size(self):
+        return self.get("viewport_cell_size", 48)
+
+    @property
+    def neighbourhood_cache_ttl(self):
+        return self.get("neighbourhood_cache_ttl", 3600)
+
+    @property
+    def related_max_patches(self):
+        return self.get("related_max_patches", 10000)
+
+
+class LogsSettings(BaseSettingsSection):
+    prefix = "logs"
+
+    @property
+    def defer_propagation(self):
+        return self.get("defer_propagation", False)
+
+    @property
+    def fetch_batch_size(self):
+        return self.get("fetch_batch_size", 500)
+
+    @property
+    def fetch_buffer_max(self):
+        return self.get("fetch_buffer_max", 100000)
+
+    @property
+    def partitions_ahead(self):
+        return self.get("partitions_ahead", 3)
+
+    @property
+    def retention_months(self):
+        return self.get("retention_months", 0)
+
+    @property
+    def retention_action(self):
+        return self.get("retention_action", "archive")
+
+
+class QuerySettings(BaseSettingsSection):
+    prefix = "queries"
+
+    @property
+    def sample_rate(self):
+        return self.get("sample_rate", 0.0)
+
+    @property
+    def budget(self):
+        return self.get("budget", 50)
+
+    @property
+    def duplicate_threshold(self):
+        return self.get("duplicate_threshold", 5)
+
 
 class FileSettings(BaseSettingsSection):
     prefix = "files"
@@ -132,6 +208,10 @@ class FileSettings(BaseSettingsSection):
     def sha256_subtype(self):
         return self.get("sha256_subtype", "hash/sha256")
 
+    @property
+    def hanging_files_grace_period(self):
+        return self.get("hanging_files_grace_period", 24)
+
     @property
     def mimetype_patterns(self):
         default_patterns = [
@@ -155,6 +235,8 @@ class CradleSettings:
         self.graph = GraphSettings()
         self.users = UserSettings()
         self.files = FileSettings()
+        self.logs = LogsSettings()
+        self.queries = QuerySettings()
 
 
 cradle_settings = CradleSettings()
@@ -1 +1,41 @@
-# Create your tests here.
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from .models import Setting, settings_snapshot
+from .settings import cradle_settings
+
+
+@patch("management.models.get_settings_version", return_value=1)
+@patch("management.models.threading.Thread")
+class SettingsSnapshotTest(TestCase):
+    def setUp(self):
+        settings_snapshot.invalidate()
+
+    def tearDown(self):
+        settings_snapshot.invalidate()
+
+    def test_reads_from_snapshot(self, *_):
+        Setting.objects.create(key="notes.min_entries", value=5)
+        cradle_settings.notes.min_entries
+
+        with self.assertNumQueries(0):
+            self.assertEqual(cradle_settings.notes.min_entries, 5)
+            self.assertEqual(cradle_settings.notes.max_clique_size, 4)
+
+    def test_save_invalidates(self, *_):
+        setting = Setting.objects.create(key="notes.min_entries", value=5)
+        self.assertEqual(cradle_settings.notes.min_entries, 5)
+
+        setting.value = 7
+        setting.save()
+
+        self.assertEqual(cradle_settings.notes.min_entries, 7)
+
+    def test_version_change_reloads(self, _, get_version):
+        cradle_settings.notes.min_entries
+        Setting.objects.bulk_create([Setting(key="notes.min_entries", value=3)])
+        settings_snapshot.checked_at = 0
+        get_version.return_value = 2
+
+        self.assertEqual(cradle_settings.notes.min_entries, 3)
@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import SettingsView, ActionView
+from .views import ActionView, MetricsView, SettingsView, TaskTelemetryView
 
 urlpatterns = [
     path("settings/", SettingsView.as_view(), name="settings"),
     path("actions/<str:action_name>", ActionView.as_view(), name="perform-action"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("tasks/", TaskTelemetryView.as_view(), name="task-telemetry"),
 ]
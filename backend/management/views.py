@@ -1,7 +1,10 @@
 import inspect
 
+from core.lanes import bulk_lane
+from core.metrics import render_metrics
+from core.telemetry import task_summary
 from django.contrib.contenttypes.models import ContentType
-from django.core.cache import cache
+from django.http import HttpResponse
 from django_lifecycle.mixins import transaction
 from drf_spectacular.utils import (
     OpenApiExample,
@@ -32,7 +35,7 @@ from rest_framework.views import APIView
 from user.permissions import HasAdminRole
 
 from .models import BaseSettingsSection, Setting
-from .serializers import ManagementActionResponseSerializer
+from .serializers import ManagementActionResponseSerializer, TaskTelemetrySerializer
 from .settings import cradle_settings
 
 
@@ -117,7 +120,6 @@ class SettingsView(APIView):
                     Setting.objects.update_or_create(
                         key=full_key, defaults={"value": value}
                     )
-                    cache.set(f"setting:{full_key}", value, timeout=300)
                     updated.append(full_key)
                 except Exception as e:
                     errors.append({full_key: str(e)})
@@ -151,6 +153,38 @@ class SettingsView(APIView):
         return nested
 
 
+class MetricsView(APIView):
+    permission_classes = [IsAuthenticated, HasAdminRole]
+
+    @extend_schema(
+        summary="Export metrics",
+        description=(
+            "Returns the task, queue and lock metrics of every worker in the "
+            "Prometheus text format. Scrapers can authenticate with an API key."
+        ),
+        responses={200: OpenApiResponse(response=str, description="Metrics")},
+    )
+    def get(self, request, *args, **kwargs):
+        return HttpResponse(
+            render_metrics(), content_type="text/plain; version=0.0.4"
+        )
+
+
+class TaskTelemetryView(APIView):
+    permission_classes = [IsAuthenticated, HasAdminRole]
+
+    @extend_schema(
+        summary="Summarize task performance",
+        description=(
+            "Returns the runtime, queue wait, database usage and memory of every "
+            "task which ran since the metrics were reset, slowest first."
+        ),
+        responses={200: TaskTelemetrySerializer(many=True)},
+    )
+    def get(self, request, *args, **kwargs):
+        return Response(TaskTelemetrySerializer(task_summary(), many=True).data)
+
+
 class ActionView(APIView):
     permission_classes = [IsAuthenticated, HasAdminRole]
     serializer_class = ActionSerializer
@@ -166,7 +200,10 @@ class ActionView(APIView):
     def post(self, request, action_name: str | None = None, *args, **kwargs):
         handler = getattr(self, "action_" + action_name, None) if action_name else None
         if handler and callable(handler):
-            return handler(request, *args, **kwargs)
+            # Actions work on every note or entry, keep them out of the way
+            # of the analysts' own work
+            with bulk_lane():
+                return handler(request, *args, **kwargs)
         return Response(
             {"error": f"Unknown action: {action_name}"},
             status=status.HTTP_400_BAD_REQUEST,
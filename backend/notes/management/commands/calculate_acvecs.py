@@ -1,11 +1,15 @@
 from django.core.management.base import BaseCommand
-from django_lifecycle.mixins import transaction
+from django.db import transaction
+from django.db.models import Q
 
+from core.utils import chunked
 from entries.enums import EntryType
-from entries.models import Entry
+from entries.models import EntitySlot, Entry
+from intelio.models.base import BaseDigest
+from knowledge_graph.related import mark_notes_changed
 from notes.models import Note
-from notes.utils import calculate_acvec
-from notes.tasks import propagate_acvec
+
+CHUNK_SIZE = 1000
 
 
 class Command(BaseCommand):
@@ -20,17 +24,32 @@ class Command(BaseCommand):
             *args: Variable length argument list.
             **options: Arbitrary keyword arguments.
         """
+        EntitySlot.objects.filter(
+            entity__entry_class__type=EntryType.ARTIFACT
+        ).update(entity=None)
         Entry.artifacts.update(acvec_offset=0, is_public=True)
 
-        for entry in Entry.entities.all():
-            entry.setup_access()
+        # Only entities whose offset is out of sync with their visibility
+        # need to go through setup_access
+        out_of_sync = Q(acvec_offset=0, is_public=False) | (
+            Q(is_public=True) & ~Q(acvec_offset=0)
+        )
+        for entry in Entry.entities.filter(out_of_sync):
             entry.save()
 
-        notes = Note.objects.all()
+        note_ids = Note.objects.values_list("id", flat=True).order_by("id")
+        updated = 0
+
+        for chunk in chunked(note_ids.iterator(chunk_size=CHUNK_SIZE), CHUNK_SIZE):
+            with transaction.atomic():
+                changed = Note.objects.update_access_vectors(chunk)
+                Note.objects.propagate_access_vectors(changed)
+            mark_notes_changed(changed)
+            updated += len(changed)
+
+        digest_ids = BaseDigest.objects.values_list("id", flat=True).order_by("id")
+
+        for chunk in chunked(digest_ids.iterator(chunk_size=CHUNK_SIZE), CHUNK_SIZE):
+            BaseDigest.update_access_vectors(chunk)
 
-        for note in notes:
-            note.access_vector = calculate_acvec(
-                note.entries.filter(entry_class__type=EntryType.ENTITY)
-            )
-            note.save()
-            transaction.on_commit(lambda: propagate_acvec.apply_async((note.id,)))
+        self.stdout.write(f"Updated {updated} notes")
@@ -1,19 +1,16 @@
-from django.db import models
-from django.db.models import Count, Value
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, models
+from django.db.models import Count
 
 from entries.enums import EntryType
-from entries.models import Entry
+from entries.models import Entry, EntryClass, Relation
 from user.models import CradleUser
-from django.db.models import Case, When, Q, F, ExpressionWrapper
+from django.db.models import Case, When, Q, F
 
 from typing import List
 from uuid import UUID
 from typing import Optional
 
-from core.fields import BitStringField
-
-fieldtype = BitStringField(max_length=2048, null=False, default=1, varying=False)
-
 
 class NoteQuerySet(models.QuerySet):
     def for_entry(self, entry_id: UUID | None) -> models.QuerySet:
@@ -41,15 +38,7 @@ class NoteQuerySet(models.QuerySet):
         if user.is_cradle_admin:
             return self.none()
 
-        v = user.access_vector
-
-        queryset = self.annotate(
-            bit_or=ExpressionWrapper(
-                F("access_vector").bitor(Value(v)), output_field=fieldtype
-            )
-        ).filter(~Q(bit_or=v))
-
-        return queryset
+        return self.exclude(access_vector__accessible_by=user.access_vector)
 
     def accessible(self, user: CradleUser) -> models.QuerySet:
         """
@@ -58,15 +47,7 @@ class NoteQuerySet(models.QuerySet):
         if user.is_cradle_admin:
             return self
 
-        v = user.access_vector
-
-        queryset = self.annotate(
-            bit_or=ExpressionWrapper(
-                F("access_vector").bitor(Value(v)), output_field=fieldtype
-            )
-        ).filter(bit_or=v)
-
-        return queryset
+        return self.filter(access_vector__accessible_by=user.access_vector)
 
 
 class NoteManager(models.Manager):
@@ -223,3 +204,79 @@ class NoteManager(models.Manager):
         Get only non-fleeting notes
         """
         return self.get_queryset().non_fleeting()
+
+    def update_access_vectors(self, note_ids: List[UUID]) -> List[UUID]:
+        """Recompute the access vectors of the given notes from the entities
+        they reference, in a single statement.
+
+        Args:
+            note_ids: The ids of the notes to update
+
+        Returns:
+            List[UUID]: The ids of the notes whose access vector changed
+        """
+        if not note_ids:
+            return []
+
+        m2m = self.model.entries.field
+        through = m2m.remote_field.through._meta
+
+        sql = f"""
+            WITH vectors AS (
+                SELECT
+                    n.id,
+                    COALESCE(
+                        ARRAY_AGG(DISTINCT e.acvec_offset ORDER BY e.acvec_offset)
+                        FILTER (WHERE c.type = %s AND e.acvec_offset <> 0),
+                        '{{}}'
+                    ) AS access_vector
+                FROM {self.model._meta.db_table} n
+                LEFT JOIN {through.db_table} ne
+                    ON ne.{m2m.m2m_column_name()} = n.id
+                LEFT JOIN {Entry._meta.db_table} e
+                    ON e.id = ne.{m2m.m2m_reverse_name()}
+                LEFT JOIN {EntryClass._meta.db_table} c
+                    ON c.subtype = e.entry_class_id
+                WHERE n.id = ANY(%s)
+                GROUP BY n.id
+            )
+            UPDATE {self.model._meta.db_table} n
+            SET access_vector = v.access_vector
+            FROM vectors v
+            WHERE n.id = v.id
+              AND n.access_vector IS DISTINCT FROM v.access_vector
+            RETURNING n.id
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [EntryType.ENTITY, list(note_ids)])
+            return [row[0] for row in cursor.fetchall()]
+
+    def propagate_access_vectors(self, note_ids: List[UUID]) -> int:
+        """Copy the access vectors of the given notes to the relations they
+        created, in a single statement.
+
+        Args:
+            note_ids: The ids of the notes whose relations are updated
+
+        Returns:
+            int: The number of relations updated
+        """
+        if not note_ids:
+            return 0
+
+        content_type = ContentType.objects.get_for_model(self.model)
+
+        sql = f"""
+            UPDATE {Relation._meta.db_table} r
+            SET access_vector = n.access_vector
+            FROM {self.model._meta.db_table} n
+            WHERE r.content_type_id = %s
+              AND r.object_id = n.id
+              AND n.id = ANY(%s)
+              AND r.access_vector IS DISTINCT FROM n.access_vector
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [content_type.id, list(note_ids)])
+            return cursor.rowcount
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.4 on 2026-10-19 11:03
+
+import core.fields
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("entries", "0059_relation_access_vector_offsets"),
+        ("notes", "0027_alter_note_metadata"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql="""
+                    ALTER TABLE notes_note
+                        ALTER COLUMN access_vector TYPE integer[]
+                        USING acvec_offsets(access_vector);
+                    """,
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name="note",
+                    name="access_vector",
+                    field=core.fields.AccessVectorField(default=1 << 2047),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["access_vector"], name="note_acvec_gin"
+            ),
+        ),
+    ]
@@ -1,7 +1,8 @@
 import uuid
 
-from core.fields import BitStringField
+from core.fields import NO_ACCESS_OFFSET, AccessVectorField
 from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.utils import timezone
 from django_lifecycle import AFTER_CREATE, AFTER_UPDATE, hook
@@ -57,8 +58,8 @@ class Note(LifecycleModelMixin, LoggableModelMixin, models.Model):
         CradleUser, related_name="editor", on_delete=models.SET_NULL, null=True
     )
 
-    access_vector: BitStringField = BitStringField(
-        max_length=2048, null=False, default=1 << 2047, varying=False
+    access_vector: AccessVectorField = AccessVectorField(
+        null=False, default=1 << NO_ACCESS_OFFSET
     )
 
     edit_timestamp: models.DateTimeField = models.DateTimeField(null=True)
@@ -83,6 +84,9 @@ class Note(LifecycleModelMixin, LoggableModelMixin, models.Model):
             models.Index(fields=["fleeting", "timestamp"]),  # Alternative order
             models.Index(fields=["author", "-timestamp"]),  # For author filtering
             models.Index(fields=["editor", "-edit_timestamp"]),  # For editor filtering
+            GinIndex(
+                fields=["access_vector"], name="note_acvec_gin"
+            ),  # For access filtering
         ]
 
     def set_status(self, status: NoteStatus, message: str = ""):
@@ -102,9 +106,6 @@ class Note(LifecycleModelMixin, LoggableModelMixin, models.Model):
     def propagate_from(self, log):
         return
 
-    def delete(self):
-        super().delete()
-
     @hook(AFTER_CREATE)
     def after_create(self):
         from .tasks import propagate_acvec
@@ -12,6 +12,7 @@ from ..exceptions import (
     FieldTooLongException,
 )
 from ..models import Note
+from ..revisions import start_pipeline
 from ..utils import calculate_acvec
 from .access_control_task import AccessControlTask
 from .base_task import BaseTask
@@ -98,7 +99,8 @@ class TaskScheduler:
 
             task_chain = chain(*tasks)
 
-            transaction.on_commit(lambda: task_chain.apply_async())
+            # Runs queued for earlier saves of the note are superseded
+            transaction.on_commit(lambda: start_pipeline(note.id, task_chain))
 
             if update_acvec:
                 note.access_vector = calculate_acvec(
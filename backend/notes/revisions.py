@@ -0,0 +1,107 @@
+import functools
+import logging
+
+import redis
+from celery import current_app, current_task
+
+from core.utils import get_redis_client, get_request_header
+
+logger = logging.getLogger(__name__)
+
+REVISION_HEADER = "note_revision"
+# Task ids are kept until the next run of the note's pipeline cancels them
+PIPELINE_TASKS_EXPIRE = 86400
+
+
+def revision_key(note_id):
+    return f"notes:pipeline:{note_id}:revision"
+
+
+def tasks_key(note_id, revision):
+    return f"notes:pipeline:{note_id}:tasks:{revision}"
+
+
+def start_pipeline(note_id, task_chain):
+    """
+    Send the processing pipeline of a note, tagged with a new revision of the
+    note. The tasks of the previous run which are still queued are revoked,
+    and the ones already running skip the stages they have left.
+
+    When Redis is unavailable the pipeline is sent untagged, and never skips.
+    """
+    try:
+        redis_client = get_redis_client()
+        revision = redis_client.incr(revision_key(note_id))
+    except redis.RedisError as e:
+        logger.warning(f"Could not tag the pipeline of note {note_id}: {e}")
+        return task_chain.apply_async()
+
+    for signature in getattr(task_chain, "tasks", ()):
+        headers = signature.options.get("headers") or {}
+        signature.set(headers={**headers, REVISION_HEADER: revision})
+
+    result = task_chain.apply_async()
+
+    task_ids = []
+    node = result
+    while node is not None:
+        task_ids.append(node.id)
+        node = node.parent
+
+    try:
+        pipe = redis_client.pipeline()
+        pipe.rpush(tasks_key(note_id, revision), *task_ids)
+        pipe.expire(tasks_key(note_id, revision), PIPELINE_TASKS_EXPIRE)
+        pipe.lrange(tasks_key(note_id, revision - 1), 0, -1)
+        pipe.delete(tasks_key(note_id, revision - 1))
+        superseded = pipe.execute()[2]
+    except redis.RedisError as e:
+        logger.warning(f"Could not cancel the previous pipeline of {note_id}: {e}")
+        superseded = []
+
+    if superseded:
+        current_app.control.revoke([i.decode() for i in superseded])
+
+    return result
+
+
+def is_superseded(note_id, revision):
+    """
+    Whether a newer pipeline run was started for the note than `revision`.
+    """
+    if revision is None:
+        return False
+
+    try:
+        latest = get_redis_client().get(revision_key(note_id))
+    except redis.RedisError:
+        return False
+
+    return latest is not None and int(latest) > int(revision)
+
+
+def skip_superseded(task_func):
+    """
+    Skip a pipeline stage, before waiting for any lock, when the note was
+    saved again since its pipeline was started. The newer run redoes it.
+    """
+
+    @functools.wraps(task_func)
+    def wrapper(*args, **kwargs):
+        note_id = args[0] if args else kwargs.get("note_id")
+        revision = (
+            get_request_header(current_task.request, REVISION_HEADER)
+            if current_task
+            else None
+        )
+
+        if is_superseded(note_id, revision):
+            logger.info(
+                f"Skipping {task_func.__name__} for note {note_id}, "
+                f"revision {revision} was superseded"
+            )
+            return None
+
+        return task_func(*args, **kwargs)
+
+    return wrapper
@@ -328,7 +328,10 @@ class NoteListSerializer:
                 entry_classes.add(entry.entry_class.subtype)
         data["entry_classes"] = list(entry_classes)
         files_data = []
+        entities = None
         for file_ref in note.files.all():
+            if entities is None:
+                entities = self._get_file_entities(note)
             file_data = {
                 "id": str(file_ref.id),
                 "minio_file_name": file_ref.minio_file_name,
@@ -340,7 +343,7 @@ class NoteListSerializer:
                 "md5_hash": file_ref.md5_hash,
                 "sha1_hash": file_ref.sha1_hash,
                 "sha256_hash": file_ref.sha256_hash,
-                "entities": self._get_file_entities(file_ref, note),
+                "entities": entities,
             }
             files_data.append(file_data)
         data["files"] = files_data
@@ -359,8 +362,8 @@ class NoteListSerializer:
             + "..."
         )
 
-    def _get_file_entities(self, file_ref, note):
-        """Get entities for file reference"""
+    def _get_file_entities(self, note):
+        """Get the entities of the note, shared by all of its files"""
         entities = []
         for entry in note.entries.all():
             if (
@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from knowledge_graph.related import mark_notes_changed
+
+from .models import Note
+
+
+@receiver(post_delete, sender=Note)
+def mark_deleted_note_changed(sender, instance, **kwargs):
+    """
+    Drop deleted notes from the related entries index, whether they are
+    deleted one by one, in bulk or along with their digest.
+    """
+    note_id = instance.id
+    transaction.on_commit(lambda: mark_notes_changed([note_id]))
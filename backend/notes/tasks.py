@@ -10,8 +10,9 @@ from django.db import close_old_connections
 from django.utils import timezone
 from entries.enums import EntryType, RelationReason
 from entries.exceptions import InvalidEntryException
-from entries.models import Entry, EntryClass, Relation
+from entries.models import AliasClosure, Entry, EntryClass, Relation
 from intelio.enums import EnrichmentStrategy
+from knowledge_graph.related import mark_notes_changed
 from management.settings import cradle_settings
 from user.models import CradleUser
 
@@ -19,6 +20,7 @@ from notes.enums import NoteStatus
 from notes.exceptions import EntriesDoNotExistException, EntryClassesDoNotExistException
 from notes.markdown.to_links import Link
 from notes.markdown.to_metadata import infer_metadata
+from notes.revisions import skip_superseded
 
 from .models import Note
 
@@ -26,7 +28,10 @@ logger = logging.getLogger(__name__)
 
 
 @shared_task
-@distributed_lock("smartlinker_note_{note_id}", timeout=1800)
+@skip_superseded
+@distributed_lock(
+    "smartlinker_note_{note_id}", timeout=1800, retry_countdown=10, blocking=False
+)
 def smart_linker_task(note_id):
     from entries.tasks import refresh_edges_materialized_view
 
@@ -99,13 +104,16 @@ def smart_linker_task(note_id):
 
     finally:
         close_old_connections()
-        refresh_edges_materialized_view.apply_async(simulate=True)
+        refresh_edges_materialized_view.apply_async(kwargs={"simulate": True})
 
     return note_id
 
 
 @shared_task
-@distributed_lock("link_files_note_{note_id}", timeout=1800)
+@skip_superseded
+@distributed_lock(
+    "link_files_note_{note_id}", timeout=1800, retry_countdown=10, blocking=False
+)
 def link_files_task(note_id, file_ref_id=None):
     from entries.tasks import refresh_edges_materialized_view
 
@@ -222,6 +230,7 @@ def link_files_task(note_id, file_ref_id=None):
 @shared_task(
     autoretry_for=(Exception,), retry_backoff=30, retry_backoff_max=60, max_retries=1
 )
+@skip_superseded
 def entry_class_creation_task(note_id, user_id=None):
     """
     Celery task to create missing entry classes for a note.
@@ -274,6 +283,7 @@ def entry_class_creation_task(note_id, user_id=None):
 @shared_task(
     autoretry_for=(Exception,), retry_backoff=30, retry_backoff_max=300, max_retries=3
 )
+@skip_superseded
 def entry_population_task(note_id, user_id=None, force_contains_check=False):
     """
     Celery task to create missing entries for a note.
@@ -356,7 +366,7 @@ def entry_population_task(note_id, user_id=None, force_contains_check=False):
             scan_for_children.delay(childscan, content_type.id, note.id)
 
         if len(enrich):
-            for k, v in enrich:
+            for k, v in enrich.items():
                 enrich_entries.delay(k, v, content_type.id, note.id)
 
         note.save()
@@ -370,6 +380,7 @@ def entry_population_task(note_id, user_id=None, force_contains_check=False):
 @shared_task(
     autoretry_for=(Exception,), retry_backoff=30, retry_backoff_max=300, max_retries=3
 )
+@skip_superseded
 def connect_aliases(note_id, user_id=None):
     """
     Celery task to connect aliases in a note
@@ -432,18 +443,23 @@ def connect_aliases(note_id, user_id=None):
         refresh_edges_materialized_view.apply_async()
 
         Relation.objects.bulk_create(relations)
+        AliasClosure.objects.refresh([alias.id, *(r.e1_id for r in relations)])
 
 
 @shared_task
 @distributed_lock("propagate_acvec_{note_id}", timeout=3600)
 def propagate_acvec(note_id):
     note = Note.objects.get(id=note_id)
+    mark_notes_changed([note_id])
 
     return note.relations.update(access_vector=note.access_vector)
 
 
 @shared_task
-@distributed_lock("finalize_note_{note_id}", timeout=1800)
+@skip_superseded
+@distributed_lock(
+    "finalize_note_{note_id}", timeout=1800, retry_countdown=10, blocking=False
+)
 def note_finalize_task(note_id):
     note = Note.objects.get(id=note_id)
 
@@ -451,9 +467,14 @@ def note_finalize_task(note_id):
         note.set_status(NoteStatus.HEALTHY)
         note.save()
 
+    mark_notes_changed([note_id])
+
 
 @shared_task
-@distributed_lock("metadata_process_{note_id}", timeout=1800)
+@skip_superseded
+@distributed_lock(
+    "metadata_process_{note_id}", timeout=1800, retry_countdown=10, blocking=False
+)
 def note_metadata_process_task(note_id):
     note = Note.objects.get(id=note_id)
 
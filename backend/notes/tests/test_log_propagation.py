@@ -0,0 +1,51 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from entries.models import Entry
+from logs.enums import EventType
+from logs.models import EventLog
+from notes.models import Note
+
+from .utils import NotesTestCase
+
+
+class LogPropagationTest(NotesTestCase):
+    def setUp(self):
+        super().setUp()
+
+        self.entities = [
+            Entry.objects.create(name=f"Entity{i}", entry_class=self.entryclass1)
+            for i in range(20)
+        ]
+        self.artifact = Entry.objects.create(
+            name="127.0.0.1", entry_class=self.entryclass_ip
+        )
+
+    def make_note(self, entities):
+        note = Note.objects.create(content="Note")
+        note.entries.add(self.artifact, *entities)
+        return note
+
+    def test_propagates_to_entities(self):
+        note = self.make_note(self.entities[:2])
+
+        log = note.log_edit(self.user)
+
+        propagated = EventLog.objects.filter(src_log=log)
+        self.assertEqual(
+            {int(i.object_id) for i in propagated},
+            {e.id for e in self.entities[:2]},
+        )
+        self.assertTrue(all(i.type == EventType.EDIT for i in propagated))
+
+    def test_queries_do_not_grow_with_links(self):
+        small = self.make_note(self.entities[:2])
+        large = self.make_note(self.entities)
+        small.log_edit(self.user)
+
+        with CaptureQueriesContext(connection) as few:
+            small.log_edit(self.user)
+        with CaptureQueriesContext(connection) as many:
+            large.log_edit(self.user)
+
+        self.assertEqual(len(few), len(many))
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 from notes.models import Note
 from entries.models import Entry
 from .utils import NotesTestCase
@@ -22,3 +24,17 @@ class DeleteNoteTest(NotesTestCase):
 
         with self.subTest("Note is deleted"):
             self.assertEqual(Note.objects.count(), 0)
+
+    @patch("notes.signals.mark_notes_changed")
+    def test_bulk_delete_marks_notes_changed(self, mark_notes_changed):
+        other = Note.objects.create(content="Note2")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Note.objects.filter(id__in=[self.note.id, other.id]).delete()
+
+        marked = {
+            note_id
+            for call in mark_notes_changed.call_args_list
+            for note_id in call.args[0]
+        }
+        self.assertEqual(marked, {self.note.id, other.id})
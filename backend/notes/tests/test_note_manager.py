@@ -192,6 +192,19 @@ class AccessibleNotesTest(NotesTestCase):
 
         self.assertQuerySetEqual(notes, expected, ordered=False)
 
+    def test_update_access_vectors(self):
+        notes = [self.note1, self.note2, self.note3]
+        Note.objects.filter(id=self.note2.id).update(access_vector=1)
+
+        changed = Note.objects.update_access_vectors([n.id for n in notes])
+
+        self.assertEqual(changed, [self.note2.id])
+        for note in notes:
+            note.refresh_from_db()
+            self.assertEqual(
+                note.access_vector, calculate_acvec(note.entries.all())
+            )
+
 
 class GetAllNotesTest(NotesTestCase):
     def create_notes(self):
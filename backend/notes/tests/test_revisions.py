@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import redis
+from django.test import SimpleTestCase
+
+from notes.revisions import REVISION_HEADER, is_superseded, skip_superseded
+
+
+@patch("notes.revisions.get_redis_client")
+class SupersededRevisionTest(SimpleTestCase):
+    def test_older_revision_superseded(self, get_client):
+        get_client.return_value.get.return_value = b"3"
+
+        self.assertTrue(is_superseded("note", 2))
+        self.assertFalse(is_superseded("note", 3))
+
+    def test_untagged_run_not_superseded(self, get_client):
+        get_client.return_value.get.return_value = b"3"
+
+        self.assertFalse(is_superseded("note", None))
+
+    def test_not_superseded_without_redis(self, get_client):
+        get_client.return_value.get.side_effect = redis.RedisError
+
+        self.assertFalse(is_superseded("note", 1))
+
+    def test_superseded_stage_skipped(self, get_client):
+        get_client.return_value.get.return_value = b"2"
+        stage = MagicMock(__name__="stage")
+        wrapped = skip_superseded(stage)
+
+        task = SimpleNamespace(request=SimpleNamespace(**{REVISION_HEADER: 1}))
+        with patch("notes.revisions.current_task", task):
+            self.assertIsNone(wrapped("note"))
+        stage.assert_not_called()
+
+        task.request = SimpleNamespace(**{REVISION_HEADER: 2})
+        with patch("notes.revisions.current_task", task):
+            wrapped("note")
+        stage.assert_called_once_with("note")
@@ -11,7 +11,7 @@ from logs.models import LoggableModelMixin
 from mail.models import ConfirmationMail, ResetPasswordMail
 
 from .managers import CradleUserManager
-from core.fields import BitStringField
+from core.fields import AccessVectorField
 
 
 class UserRoles(models.TextChoices):
@@ -136,41 +136,17 @@ class CradleUser(AbstractUser, LoggableModelMixin):
 
     @property
     def access_vector(self):
-        if self.is_cradle_admin:
-            return "1" * 2048
-        acvec = 1
-
-        for access in self.accesses.all():
-            if access.access_type == AccessType.NONE:
-                continue
-            acvec |= 1 << access.entity.acvec_offset
-
-        fieldtype = BitStringField(
-            max_length=2048, null=False, default=1, varying=False
-        )
-
-        return fieldtype.get_prep_value(acvec)
-
-    @property
-    def access_vector_inv(self):
-        if self.is_cradle_admin:
-            return "0" * 2048
-        acvec = 1
-
-        for access in self.accesses.all():
-            if access.access_type == AccessType.NONE:
-                continue
-            acvec |= 1 << access.entity.acvec_offset
-
-        fieldtype = BitStringField(
-            max_length=2048, null=False, default=1, varying=False
+        """
+        The access vector of the entities this user can read. Admins can read
+        everything and should not be filtered by it.
+        """
+        offsets = (
+            self.accesses.exclude(access_type=AccessType.NONE)
+            .exclude(entity__isnull=True)
+            .values_list("entity__acvec_offset", flat=True)
         )
 
-        inverter = 1
-        for i in range(2048):
-            inverter |= 1 << i
-
-        return fieldtype.get_prep_value(acvec ^ inverter)
+        return AccessVectorField.from_offsets(offsets)
 
     def enable_2fa(self):
         """
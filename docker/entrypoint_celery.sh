@@ -1,10 +1,20 @@
 #!/bin/sh
 
-: "${CELERY_QUEUES:=email,notes,graph,publish,import,access,enrich,digest,files}"
+: "${CELERY_QUEUES:=email,notes,graph,publish,import,access,enrich,digest,logs,files}"
 : "${LOGLEVEL:=info}"
 : "${CELERY_CONCURRENCY:=4}"
+: "${CELERY_BULK_QUEUES:=notes.bulk,digest.bulk,enrich.bulk,access.bulk}"
+: "${CELERY_BULK_CONCURRENCY:=2}"
+: "${CELERY_WORKER:=interactive}"
+
+# Bulk work, e.g. digests and management actions, has a worker of its own so
+# it never takes the slots of the analysts' interactive work. It runs as a
+# separate container, which restarts it and forwards it signals.
+if [ "$CELERY_WORKER" = "bulk" ]; then
+    exec uv run celery -A cradle worker -n bulk@%h -Q "$CELERY_BULK_QUEUES" --loglevel="$LOGLEVEL" --concurrency="$CELERY_BULK_CONCURRENCY"
+fi
 
 uv run python manage.py migrate django_celery_beat
 uv run python manage.py migrate
 
-uv run celery -A cradle worker --beat -Q "$CELERY_QUEUES" --loglevel="$LOGLEVEL" --concurrency="$CELERY_CONCURRENCY"
+exec uv run celery -A cradle worker --beat -n interactive@%h -Q "$CELERY_QUEUES" --loglevel="$LOGLEVEL" --concurrency="$CELERY_CONCURRENCY"